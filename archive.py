@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Archive
+Every run's stories in one SQLite file with an FTS5 index, and a search CLI over it
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from item_store import item_key
+
+
+def _story_title(item: Dict) -> str:
+    # GitHub repos carry their name where stories carry a title
+    return item.get('title') or item.get('name') or ''
+
+
+def _epoch(day: Optional[str], end_of_day: bool = False) -> Optional[float]:
+    """"2026-01-31" (or a full ISO timestamp) as epoch seconds in local time"""
+    if not day:
+        return None
+    when = datetime.fromisoformat(day)
+    if end_of_day and len(day) <= 10:
+        when = when.replace(hour=23, minute=59, second=59)
+    return when.timestamp()
+
+
+def fts_query(text: str) -> str:
+    """Plain words to an FTS5 query: every word must match, `word*` matches a prefix"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class BriefArchive:
+    """Append-only archive: one row per distinct story, one per appearance in a run
+
+    Ingest touches only the run being added (an upsert per story, FTS rows
+    only for stories never seen before), so archiving stays constant-time
+    however long the history grows. Titles, descriptions and sources are
+    full-text indexed.
+    """
+
+    def __init__(self, path: str = 'data/archive.sqlite'):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                run_at REAL NOT NULL,
+                items INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT,
+                description TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                best_score REAL,
+                runs INTEGER NOT NULL DEFAULT 0,
+                sent INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (source, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS appearances (
+                run_id TEXT NOT NULL,
+                story_id INTEGER NOT NULL,
+                section TEXT NOT NULL,
+                score REAL,
+                comments INTEGER,
+                delivered INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, story_id, section)
+            );
+            CREATE INDEX IF NOT EXISTS appearances_story ON appearances (story_id);
+            CREATE INDEX IF NOT EXISTS stories_first_seen ON stories (first_seen);
+            CREATE INDEX IF NOT EXISTS stories_last_seen ON stories (last_seen);
+            CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+                title, description, source, content='stories', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+        """)
+        self._db.commit()
+
+    def add_run(self, run_id: str, raw_data: Dict[str, Any], delivered: Iterable[Dict] = (),
+                run_at: Optional[float] = None) -> int:
+        """Archive every story of one run's raw data; returns how many stories were new
+
+        `delivered` are the items that went out in the run's brief(s).
+        Re-adding a run id replaces nothing and adds nothing twice.
+        """
+        run_at = time.time() if run_at is None else run_at
+        sent = {item_key(item) for item in delivered}
+        rows = [
+            (section, item)
+            for section, section_data in raw_data.items() if isinstance(section_data, dict)
+            for items in section_data.values() if isinstance(items, list)
+            for item in items if _story_title(item)
+        ]
+        new = 0
+        in_run: Dict[int, bool] = {}
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone():
+                return 0
+            with self._db:
+                for section, item in rows:
+                    source, item_id = item_key(item)
+                    score = item.get('score', item.get('stars'))
+                    cursor = self._db.execute("""
+                        INSERT INTO stories (source, item_id, title, url, description, first_seen, last_seen, best_score)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (source, item_id) DO NOTHING
+                    """, (source, item_id, _story_title(item), item.get('url'), item.get('description'),
+                          run_at, run_at, score))
+                    if cursor.rowcount:
+                        story_id = cursor.lastrowid
+                        self._db.execute(
+                            "INSERT INTO stories_fts (rowid, title, description, source) VALUES (?, ?, ?, ?)",
+                            (story_id, _story_title(item), item.get('description') or '', source))
+                        new += 1
+                    else:
+                        story_id = self._db.execute(
+                            "SELECT id FROM stories WHERE source = ? AND item_id = ?", (source, item_id)).fetchone()[0]
+                        self._db.execute("""
+                            UPDATE stories SET last_seen = MAX(last_seen, ?), first_seen = MIN(first_seen, ?),
+                                               best_score = MAX(COALESCE(best_score, ?), ?)
+                            WHERE id = ?
+                        """, (run_at, run_at, score, score, story_id))
+                    was_sent = (source, item_id) in sent
+                    in_run[story_id] = in_run.get(story_id, False) or was_sent
+                    self._db.execute("""
+                        INSERT OR IGNORE INTO appearances (run_id, story_id, section, score, comments, delivered)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (run_id, story_id, section, score, item.get('comments'), was_sent))
+                # a story listed under two sections still counts once per run
+                self._db.executemany("UPDATE stories SET runs = runs + 1, sent = sent + ? WHERE id = ?",
+                                     [(was_sent, story_id) for story_id, was_sent in in_run.items()])
+                self._db.execute("INSERT INTO runs VALUES (?, ?, ?)", (run_id, run_at, len(rows)))
+        return new
+
+    def search(self, query: str = '', since: Optional[str] = None, until: Optional[str] = None,
+               source: Optional[str] = None, section: Optional[str] = None, delivered: bool = False,
+               order: str = 'relevance', limit: int = 20) -> List[Dict[str, Any]]:
+        """Stories matching every word of `query` (and the filters), with when they were first/last seen
+
+        `since`/`until` (YYYY-MM-DD) keep stories seen within the range;
+        `source` is a case-insensitive prefix ("r/" for all of Reddit);
+        `order` is relevance, first (oldest first sighting first) or recent.
+        """
+        where, params = [], []
+        if query:
+            where.append("stories_fts MATCH ?")
+            params.append(fts_query(query))
+        if since:
+            where.append("s.last_seen >= ?")
+            params.append(_epoch(since))
+        if until:
+            where.append("s.first_seen <= ?")
+            params.append(_epoch(until, end_of_day=True))
+        if source:
+            where.append("s.source LIKE ? ESCAPE '\\'")
+            params.append(source.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if delivered:
+            where.append("s.sent > 0")
+        if section:
+            where.append("EXISTS (SELECT 1 FROM appearances a WHERE a.story_id = s.id AND a.section = ?)")
+            params.append(section)
+        order_by = {
+            'first': "s.first_seen ASC",
+            'recent': "s.last_seen DESC",
+            'relevance': "bm25(stories_fts) ASC" if query else "s.last_seen DESC",
+        }[order]
+        join = "JOIN stories_fts ON stories_fts.rowid = s.id" if query else ""
+        sql = f"""
+            SELECT s.id, s.source, s.title, s.url, s.first_seen, s.last_seen, s.best_score, s.runs, s.sent
+            FROM stories s {join}
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY {order_by} LIMIT ?
+        """
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit]).fetchall()
+        return [
+            {'id': r[0], 'source': r[1], 'title': r[2], 'url': r[3], 'first_seen': r[4], 'last_seen': r[5],
+             'best_score': r[6], 'runs': r[7], 'delivered_runs': r[8]}
+            for r in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs, first, last = self._db.execute("SELECT COUNT(*), MIN(run_at), MAX(run_at) FROM runs").fetchone()
+            stories = self._db.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+            appearances = self._db.execute("SELECT COUNT(*) FROM appearances").fetchone()[0]
+        return {'runs': runs, 'stories': stories, 'appearances': appearances,
+                'first_run': first and datetime.fromtimestamp(first).isoformat(timespec='seconds'),
+                'last_run': last and datetime.fromtimestamp(last).isoformat(timespec='seconds')}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search and maintain the archive of past briefs")
+    parser.add_argument('--archive', default=os.getenv('ARCHIVE_PATH', 'data/archive.sqlite'), metavar='PATH')
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help="find stories by keywords, date range and source")
+    search.add_argument('query', nargs='*', help="words that must all match (word* for a prefix)")
+    search.add_argument('--since', metavar='YYYY-MM-DD')
+    search.add_argument('--until', metavar='YYYY-MM-DD')
+    search.add_argument('--source', help="source prefix, e.g. HackerNews or r/")
+    search.add_argument('--section', choices=['tech_news', 'ai_ml', 'startups', 'remote_jobs', 'world_news'])
+    search.add_argument('--delivered', action='store_true', help="only stories that went out in a brief")
+    search.add_argument('--first', dest='order', action='store_const', const='first', default='relevance',
+                        help="oldest first sighting first (\"when did we first surface X\")")
+    search.add_argument('--recent', dest='order', action='store_const', const='recent',
+                        help="most recently seen first")
+    search.add_argument('--limit', type=int, default=20)
+    ingest = commands.add_parser('ingest', help="archive a saved run (e.g. an old workflow artifact)")
+    ingest.add_argument('raw', help="raw_data.ndjson or raw_data.json")
+    ingest.add_argument('summary', nargs='?', help="summary.json of the same run, to mark delivered stories")
+    commands.add_parser('stats', help="runs and stories in the archive")
+    args = parser.parse_args()
+
+    archive = BriefArchive(args.archive)
+    try:
+        if args.command == 'search':
+            start = time.perf_counter()
+            results = archive.search(' '.join(args.query), args.since, args.until, args.source, args.section,
+                                     args.delivered, args.order, args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for r in results:
+                first = datetime.fromtimestamp(r['first_seen']).strftime('%Y-%m-%d')
+                last = datetime.fromtimestamp(r['last_seen']).strftime('%Y-%m-%d')
+                seen = f"{first}" + (f"..{last}" if last != first else '')
+                print(f"{seen:<22} {r['source'][:18]:<18} {r['runs']:>3} runs {r['delivered_runs']:>3} sent  "
+                      f"{r['title'][:70]}\n{'':<22} {r['url'] or ''}")
+            print(f"🔎 {len(results)} result(s) in {elapsed:.1f} ms")
+        elif args.command == 'ingest':
+            import json
+            from summarizer import load_raw_data, summary_items
+            raw_data = load_raw_data(args.raw)
+            delivered = []
+            if args.summary:
+                with open(args.summary, 'r', encoding='utf-8') as f:
+                    delivered = summary_items(json.load(f))
+            run_at = _epoch(raw_data.get('timestamp')) or os.path.getmtime(args.raw)
+            run_id = raw_data.get('timestamp') or datetime.fromtimestamp(run_at).isoformat(timespec='seconds')
+            new = archive.add_run(run_id, raw_data, delivered, run_at)
+            print(f"🗄️  Archived run {run_id}: {new} new stories")
+        else:
+            for key, value in archive.stats().items():
+                print(f"{key:<12} {value}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: archive ingest per run and search latency over years of daily runs
+
+Each synthetic run carries ~300 stories, about a third of them seen in an
+earlier run (as front-page stories linger). Title words follow a Zipf-like
+distribution over a 5,000-word vocabulary: filler words at the head, then
+real tech-news words that each land in ~1% of titles, so every benchmark
+query matches thousands of stories. Ingest time per run should stay flat as
+the archive grows.
+
+Usage: python benchmarks/bench_archive.py [--runs 1095] [--stories 300]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from archive import BriefArchive  # noqa: E402
+
+SECTIONS = {'tech_news': ['hackernews'], 'ai_ml': ['r_machinelearning', 'r_localllama'],
+            'startups': ['r_startups'], 'world_news': ['newsapi']}
+SOURCES = {'hackernews': 'HackerNews', 'r_machinelearning': 'r/MachineLearning', 'r_localllama': 'r/LocalLLaMA',
+           'r_startups': 'r/startups', 'newsapi': 'Reuters'}
+WORDS = ('rust python kubernetes postgres sqlite llama transformer gpu startup funding layoffs election '
+         'climate compiler browser security breach open source release benchmark database agent model '
+         'inference training chip apple google microsoft openai regulation privacy energy battery').split()
+FILLER = [f"term{n}" for n in range(5000 - len(WORDS))]
+VOCABULARY = FILLER[:100] + WORDS + FILLER[100:]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+START = 1672531200.0  # 2023-01-01
+
+
+def synthetic_run(day: int, stories: int, rng: random.Random) -> dict:
+    raw = {'timestamp': None}
+    per_key = stories // sum(len(keys) for keys in SECTIONS.values())
+    for section, keys in SECTIONS.items():
+        raw[section] = {}
+        for key in keys:
+            items = []
+            for n in range(per_key):
+                # a third of each run repeats stories from the previous few days
+                origin = day - rng.randint(1, 3) if n % 3 == 0 and day > 3 else day
+                story = f"{key}-{origin}-{n}"
+                title = ' '.join(random.Random(story).choices(VOCABULARY, WEIGHTS, k=7)).capitalize()
+                items.append({'id': story, 'title': title, 'url': f"https://example.com/{story}",
+                              'score': rng.randint(1, 3000), 'comments': rng.randint(0, 500),
+                              'source': SOURCES[key]})
+            raw[section][key] = items
+    return raw
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3 * 365)
+    parser.add_argument('--stories', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.sqlite')
+        archive = BriefArchive(path)
+        ingest = []
+        for day in range(args.runs):
+            raw = synthetic_run(day, args.stories, rng)
+            delivered = [item for section in SECTIONS for items in raw[section].values() for item in items[:5]]
+            start = time.perf_counter()
+            archive.add_run(f"run-{day}", raw, delivered, START + day * 86400)
+            ingest.append(time.perf_counter() - start)
+        first, last = ingest[:30], ingest[-30:]
+        stats = archive.stats()
+        print(f"{stats['runs']:,} runs, {stats['stories']:,} stories, {stats['appearances']:,} appearances, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"ingest per run: median {statistics.median(ingest) * 1000:.1f} ms | "
+              f"first 30 runs {statistics.median(first) * 1000:.1f} ms | "
+              f"last 30 runs {statistics.median(last) * 1000:.1f} ms")
+
+        queries = [
+            ('keyword', dict(query='rust compiler')),
+            ('prefix', dict(query='kube* postgres')),
+            ('keyword + source', dict(query='llama inference', source='r/')),
+            ('keyword + dates', dict(query='election', since='2024-01-01', until='2024-03-31')),
+            ('first sighting', dict(query='openai regulation', order='first', limit=1)),
+            ('delivered only', dict(query='gpu', delivered=True)),
+            ('no keywords, recent', dict(source='HackerNews', order='recent')),
+        ]
+        for name, kwargs in queries:
+            times = []
+            for _ in range(20):
+                start = time.perf_counter()
+                results = archive.search(**kwargs)
+                times.append(time.perf_counter() - start)
+            print(f"{name:<22} median {statistics.median(times) * 1000:6.2f} ms  ({len(results)} results)")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass KeywordClassifier vs one filter_by_keywords scan per category
+
+Usage: python benchmarks/bench_classifier.py [--sizes 10000,100000,1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scraper import IntelligenceScraper, HN_CLASSIFIER, AI_KW, STARTUP_KW, JOB_KW, WORLD_KW  # noqa: E402
+
+CATEGORIES = {'ai_ml': AI_KW, 'startups': STARTUP_KW, 'remote_jobs': JOB_KW, 'world_news': WORLD_KW}
+FILLER = (
+    "the a new how why we our is for of to in on with from using building open source "
+    "rust python linux database browser kernel compiler release performance design "
+    "security privacy hardware chip memory network server cloud app mobile web"
+).split()
+
+
+def synthetic_pool(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    keywords = [kw for kws in CATEGORIES.values() for kw in kws]
+    pool = []
+    for i in range(n):
+        words = rng.choices(FILLER, k=rng.randint(5, 11))
+        if rng.random() < 0.35:
+            kw = rng.choice(keywords)
+            words.insert(rng.randint(0, len(words)), kw.upper() if rng.random() < 0.2 else kw)
+        pool.append({'title': ' '.join(words).capitalize(), 'score': i, 'source': 'HackerNews'})
+    return pool
+
+
+def bench(n: int):
+    pool = synthetic_pool(n)
+    limits = {category: n for category in CATEGORIES}
+    scraper = IntelligenceScraper(use_cache=False)
+
+    start = time.perf_counter()
+    baseline = {cat: scraper.filter_by_keywords(pool, kws, n) for cat, kws in CATEGORIES.items()}
+    baseline_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = HN_CLASSIFIER.select(pool, limits)
+    single_s = time.perf_counter() - start
+
+    assert baseline == single, "classifier results differ from filter_by_keywords"
+    print(f"{n:>10,} titles | filter_by_keywords x4: {baseline_s:8.3f}s | "
+          f"KeywordClassifier: {single_s:8.3f}s | speedup {baseline_s / single_s:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000', help="comma-separated pool sizes")
+    args = parser.parse_args()
+    for n in (int(x) for x in args.sizes.split(',')):
+        bench(n)
+
+
+if __name__ == "__main__":
+    main()
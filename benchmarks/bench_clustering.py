@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MinHash/LSH near-duplicate clustering throughput and accuracy
+
+Usage: python benchmarks/bench_clustering.py [--titles 100000] [--threshold 0.7]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from summarizer import NearDuplicateClusterer  # noqa: E402
+
+
+def synthetic_titles(n: int, dup_rate: float = 0.1, seed: int = 3):
+    """n items; about dup_rate of them are reworded copies of another item"""
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(20000)]
+    items, origin = [], []
+    while len(items) < n:
+        base = rng.choices(vocab, k=rng.randint(7, 11))
+        story = len(origin) and origin[-1] + 1
+        items.append({'title': ' '.join(base).capitalize(), 'source': 'HackerNews', 'score': rng.randint(1, 999)})
+        origin.append(story)
+        if rng.random() < dup_rate and len(items) < n:
+            variant = list(base)
+            edit = rng.choice(('suffix', 'plural', 'case', 'drop'))
+            source = 'r/worldnews'
+            if edit == 'suffix':
+                source = 'Reuters'
+                variant.append('- Reuters')
+            elif edit == 'plural':
+                variant[rng.randrange(len(variant))] += 's'
+            elif edit == 'drop':
+                del variant[rng.randrange(len(variant))]
+            title = ' '.join(variant)
+            items.append({'title': title.upper() if edit == 'case' else title, 'source': source, 'score': 500})
+            origin.append(story)
+    return items, origin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--threshold', type=float, default=0.7)
+    args = parser.parse_args()
+
+    items, origin = synthetic_titles(args.titles)
+    planted = len(items) - len(set(origin))
+
+    clusterer = NearDuplicateClusterer(args.threshold)
+    start = time.perf_counter()
+    clusters = clusterer.clusters(items)
+    elapsed = time.perf_counter() - start
+
+    found = sum(len(c) - 1 for c in clusters if len({origin[i] for i in c}) == 1)
+    false_merges = sum(1 for c in clusters if len({origin[i] for i in c}) > 1)
+    print(f"{len(items):>10,} titles | {elapsed:6.2f}s ({len(items) / elapsed:,.0f} titles/s) | "
+          f"bands={clusterer.bands} rows={clusterer.rows} | recall {found}/{planted} "
+          f"({found / max(planted, 1):.1%}) | false merges {false_merges}")
+
+
+if __name__ == "__main__":
+    main()
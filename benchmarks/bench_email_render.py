@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precompiled email templates vs per-call f-string rendering, and the fragment cache
+
+Every scenario renders the same briefs with the previous, unescaped f-string
+renderer and with the escaping templates (fragment cache on). `distinct`
+briefs share no section, the worst case; `variants` differ from the global
+brief in a single section, as personalized or per-edition briefs do, and
+are also rendered with the fragment cache off.
+
+Usage: python benchmarks/bench_email_render.py [--briefs 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from email_sender import EmailGenerator  # noqa: E402
+from email_template import FRAGMENTS, PAGE_CSS  # noqa: E402
+
+
+def synthetic_summary(seed: int = 0) -> dict:
+    def items(prefix, n):
+        # roughly one title in ten needs escaping, as with real HN/Reddit headlines
+        return [{'title': f'{prefix} story {seed}-{i}' + (' & <friends>' if i % 10 == 3 else ''),
+                 'url': f'https://example.com/{prefix}/{i}',
+                 'score': 100 + i, 'comments': i, 'source': 'HackerNews'} for i in range(n)]
+    repos = [{'name': f'owner/repo-{i}', 'description': 'A repo', 'url': f'https://github.com/owner/repo-{i}',
+              'stars': 1000 - i, 'language': 'Python'} for i in range(3)]
+    return {
+        'date': 'Friday, January 02, 2026', 'time_generated': '07:00 WIB',
+        'sections': {
+            'tech_news': {'title': '💻 Tech & Development', 'items': items('tech', 8)},
+            'ai_ml': {'title': '🤖 AI & Machine Learning', 'discussions': items('ai', 6), 'trending_repos': repos},
+            'startups': {'title': '🚀 Startups & Business', 'items': items('startup', 5)},
+            'remote_jobs': {'title': '💼 Remote Opportunities', 'items': items('jobs', 6)},
+            'world_news': {'title': '🌍 World News', 'items': items('world', 5)},
+        },
+        'insights': ['📈 Focus areas today', '🎯 Action items', '💡 Remember'],
+    }
+
+
+class LegacyEmailGenerator(EmailGenerator):
+    """The previous renderer: whole page as one f-string, item cards built with += per section"""
+
+    def generate_html_email(self) -> str:
+        return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+{PAGE_CSS}    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>☀️ Morning Intelligence Brief</h1>
+            <div class="date">{self.summary['date']} • Generated at {self.summary['time_generated']}</div>
+        </div>
+        {self._legacy_items('tech_news', 'items', 8)}
+        {self._legacy_ai_ml()}
+        {self._legacy_items('startups', 'items', 5)}
+        {self._legacy_items('remote_jobs', 'items', 6)}
+        {self._legacy_items('world_news', 'items', 5)}
+        <div class="insights">
+            <h3>💡 Key Insights for Today</h3>
+            <ul>
+                {"".join([f"<li>{insight}</li>" for insight in self.summary.get('insights', [])])}
+            </ul>
+        </div>
+    </div>
+</body>
+</html>
+        """
+
+    def _legacy_cards(self, items, limit):
+        items_html = ""
+        for item in items[:limit]:
+            items_html += f"""
+            <div class="item">
+                <div class="item-title">
+                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
+                </div>
+                <div class="item-meta">
+                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments
+                </div>
+            </div>
+            """
+        return items_html
+
+    def _legacy_items(self, name, key, limit):
+        section = self.summary['sections'][name]
+        return f"""
+        <div class="section">
+            <div class="section-title">{section['title']}</div>
+            {self._legacy_cards(section[key], limit)}
+        </div>
+        """
+
+    def _legacy_ai_ml(self):
+        ai_ml = self.summary['sections']['ai_ml']
+        repos_html = ""
+        for repo in ai_ml.get('trending_repos', [])[:3]:
+            repos_html += f"""
+            <div class="repo">
+                <div class="repo-name">
+                    <a href="{repo.get('url', '#')}" target="_blank">⭐ {repo.get('name', 'Unknown')}</a>
+                </div>
+                <div class="repo-desc">{repo.get('description', 'No description')}</div>
+                <div class="repo-meta">⭐ {repo.get('stars', 0)} stars • {repo.get('language', 'Unknown')}</div>
+            </div>
+            """
+        return f"""
+        <div class="section">
+            <div class="section-title">{ai_ml['title']}</div>
+            {self._legacy_cards(ai_ml['discussions'], 6)}
+            {f'<h4>🔥 Trending Repositories</h4>{repos_html}' if repos_html else ''}
+        </div>
+        """
+
+
+def variant_summaries(n: int, distinct: int = 50) -> list:
+    """`n` briefs: the global summary with tech_news swapped for one of `distinct` subscriber picks"""
+    base = synthetic_summary()
+    picks = [synthetic_summary(1000 + i)['sections']['tech_news'] for i in range(distinct)]
+    return [{**base, 'sections': {**base['sections'], 'tech_news': picks[i % distinct]}} for i in range(n)]
+
+
+def bench(cls, summaries) -> float:
+    start = time.perf_counter()
+    for summary in summaries:
+        cls(summary=summary).generate_html_email()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--briefs', type=int, default=2000, help="number of briefs to render per scenario")
+    args = parser.parse_args()
+
+    scenarios = (('distinct', [synthetic_summary(i) for i in range(args.briefs)]),
+                 ('variants', variant_summaries(args.briefs)),
+                 ('shared', [synthetic_summary()] * args.briefs))
+    for label, summaries in scenarios:
+        FRAGMENTS.clear()
+        legacy_s = bench(LegacyEmailGenerator, summaries)
+        templates_s = bench(EmailGenerator, summaries)
+        print(f"{args.briefs:>8,} {label:>8} briefs | f-string (unescaped): {args.briefs / legacy_s:8,.0f}/s | "
+              f"templates (escaped): {args.briefs / templates_s:8,.0f}/s | ratio {legacy_s / templates_s:4.2f}x")
+
+    variants = scenarios[1][1]
+    cache_size = FRAGMENTS.max_bytes
+    timings = {}
+    for label, max_bytes in (('off', 0), ('on', cache_size)):
+        FRAGMENTS.clear()
+        FRAGMENTS.max_bytes = max_bytes
+        FRAGMENTS.hits = FRAGMENTS.misses = FRAGMENTS.evictions = 0
+        timings[label] = bench(EmailGenerator, variants)
+    stats = FRAGMENTS.stats()
+    print(f"{args.briefs:>8,} variants     | fragment cache off: {args.briefs / timings['off']:8,.0f}/s | "
+          f"on: {args.briefs / timings['on']:8,.0f}/s | ratio {timings['off'] / timings['on']:4.2f}x | "
+          f"{stats['hits']:,} hits, {stats['misses']:,} misses, {stats['fragments']} fragments "
+          f"in {stats['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
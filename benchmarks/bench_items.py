@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory of 1M stories as JSON dicts vs slotted Items vs a columnar ItemBatch
+
+Stories are parsed from NDJSON lines, as the summarizer reads raw data, so
+every dict holds its own copy of each source name; Items intern them and
+the batch stores them as 2-byte codes.
+
+Usage: python benchmarks/bench_items.py [--items 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from items import Item, ItemBatch  # noqa: E402
+
+SOURCES = ['HackerNews', 'r/MachineLearning', 'r/LocalLLaMA', 'r/startups', 'r/worldnews', 'Reuters', 'BBC News']
+
+
+def ndjson_lines(n: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        source = rng.choice(SOURCES)
+        item = {'id': i, 'title': f"Story number {i} about something", 'url': f"https://example.com/{i}",
+                'score': rng.randint(0, 3000), 'comments': rng.randint(0, 900), 'source': source,
+                'created': 1767225600 + i}
+        if source.startswith('r/'):
+            item['subreddit'] = source[2:]
+        lines.append(json.dumps(item))
+    return lines
+
+
+def measure(build, lines: list):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(lines)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    lines = ndjson_lines(args.items)
+    builds = {
+        'dicts': lambda ls: [json.loads(line) for line in ls],
+        'Items (__slots__)': lambda ls: [Item.from_dict(json.loads(line)) for line in ls],
+        'ItemBatch (columnar)': lambda ls: ItemBatch.from_dicts(json.loads(line) for line in ls),
+    }
+    baseline = None
+    for name, build in builds.items():
+        result, size, elapsed = measure(build, lines)
+        baseline = baseline or size
+        print(f"{name:<22} {size / 1e6:8.1f} MB  ({size / args.items:6.0f} B/item, "
+              f"{size / baseline:4.0%} of dicts) | built in {elapsed:5.2f}s")
+        if name.startswith('ItemBatch'):
+            assert result.to_dicts()[:1000] == [json.loads(line) for line in lines[:1000]], "round trip differs"
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one-pass inverted-index personalization vs one pool scan per subscriber
+
+The per-subscriber baseline is timed on a sample of profiles and scaled up
+to the full profile count; its picks for the sample must match exactly.
+
+Usage: python benchmarks/bench_personalization.py [--profiles 10000] [--items 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from personalization import Personalizer, SubscriberProfile  # noqa: E402
+from summarizer import SECTION_LIMITS, DedupIndex  # noqa: E402
+
+SUBREDDITS = ['machinelearning', 'localllama', 'startups', 'remotework', 'forhire', 'worldnews', 'geopolitics']
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return list(dict.fromkeys(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)))
+
+
+def synthetic_candidates(n_items: int, vocab: list, rng: random.Random) -> dict:
+    candidates = {section: [] for section in SECTION_LIMITS}
+    for i in range(n_items):
+        section = rng.choice(list(SECTION_LIMITS))
+        words = rng.choices(vocab, k=rng.randint(5, 12), weights=[1 / (r + 1) for r in range(len(vocab))])
+        item = {'id': i, 'title': ' '.join(words).capitalize(), 'url': f'https://example.com/{i}',
+                'score': rng.randint(0, 3000), 'source': 'HackerNews'}
+        if rng.random() < 0.4:
+            item['subreddit'] = rng.choice(SUBREDDITS)
+            item['source'] = f"r/{item['subreddit']}"
+        candidates[section].append(item)
+    for items in candidates.values():
+        items.sort(key=lambda x: x['score'], reverse=True)
+    return candidates
+
+
+def synthetic_profiles(n_profiles: int, vocab: list, rng: random.Random) -> list:
+    profiles = []
+    for i in range(n_profiles):
+        keywords = rng.sample(vocab, rng.randint(3, 8))
+        subreddits = rng.sample(SUBREDDITS, rng.randint(0, 2))
+        mute = rng.sample(list(SECTION_LIMITS), rng.choice([0, 0, 0, 1]))
+        profiles.append(SubscriberProfile(f'user{i}@example.com', keywords, subreddits, mute))
+    return profiles
+
+
+def naive_pick(profile: SubscriberProfile, candidates: dict, lowered: dict) -> dict:
+    """What running the selection once per subscriber does: scan every section's pool"""
+    picks, seen = {}, set()
+    subreddits = set(profile.subreddits)
+    for section, items in candidates.items():
+        if section in profile.mute:
+            continue
+        for item in items:
+            title = lowered[id(item)]
+            if not (any(kw in title for kw in profile.keywords) or (item.get('subreddit') or '') in subreddits):
+                continue
+            keys = DedupIndex.keys(item)
+            if keys in seen:
+                continue
+            seen.add(keys)
+            chosen = picks.setdefault(section, [])
+            chosen.append(item)
+            if len(chosen) >= SECTION_LIMITS[section]:
+                break
+    return picks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=10_000)
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--vocab', type=int, default=3_000)
+    parser.add_argument('--sample', type=int, default=200, help="profiles timed with the per-subscriber scan")
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    vocab = vocabulary(args.vocab, rng)
+    candidates = synthetic_candidates(args.items, vocab, rng)
+    profiles = synthetic_profiles(args.profiles, vocab, rng)
+
+    start = time.perf_counter()
+    personalizer = Personalizer(profiles)
+    index_s = time.perf_counter() - start
+    start = time.perf_counter()
+    picks = personalizer.pick(candidates)
+    pick_s = time.perf_counter() - start
+
+    lowered = {id(item): item['title'].lower() for items in candidates.values() for item in items}
+    sample = rng.sample(range(len(profiles)), min(args.sample, len(profiles)))
+    start = time.perf_counter()
+    for idx in sample:
+        assert naive_pick(profiles[idx], candidates, lowered) == picks[idx], f"picks differ for profile {idx}"
+    naive_s = (time.perf_counter() - start) * len(profiles) / len(sample)
+
+    print(f"{args.profiles:,} profiles x {args.items:,} items | per-subscriber scan: {naive_s:8.2f}s (est.) | "
+          f"inverted index: {index_s + pick_s:6.2f}s (index {index_s:.2f}s + pass {pick_s:.2f}s) | "
+          f"speedup {naive_s / (index_s + pick_s):5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
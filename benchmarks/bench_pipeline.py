@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the whole pipeline offline, against recorded upstream responses and an SMTP sink
+
+Each run builds a fresh scraper and goes scrape -> summarize -> render ->
+deliver through main.run_pipeline, with every HTTP request answered by the
+local fake upstream and mail swallowed by the local sink. Reports the median
+end-to-end and per-stage wall time, requests per upstream, SMTP traffic and
+(from one extra traced run) peak Python memory. Results can be saved as a
+baseline and later runs compared against it.
+
+Usage:
+  python benchmarks/bench_pipeline.py [--runs 5] [--pipeline streaming] [--latency hn=0.02,reddit=0.15]
+                                      [--error-rate 0.02] [--recipients 50]
+  python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+  python benchmarks/bench_pipeline.py --compare benchmarks/baseline.json [--tolerance 0.2]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_upstream import FIXTURES, FakeUpstream, SmtpSink, load_fixtures, parse_latency  # noqa: E402
+
+# Timings shorter than this are reported but never flagged as regressions (pure noise)
+MIN_SECONDS = 0.005
+# Metrics that can fail a comparison; per-source timings mostly measure injected latency jitter
+GATED = ('wall_s', 'stage.', 'peak_mem_mb')
+
+
+def run_once(pipeline_args, upstream: FakeUpstream, sink: SmtpSink, verbose: bool) -> dict:
+    import main
+    from instrumentation import RECORDER
+    from scraper import IntelligenceScraper
+
+    upstream.reset_counts()
+    sink.reset_counts()
+    args = main.parse_args(pipeline_args)
+    out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with out:
+        start = time.perf_counter()
+        scraper = IntelligenceScraper(use_cache=args.cache, incremental=args.incremental)
+        try:
+            main.run_pipeline(args, scraper, main.load_recipients(args), args.profiles)
+        finally:
+            scraper.close()
+        wall = time.perf_counter() - start
+    report = RECORDER.report()
+    metrics = {'wall_s': wall}
+    metrics.update({f'stage.{name}_s': seconds for name, seconds in report['stages'].items()})
+    metrics.update({f'source.{name}_s': source['duration_s'] for name, source in report['sources'].items()})
+    for name, counts in upstream.counts.items():
+        metrics[f'requests.{name}'] = sum(counts.values())
+        metrics[f'errors.{name}'] = sum(n for status, n in counts.items() if status != '200')
+    metrics['http.retries'] = sum(host['retries'] for host in report['http'].values())
+    metrics['smtp.connections'] = sink.connections
+    metrics['smtp.messages'] = sink.messages
+    metrics['smtp.bytes'] = sink.bytes
+    return metrics
+
+
+def peak_memory(pipeline_args, upstream: FakeUpstream, sink: SmtpSink) -> float:
+    """Peak traced Python allocations (MB) of one run; traced separately, tracing slows everything"""
+    tracemalloc.start()
+    try:
+        run_once(pipeline_args, upstream, sink, verbose=False)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print metric deltas against `baseline`; True if any timing or memory regressed beyond `tolerance`"""
+    if baseline.get('config') != result['config']:
+        print(f"⚠️  Baseline was recorded with a different config: {baseline.get('config')}")
+    regressed = False
+    print(f"\n{'metric':<36} {'baseline':>12} {'now':>12} {'change':>9}")
+    for name in sorted(set(result['metrics']) | set(baseline['metrics'])):
+        old, new = baseline['metrics'].get(name), result['metrics'].get(name)
+        if old is None or new is None:
+            print(f"{name:<36} {_fmt(old):>12} {_fmt(new):>12} {'(new)' if old is None else '(gone)':>9}")
+            continue
+        change = (new - old) / old if old else 0.0
+        timed = name.endswith('_s') or name.endswith('_mb')
+        flag = ''
+        if name.startswith(GATED) and change > tolerance and max(old, new) >= MIN_SECONDS:
+            flag, regressed = ' ❌', True
+        elif not timed and new != old:
+            flag = ' *'
+        print(f"{name:<36} {_fmt(old):>12} {_fmt(new):>12} {change:>+8.0%}{flag}")
+    return regressed
+
+
+def _median(values: list):
+    # counts stay whole numbers
+    return statistics.median_low(values) if all(isinstance(v, int) for v in values) else statistics.median(values)
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return '-'
+    return f"{value:.4f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--pipeline', choices=['staged', 'streaming'], default='staged')
+    parser.add_argument('--recipients', type=int, default=1,
+                        help="1 goes through EmailGenerator.send_email, more through the SMTP pool")
+    parser.add_argument('--latency', default='hn=0.02,reddit=0.15,github=0.1,newsapi=0.1',
+                        help="fake upstream latency in seconds: 0.05 or hn=0.02,reddit=0.2")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of upstream responses that are 503s")
+    parser.add_argument('--smtp-latency', type=float, default=0.0, help="seconds per SMTP command at the sink")
+    parser.add_argument('--cache', action='store_true', help="keep the HTTP cache on (later runs are warm)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the extra tracemalloc run")
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before a metric is flagged")
+    parser.add_argument('--verbose', action='store_true', help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    config = {'pipeline': args.pipeline, 'recipients': args.recipients, 'latency': args.latency,
+              'error_rate': args.error_rate, 'smtp_latency': args.smtp_latency, 'cache': args.cache}
+    upstream = FakeUpstream(load_fixtures(args.fixtures), parse_latency(args.latency), args.error_rate).start()
+    sink = SmtpSink(latency=args.smtp_latency).start()
+    os.environ.pop('RECIPIENT_EMAIL', None)
+    os.environ.update({**upstream.env(), **sink.env(), 'SMTP_EMAIL': 'bench@example.com',
+                       'SMTP_PASSWORD': 'bench', 'NEWS_API_KEY': 'bench', 'GITHUB_TOKEN': 'bench',
+                       'HTTP_CACHE': '1' if args.cache else '0'})
+    pipeline_args = ['--pipeline', args.pipeline, '--no-report', '--delivery', 'direct',
+                     *[f'reader{i}@example.com' for i in range(args.recipients)]]
+
+    baseline_out = args.save_baseline and os.path.abspath(args.save_baseline)
+    baseline_in = args.compare and os.path.abspath(args.compare)
+    workdir = tempfile.mkdtemp(prefix='brief-bench-')
+    os.chdir(workdir)  # the pipeline writes data/* relative to the working directory
+    try:
+        runs = [run_once(pipeline_args, upstream, sink, args.verbose) for _ in range(args.runs)]
+        metrics = {name: _median([run[name] for run in runs if name in run])
+                   for name in dict.fromkeys(name for run in runs for name in run)}
+        if not args.no_memory:
+            metrics['peak_mem_mb'] = peak_memory(pipeline_args, upstream, sink)
+    finally:
+        upstream.stop()
+        sink.stop()
+
+    print(f"{args.runs} runs ({args.pipeline}, {args.recipients} recipient(s), latency {args.latency}, "
+          f"error rate {args.error_rate:.0%}), medians:")
+    for name, value in metrics.items():
+        print(f"  {name:<34} {_fmt(value)}")
+    result = {'config': config, 'runs': args.runs, 'metrics': metrics}
+
+    if baseline_out:
+        with open(baseline_out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+    if baseline_in:
+        with open(baseline_in, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.tolerance):
+            print(f"\n❌ Regression beyond {args.tolerance:.0%} against {args.compare}")
+            sys.exit(1)
+        print(f"\n✅ Within {args.tolerance:.0%} of {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
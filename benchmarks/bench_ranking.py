@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cross-source ranking of a 1M-story pool, NumPy columns vs pure Python
+
+Also times the raw-score sort the summarizer used before (one Python key
+lambda per item) for reference, and checks both ranking paths agree.
+
+Usage: python benchmarks/bench_ranking.py [--items 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from items import ItemBatch  # noqa: E402
+from ranking import Ranker, np  # noqa: E402
+
+SOURCES = ['HackerNews', 'r/MachineLearning', 'r/LocalLLaMA', 'r/startups', 'r/worldnews', 'Reuters', 'BBC News']
+NOW = 1767225600.0
+
+
+def synthetic_pool(n: int, seed: int = 9) -> list:
+    rng = random.Random(seed)
+    pool = []
+    for i in range(n):
+        source = rng.choice(SOURCES)
+        pool.append({'id': i, 'title': f"Story {i}", 'url': f"https://example.com/{i}", 'source': source,
+                     'score': 500 if source in ('Reuters', 'BBC News') else int(rng.paretovariate(1.2) * 10),
+                     'comments': rng.randint(0, 900), 'created': NOW - rng.uniform(0, 72 * 3600)})
+    return pool
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pool = synthetic_pool(args.items)
+    _, raw_s = timed(lambda: sorted(pool, key=lambda x: x.get('score', 0), reverse=True))
+    batch, batch_s = timed(lambda: ItemBatch.from_dicts(pool))
+    python_order, python_s = timed(lambda: Ranker(use_numpy=False).order(batch, NOW))
+    print(f"{args.items:,} items | raw-score sort {raw_s:6.2f}s | to ItemBatch {batch_s:6.2f}s | "
+          f"ranked, pure Python {python_s:6.2f}s", end='')
+    if np is None:
+        print(" | NumPy not installed")
+        return
+    numpy_order, numpy_s = timed(lambda: Ranker(use_numpy=True).order(batch, NOW))
+    top = min(1000, args.items)
+    assert numpy_order[:top] == python_order[:top], "NumPy and Python rankings differ"
+    print(f" | ranked, NumPy {numpy_s:6.2f}s | speedup {python_s / numpy_s:5.1f}x")
+    top_sources = [pool[i]['source'] for i in numpy_order[:100]]
+    print("Sources in the top 100: " + ', '.join(f"{s} {top_sources.count(s)}" for s in SOURCES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: top-k selection + shared dedup index vs full sort per section in IntelligenceSummarizer
+
+Both sides rank by the same composite (or, with RANKING=raw, raw score)
+order; the legacy side sorts each whole pool, the current one only selects
+and orders the winners.
+
+Usage: python benchmarks/bench_summarizer.py [--items 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from summarizer import IntelligenceSummarizer  # noqa: E402
+
+LAYOUT = {
+    'tech_news': ['hackernews_top'],
+    'ai_ml': ['hackernews_ai', 'github_python', 'github_ai_topic', 'r_machinelearning', 'r_localllama'],
+    'startups': ['hackernews_startup', 'r_startups'],
+    'remote_jobs': ['hackernews_jobs', 'r_remotework', 'r_forhire'],
+    'world_news': ['hackernews_world', 'r_worldnews', 'r_geopolitics'],
+}
+
+
+def synthetic_raw_data(n_items: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    keys = [(section, key) for section, ks in LAYOUT.items() for key in ks]
+    raw = {'timestamp': '2026-01-01T07:00:00', **{section: {} for section in LAYOUT}}
+    for i in range(n_items):
+        section, key = rng.choice(keys)
+        if key.startswith('github'):
+            item = {'name': f'owner/repo-{i}', 'description': 'x', 'url': f'https://github.com/owner/repo-{i}',
+                    'stars': rng.randint(20, 5000), 'language': 'Python', 'source': 'GitHub'}
+        else:
+            source = 'HackerNews' if key.startswith('hackernews') else f"r/{key[2:]}"
+            item = {'id': i, 'title': f'Story number {i} in {section}', 'url': f'https://example.com/{section}/{i}',
+                    'score': rng.randint(0, 3000), 'comments': rng.randint(0, 500), 'source': source}
+            if source.startswith('r/'):
+                item['subreddit'] = key[2:]
+        raw[section].setdefault(key, []).append(item)
+    return raw
+
+
+class LegacySummarizer(IntelligenceSummarizer):
+    """The pre-top-k algorithm: full sort per section, exact lowercase-title dedup"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._used_titles = set()
+
+    def extract_top_items(self, items, key='score', limit=5):
+        if not items:
+            return []
+        result = []
+        ordered = self.rank(items) if key is None else sorted(items, key=lambda x: x.get(key, 0), reverse=True)
+        for item in ordered:
+            title = item.get('title', '').strip().lower()
+            if not title or title in self._used_titles:
+                continue
+            self._used_titles.add(title)
+            if item.get('subreddit') in ('N/A', '', None):
+                item.pop('subreddit', None)
+            result.append(item)
+            if len(result) >= limit:
+                break
+        return result
+
+    def summarize_ai_ml(self):
+        section = super().summarize_ai_ml()
+        repos = [r for k, v in self.raw_data['ai_ml'].items() if 'github' in k for r in v]
+        section['trending_repos'] = sorted(repos, key=lambda x: x.get('stars', 0), reverse=True)[:3]
+        return section
+
+
+def timed(cls, path: str, repeat: int):
+    best, summary = float('inf'), None
+    for _ in range(repeat):
+        summarizer = cls(path, near_dup_threshold=0)  # time top-k selection only
+        start = time.perf_counter()
+        summary = summarizer.generate_summary()
+        best = min(best, time.perf_counter() - start)
+    return best, summary['sections']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'raw_data.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(synthetic_raw_data(args.items), f)
+
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            legacy_s, legacy = timed(LegacySummarizer, path, args.repeat)
+            heap_s, heap = timed(IntelligenceSummarizer, path, args.repeat)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    assert legacy == heap, "top-k summary differs from the full-sort summary"
+    print(f"{args.items:>10,} items | full sort: {legacy_s * 1000:8.1f} ms | "
+          f"top-k: {heap_s * 1000:8.1f} ms | speedup {legacy_s / heap_s:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for every upstream the pipeline talks to, for offline benchmarks
+
+FakeUpstream replays recorded HackerNews, Reddit, GitHub and NewsAPI
+responses (benchmarks/fixtures/upstream.json) over keep-alive HTTP, with
+per-upstream latency and random 503s injected. SmtpSink accepts any login
+and swallows every message. Point the scraper and mailer at them with
+`env()`.
+
+Usage:
+  python benchmarks/fake_upstream.py serve [--latency hn=0.02,reddit=0.2] [--error-rate 0.05]
+  python benchmarks/fake_upstream.py record       # live responses -> fixtures (needs network)
+  python benchmarks/fake_upstream.py synthesize   # deterministic stand-in fixtures
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'upstream.json')
+
+# Upstream name -> (live host, environment variable of its base URL, path prefix of that base)
+UPSTREAMS = {
+    'hn': ('hacker-news.firebaseio.com', 'HN_API_BASE', '/v0'),
+    'reddit': ('www.reddit.com', 'REDDIT_BASE', ''),
+    'github': ('api.github.com', 'GITHUB_API_BASE', ''),
+    'newsapi': ('newsapi.org', 'NEWS_API_BASE', '/v2'),
+}
+
+# Query parameters that select a different response; everything else (limits, dates, keys) is ignored
+KEY_PARAMS = ('q', 'category')
+
+
+def fixture_key(path: str, query: Dict[str, str]) -> str:
+    """Lookup key of a request: its path plus the response-selecting query parameters"""
+    parts = []
+    for name in KEY_PARAMS:
+        if name in query:
+            # GitHub searches embed a rolling "created:>DATE" window (GraphQL ones also a sort qualifier)
+            value = ' '.join(t for t in query[name].split() if not t.startswith(('created:', 'sort:')))
+            parts.append(f"{name}={value}")
+    return path + ('?' + '&'.join(parts) if parts else '')
+
+
+def load_fixtures(path: str = FIXTURES) -> Dict[str, Dict[str, object]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['responses']
+
+
+def parse_latency(spec: str) -> Dict[str, float]:
+    """"0.05" (every upstream) or "hn=0.02,reddit=0.2" -> seconds per upstream"""
+    if '=' not in spec:
+        return dict.fromkeys(UPSTREAMS, float(spec or 0))
+    latency = dict.fromkeys(UPSTREAMS, 0.0)
+    for part in filter(None, spec.split(',')):
+        name, _, seconds = part.partition('=')
+        latency[name.strip()] = float(seconds)
+    return latency
+
+
+def multireddit(responses: Dict[str, object], path: str, query: Dict[str, str]) -> Dict:
+    """A combined r/a+b/hot.json page built from the recorded single-subreddit listings
+
+    Listings are interleaved by position, so each subreddit keeps its own
+    hot order as on Reddit, and paged with `limit`/`after` like the real one.
+    """
+    subs = path.split('/')[2].split('+')
+    ranked = []
+    for order, sub in enumerate(subs):
+        listing = responses.get(f'/r/{sub}/hot.json') or {}
+        for rank, child in enumerate(listing.get('data', {}).get('children', [])):
+            data = {'subreddit': sub, **child['data']}
+            ranked.append(((rank, order), {**child, 'data': {**data, 'name': data.get('name') or f"t3_{data['id']}"}}))
+    children = [child for _, child in sorted(ranked, key=lambda pair: pair[0])]
+    start = 0
+    if query.get('after'):
+        names = [c['data']['name'] for c in children]
+        start = names.index(query['after']) + 1 if query['after'] in names else len(children)
+    page = children[start:start + int(query.get('limit', 25))]
+    after = page[-1]['data']['name'] if page and start + len(page) < len(children) else None
+    return {'kind': 'Listing', 'data': {'after': after, 'children': page}}
+
+
+def github_graphql(responses: Dict[str, object], request: Dict) -> Dict:
+    """A batched repository search answered alias by alias from the recorded REST searches
+
+    Understands the shape the scraper sends: every variable is the query
+    string of the search aliased by the same name.
+    """
+    data, errors = {}, []
+    for alias, query in (request.get('variables') or {}).items():
+        recorded = responses.get(fixture_key('/search/repositories', {'q': query}))
+        if recorded is None:
+            data[alias] = None
+            errors.append({'path': [alias], 'message': f'no fixture for {query}'})
+            continue
+        data[alias] = {'nodes': [{
+            'nameWithOwner': repo['full_name'], 'description': repo.get('description'), 'url': repo['html_url'],
+            'stargazerCount': repo['stargazers_count'],
+            'primaryLanguage': {'name': repo['language']} if repo.get('language') else None,
+        } for repo in recorded['items']]}
+    return {'data': data, **({'errors': errors} if errors else {})}
+
+
+class FakeUpstream:
+    """Threaded HTTP/1.1 server replaying fixtures under /<upstream>/<path>
+
+    Each response waits the upstream's latency (±50% jitter) first; with
+    probability `error_rate` it is a 503 instead. Request counts per
+    upstream are kept for the benchmark report.
+    """
+
+    def __init__(self, fixtures: Dict[str, Dict[str, object]], latency: Optional[Dict[str, float]] = None,
+                 error_rate: float = 0.0, seed: int = 7, port: int = 0):
+        self.fixtures = fixtures
+        self.latency = latency or {}
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that route the scraper here"""
+        return {var: f"{self.url}/{name}{prefix}" for name, (_, var, prefix) in UPSTREAMS.items()}
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {}
+
+    def _decide(self, upstream: str):
+        with self._lock:
+            delay = self.latency.get(upstream, 0.0) * self._rng.uniform(0.5, 1.5)
+            fail = self._rng.random() < self.error_rate
+        return delay, fail
+
+    def _count(self, upstream: str, outcome: str):
+        with self._lock:
+            counts = self.counts.setdefault(upstream, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def _handler(self):
+        upstream_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                upstream, _, path = url.path.lstrip('/').partition('/')
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                delay, fail = upstream_server._decide(upstream)
+                if delay:
+                    time.sleep(delay)
+                responses = upstream_server.fixtures.get(upstream, {})
+                key = fixture_key('/' + path, query)
+                if fail:
+                    status, body = 503, {'error': 'injected failure'}
+                elif key in responses:
+                    status, body = 200, responses[key]
+                elif upstream == 'reddit' and '+' in path:
+                    status, body = 200, multireddit(responses, '/' + path, query)
+                else:
+                    status, body = 404, {'error': f'no fixture for {key}'}
+                self.respond(upstream, status, body)
+
+            def do_POST(self):
+                upstream, _, path = urlparse(self.path).path.lstrip('/').partition('/')
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                delay, fail = upstream_server._decide(upstream)
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    status, body = 503, {'error': 'injected failure'}
+                elif upstream == 'github' and path == 'graphql':
+                    status, body = 200, github_graphql(upstream_server.fixtures.get(upstream, {}), request)
+                else:
+                    status, body = 404, {'error': f'no POST endpoint /{upstream}/{path}'}
+                self.respond(upstream, status, body)
+
+            def respond(self, upstream: str, status: int, body: Dict):
+                upstream_server._count(upstream, str(status))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeUpstream':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SmtpSink:
+    """Minimal threaded SMTP server: EHLO, AUTH (any credentials), MAIL/RCPT/DATA; no STARTTLS"""
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.connections = self.messages = self.bytes = 0
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def env(self) -> Dict[str, str]:
+        return {'SMTP_SERVER': '127.0.0.1', 'SMTP_PORT': str(self.port), 'SMTP_STARTTLS': '0'}
+
+    def reset_counts(self):
+        with self._lock:
+            self.connections = self.messages = self.bytes = 0
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply('220 localhost fake SMTP sink')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode(errors='replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if sink.latency:
+                        time.sleep(sink.latency)
+                    if verb in ('EHLO', 'HELO'):
+                        self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 SIZE 52428800\r\n')
+                    elif verb == 'AUTH':
+                        if command.upper().startswith('AUTH LOGIN'):
+                            self.reply('334 ' + base64.b64encode(b'Username:').decode())
+                            self.rfile.readline()
+                            self.reply('334 ' + base64.b64encode(b'Password:').decode())
+                            self.rfile.readline()
+                        self.reply('235 2.7.0 Authentication successful')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        size = 0
+                        for data in iter(self.rfile.readline, b''):
+                            if data in (b'.\r\n', b'.\n'):
+                                break
+                            size += len(data)
+                        with sink._lock:
+                            sink.messages += 1
+                            sink.bytes += size
+                        self.reply('250 2.0.0 Ok: queued')
+                    elif verb == 'QUIT':
+                        self.reply('221 2.0.0 Bye')
+                        return
+                    elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                        self.reply('250 2.0.0 Ok')
+                    else:
+                        self.reply('502 5.5.2 Command not implemented')
+
+        return Handler
+
+    def start(self) -> 'SmtpSink':
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def record(path: str = FIXTURES):
+    """Run one live collection and save every upstream response it received as fixtures"""
+    from scraper import IntelligenceScraper
+
+    hosts = {host: name for name, (host, _, _) in UPSTREAMS.items()}
+    responses: Dict[str, Dict[str, object]] = {name: {} for name in UPSTREAMS}
+    lock = threading.Lock()
+    scraper = IntelligenceScraper(use_cache=False, incremental=False)
+    live_get = scraper.http.get
+
+    def recording_get(url, **kwargs):
+        response = live_get(url, **kwargs)
+        parsed = urlparse(url)
+        name = hosts.get(parsed.hostname)
+        if name and response.status_code == 200:
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            query.update({k: str(v) for k, v in (kwargs.get('params') or {}).items()})
+            with lock:
+                responses[name][fixture_key(parsed.path, query)] = response.json()
+        return response
+
+    scraper.http.get = recording_get
+    try:
+        scraper.collect_all_data()
+    finally:
+        scraper.close()
+    save_fixtures(responses, path, 'live')
+
+
+def synthesize(path: str = FIXTURES, seed: int = 11):
+    """Deterministic fixtures shaped like the real APIs, for machines without network access"""
+    from scraper import GITHUB_SOURCES, NEWSAPI_SOURCES, REDDIT_SOURCES
+
+    rng = random.Random(seed)
+    topics = ['AI', 'LLM', 'GPT', 'machine learning', 'startup', 'funding', 'remote', 'hiring',
+              'Rust', 'Python', 'Linux', 'database', 'election', 'war', 'climate', 'security']
+    words = ['launches', 'new', 'open-source', 'model', 'raises', 'Series A', 'for', 'developers',
+             'analysis', 'of', 'the', 'market', 'why', 'we', 'moved', 'to', 'engineers', 'faster']
+
+    def title():
+        picked = rng.sample(words, rng.randint(3, 6))
+        picked.insert(rng.randrange(len(picked) + 1), rng.choice(topics))
+        return ' '.join(picked).capitalize()
+
+    hn: Dict[str, object] = {'/v0/topstories.json': list(range(40_000_001, 40_000_501))}
+    for story_id in range(40_000_001, 40_000_121):
+        kind = 'job' if story_id % 9 == 0 else 'story'
+        hn[f'/v0/item/{story_id}.json'] = {
+            'id': story_id, 'type': kind, 'by': 'someone', 'time': 1767225600 + story_id % 86400,
+            'title': f"{title()} ({story_id % 1000})", 'url': f"https://example.com/{story_id}",
+            'score': rng.randint(5, 1500), 'descendants': rng.randint(0, 600),
+        }
+    reddit: Dict[str, object] = {}
+    for _, _, sub, _ in REDDIT_SOURCES:
+        children = [{'kind': 't3', 'data': {'id': f'{sub}0', 'title': 'Weekly thread', 'stickied': True,
+                                            'permalink': f'/r/{sub}/comments/{sub}0/', 'score': 1,
+                                            'num_comments': 0}}]
+        for i in range(1, 12):
+            children.append({'kind': 't3', 'data': {
+                'id': f'{sub}{i}', 'title': title(), 'stickied': False, 'score': rng.randint(10, 5000),
+                'permalink': f'/r/{sub}/comments/{sub}{i}/', 'num_comments': rng.randint(0, 900),
+                'created_utc': 1767225600 - i * 1800,
+            }})
+        reddit[f'/r/{sub}/hot.json'] = {'kind': 'Listing', 'data': {'children': children}}
+    github: Dict[str, object] = {}
+    for _, key, params in GITHUB_SOURCES:
+        query = ' '.join(['stars:>20'] + [f'{k}:{v}' for k, v in params.items()])
+        github[fixture_key('/search/repositories', {'q': query})] = {'total_count': 5, 'items': [{
+            'full_name': f'{key}-owner/repo-{i}', 'description': title(),
+            'html_url': f'https://github.com/{key}-owner/repo-{i}',
+            'stargazers_count': rng.randint(20, 4000), 'language': params.get('language', 'Python').capitalize(),
+        } for i in range(5)]}
+    newsapi: Dict[str, object] = {}
+    for _, key, params in NEWSAPI_SOURCES:
+        endpoint = '/v2/top-headlines' if 'category' in params else '/v2/everything'
+        query = {'category': params['category']} if 'category' in params else {'q': params['query']}
+        newsapi[fixture_key(endpoint, query)] = {'status': 'ok', 'totalResults': 6, 'articles': [{
+            'title': title(), 'url': f'https://news.example.com/{key}/{i}', 'source': {'name': 'Example Wire'},
+            'publishedAt': f'2026-01-01T{i:02d}:00:00Z',
+        } for i in range(6)]}
+    save_fixtures({'hn': hn, 'reddit': reddit, 'github': github, 'newsapi': newsapi}, path, 'synthetic')
+
+
+def save_fixtures(responses: Dict[str, Dict[str, object]], path: str, origin: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'origin': origin, 'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                   'responses': responses}, f, indent=1, sort_keys=True, ensure_ascii=False)
+    print(f"💾 {sum(len(r) for r in responses.values())} {origin} responses saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['serve', 'record', 'synthesize'])
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--smtp-port', type=int, default=2525)
+    parser.add_argument('--latency', default='0', help="seconds per response: 0.05 or hn=0.02,reddit=0.2")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses that are 503s")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.fixtures)
+    elif args.command == 'synthesize':
+        synthesize(args.fixtures)
+    else:
+        upstream = FakeUpstream(load_fixtures(args.fixtures), parse_latency(args.latency), args.error_rate,
+                                port=args.port).start()
+        sink = SmtpSink(args.smtp_port).start()
+        print("Serving; run the pipeline with:")
+        for var, value in {**upstream.env(), **sink.env()}.items():
+            print(f"  export {var}={value}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            upstream.stop()
+            sink.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Run Checkpoints
+Completed sources and stages of a pipeline run, saved atomically so `main.py --resume` can skip them
+"""
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Run directories not touched for this long are removed when a new run starts
+KEEP_RUNS_FOR = 7 * 86400
+
+
+def _run_order(run_id: str) -> tuple:
+    """Start order of run ids: `20260102-070000-10` comes after `20260102-070000-2`"""
+    base, _, n = run_id.rpartition('-') if run_id.count('-') > 1 else (run_id, '', '1')
+    return base, int(n) if n.isdigit() else 0
+
+
+class RunCheckpoint:
+    """One run's completed work under data/runs/<run-id>/, one JSON file per source or stage
+
+    Every file is written to a temporary name and renamed into place, so a
+    crash leaves either the previous checkpoint or the new one, never half a
+    file. Source results and stage outputs older than `max_age` seconds
+    (CHECKPOINT_MAX_AGE, default an hour) count as missing, so a late resume
+    refetches stale sources. Delivered recipients never expire: a resume must
+    not mail anyone twice.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, root: str = 'data/runs', max_age: Optional[float] = None):
+        self.run_id = run_id or self._new_run_id(root)
+        self.root = root
+        self.dir = os.path.join(root, self.run_id)
+        self.max_age = float(os.getenv('CHECKPOINT_MAX_AGE', '3600')) if max_age is None else max_age
+        # Sources saved by this attempt: outputs derived from the previous attempt's data are stale
+        self.refetched: Set[str] = set()
+        os.makedirs(self.dir, exist_ok=True)
+
+    @staticmethod
+    def _new_run_id(root: str) -> str:
+        # Start time; a second run within the same second must not pick up the first one's work
+        run_id = base = datetime.now().strftime('%Y%m%d-%H%M%S')
+        n = 1
+        while os.path.exists(os.path.join(root, run_id)):
+            n += 1
+            run_id = f"{base}-{n}"
+        return run_id
+
+    @classmethod
+    def resume(cls, run_id: str, root: str = 'data/runs', max_age: Optional[float] = None) -> 'RunCheckpoint':
+        """Reopen an earlier run (`last` = the one written to most recently); KeyError if there is none"""
+        if run_id == 'last':
+            runs = [name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))] \
+                if os.path.isdir(root) else []
+            if not runs:
+                raise KeyError(f"no runs in {root}")
+            run_id = max(runs, key=lambda name: (os.path.getmtime(os.path.join(root, name)), _run_order(name)))
+        if not os.path.isdir(os.path.join(root, run_id)):
+            raise KeyError(f"no checkpoint for run {run_id} in {root}")
+        return cls(run_id, root, max_age)
+
+    @staticmethod
+    def prune(root: str = 'data/runs', keep_for: float = KEEP_RUNS_FOR) -> int:
+        """Delete run directories untouched for `keep_for` seconds; returns how many were removed"""
+        if not os.path.isdir(root):
+            return 0
+        cutoff = time.time() - keep_for
+        removed = 0
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self.dir, f"{kind}.{name}.json")
+
+    def _save(self, kind: str, name: str, data: Any):
+        path = self._path(kind, name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'data': data}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _load(self, kind: str, name: str, max_age: Optional[float]) -> Optional[Any]:
+        try:
+            with open(self._path(kind, name), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if max_age is not None and time.time() - record['saved_at'] > max_age:
+            return None
+        return record['data']
+
+    def save_source(self, name: str, items: List[Dict]):
+        """Keep a source's results; empty ones are not kept (fetchers report failures as empty lists)"""
+        if items:
+            self._save('source', name, items)
+            self.refetched.add(name)
+
+    def load_sources(self, names: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Still-fresh saved results of the given sources"""
+        restored = {}
+        for name in names:
+            items = self._load('source', name, self.max_age)
+            if items:
+                restored[name] = items
+        return restored
+
+    def save_stage(self, stage: str, output: Any = True):
+        self._save('stage', stage, output)
+
+    def load_stage(self, stage: str) -> Optional[Any]:
+        """A stage's saved output, or None if it is missing, stale or built from since-refetched data"""
+        if self.refetched:
+            return None
+        return self._load('stage', stage, self.max_age)
+
+    def delivered(self) -> Set[str]:
+        """Recipients this run already delivered to (or queued for), whatever their age"""
+        return set(self._load('stage', 'delivered', None) or [])
+
+    def add_delivered(self, recipients: Iterable[str]):
+        self._save('stage', 'delivered', sorted(self.delivered() | set(recipients)))
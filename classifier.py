@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Keyword Classifier
+Tags stories with every matching keyword category in a single pass
+"""
+
+import re
+from typing import Dict, List, Set
+
+
+class KeywordClassifier:
+    """One compiled matcher for all categories' keyword lists
+
+    Matching is case-insensitive substring search, exactly like
+    `IntelligenceScraper.filter_by_keywords`. All keywords go into a single
+    zero-width lookahead alternation, longest first, so the regex engine
+    reports the longest keyword starting at every position of the title.
+    Any other keyword starting at that position is necessarily a prefix of
+    it, so each keyword is precomputed to carry the categories of all its
+    keyword prefixes — that makes one scan report every matching category.
+    The alternation is factored into a trie so each position costs one
+    branch per character instead of one attempt per keyword.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = list(categories)
+        keywords: Dict[str, Set[str]] = {}
+        for category, kws in categories.items():
+            for kw in kws:
+                keywords.setdefault(kw.lower(), set()).add(category)
+
+        self._tags: Dict[str, frozenset] = {}
+        for kw in keywords:
+            tags = set()
+            for end in range(1, len(kw) + 1):
+                tags |= keywords.get(kw[:end], set())
+            self._tags[kw] = frozenset(tags)
+
+        self._pattern = re.compile('(?=(' + _trie_regex(list(keywords)) + '))')
+        self._all = frozenset(self.categories)
+
+    def classify(self, title: str) -> Set[str]:
+        """Return every category with at least one keyword in `title`"""
+        found: Set[str] = set()
+        for match in self._pattern.finditer(title.lower()):
+            found |= self._tags[match.group(1)]
+            if found == self._all:
+                break
+        return found
+
+    def select(self, pool: List[Dict], limits: Dict[str, int]) -> Dict[str, List[Dict]]:
+        """Bucket `pool` by category in one pass, keeping pool order and capping each bucket at its limit"""
+        result: Dict[str, List[Dict]] = {category: [] for category in limits}
+        open_categories = {category for category, limit in limits.items() if limit > 0}
+        for story in pool:
+            if not open_categories:
+                break
+            for category in self.classify(story.get('title', '')) & open_categories:
+                result[category].append(story)
+                if len(result[category]) >= limits[category]:
+                    open_categories.discard(category)
+        return result
+
+
+def _trie_regex(words: List[str]) -> str:
+    """Regex matching the longest of `words` at a position, factored by common prefix"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Greedy optional: try the longer keyword first, fall back to this one
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
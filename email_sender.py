@@ -10,348 +10,233 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, Hashable, Iterable, List, Optional, Tuple
+
+from instrumentation import span
+from smtp_pool import DeliveryResult, addressed, pool_from_env
+from email_template import (PAGE, SECTION, ITEM, ITEM_WITH_SUBREDDIT, REPO, REPOS_HEADING, INSIGHT,
+                            FRAGMENTS, TEMPLATE_VERSION)
 
 class EmailGenerator:
-    def __init__(self, summary_path='data/summary.json'):
-        with open(summary_path, 'r', encoding='utf-8') as f:
-            self.summary = json.load(f)
+    # Section key in the summary -> method rendering it, in page order
+    SECTION_RENDERERS = {
+        'tech_news': '_generate_tech_section',
+        'ai_ml': '_generate_ai_ml_section',
+        'startups': '_generate_startups_section',
+        'remote_jobs': '_generate_remote_jobs_section',
+        'world_news': '_generate_world_news_section',
+    }
+    # The lists each section shows, how many entries of each and the partial rendering them; a
+    # section's fragment key covers exactly the fields those partials render
+    SECTION_LISTS = {
+        'tech_news': {'items': (8, ITEM)},
+        'ai_ml': {'discussions': (6, ITEM_WITH_SUBREDDIT), 'trending_repos': (3, REPO)},
+        'startups': {'items': (5, ITEM)},
+        'remote_jobs': {'items': (6, ITEM)},
+        'world_news': {'items': (5, ITEM)},
+    }
+    
+    def __init__(self, summary_path='data/summary.json', summary: Optional[Dict[str, Any]] = None):
+        if summary is None:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        self.summary = summary
+        self._fragments: Dict[str, str] = {}  # rendered sections; the summary must not change afterwards
     
     def generate_html_email(self) -> str:
-        """Generate professional HTML email"""
-        
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            background-color: white;
-            border-radius: 12px;
-            padding: 30px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            border-bottom: 3px solid #2563eb;
-            padding-bottom: 20px;
-            margin-bottom: 30px;
-        }}
-        .header h1 {{
-            margin: 0;
-            color: #1e293b;
-            font-size: 28px;
-        }}
-        .date {{
-            color: #64748b;
-            font-size: 14px;
-            margin-top: 5px;
-        }}
-        .section {{
-            margin-bottom: 35px;
-        }}
-        .section-title {{
-            font-size: 20px;
-            font-weight: 600;
-            color: #1e293b;
-            margin-bottom: 15px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #e2e8f0;
-        }}
-        .item {{
-            background-color: #f8fafc;
-            border-left: 4px solid #3b82f6;
-            padding: 12px 15px;
-            margin-bottom: 12px;
-            border-radius: 4px;
-        }}
-        .item-title {{
-            font-weight: 600;
-            color: #1e293b;
-            margin-bottom: 5px;
-        }}
-        .item-title a {{
-            color: #2563eb;
-            text-decoration: none;
-        }}
-        .item-title a:hover {{
-            text-decoration: underline;
-        }}
-        .item-meta {{
-            font-size: 13px;
-            color: #64748b;
-        }}
-        .insights {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin-top: 30px;
-        }}
-        .insights h3 {{
-            margin-top: 0;
-            font-size: 18px;
-        }}
-        .insights ul {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        .insights li {{
-            margin-bottom: 8px;
-        }}
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #e2e8f0;
-            text-align: center;
-            color: #64748b;
-            font-size: 13px;
-        }}
-        .repo {{
-            background-color: #fff;
-            border: 1px solid #e2e8f0;
-            padding: 12px;
-            margin-bottom: 10px;
-            border-radius: 6px;
-        }}
-        .repo-name {{
-            font-weight: 600;
-            color: #2563eb;
-            margin-bottom: 5px;
-        }}
-        .repo-desc {{
-            font-size: 14px;
-            color: #475569;
-            margin-bottom: 5px;
-        }}
-        .repo-meta {{
-            font-size: 12px;
-            color: #64748b;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>☀️ Morning Intelligence Brief</h1>
-            <div class="date">{self.summary['date']} • Generated at {self.summary['time_generated']}</div>
-        </div>
-        
-        {self._generate_tech_section()}
-        {self._generate_ai_ml_section()}
-        {self._generate_startups_section()}
-        {self._generate_remote_jobs_section()}
-        {self._generate_world_news_section()}
-        
-        <div class="insights">
-            <h3>💡 Key Insights for Today</h3>
-            <ul>
-                {self._generate_insights_list()}
-            </ul>
-        </div>
-        
-        <div class="footer">
-            <p>Morning Intelligence Brief • Automated Daily Digest</p>
-            <p>Stay informed, stay ahead 🚀</p>
-        </div>
-    </div>
-</body>
-</html>
+        """Generate professional HTML email from the precompiled page template"""
+        # Personalized briefs may leave out muted sections
+        sections = [self.render_section(name) for name in self.SECTION_RENDERERS if name in self.summary['sections']]
+        return PAGE.render({
+            'date': self.summary['date'],
+            'time_generated': self.summary['time_generated'],
+            'sections': ''.join(sections),
+            'insights': self._generate_insights_list(),
+        })
+    
+    def render_section(self, name: str) -> str:
+        """HTML for one section, rendered once; lets a streaming run render sections as they complete
+
+        Fragments also go through the process-wide FRAGMENTS cache, so another
+        brief (edition, subscriber variant) showing the same section content
+        reuses this rendering instead of rendering it again.
+        """
+        if name not in self._fragments:
+            key = self.fragment_key(name)
+            try:
+                html = FRAGMENTS.get(key)
+            except TypeError:  # a shown field holds an unhashable value: render it uncached
+                key = html = None
+            if html is None:
+                with span(f'render.{name}'):
+                    html = getattr(self, self.SECTION_RENDERERS[name])()
+                if key is not None:
+                    FRAGMENTS.put(key, html)
+            self._fragments[name] = html
+        return self._fragments[name]
+    
+    def fragment_key(self, name: str) -> Hashable:
+        """What section `name` renders: template version, title and the shown entries' rendered fields
+
+        Only the fields the partials render go into the key, as plain values,
+        so a section rebuilt from a fresh scrape or a reloaded summary still
+        matches.
         """
-        return html
+        section = self.summary['sections'][name]
+        key = [TEMPLATE_VERSION, name, section.get('title')]
+        extend = key.extend
+        for field, (limit, partial) in self.SECTION_LISTS[name].items():
+            rows = section.get(field, [])[:limit]
+            # one flat run of values per list: its length and each partial's field count delimit the rows
+            key.append(len(rows))
+            for row in rows:
+                extend(map(row.get, partial.fields))
+        return tuple(key)
+    
+    def _shown(self, name: str, field: str) -> List[Dict]:
+        return self.summary['sections'][name].get(field, [])[:self.SECTION_LISTS[name][field][0]]
     
     def _generate_tech_section(self) -> str:
         tech = self.summary['sections']['tech_news']
-        items_html = ""
-        
-        for item in tech['items'][:8]:
-            items_html += f"""
-            <div class="item">
-                <div class="item-title">
-                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
-                </div>
-                <div class="item-meta">
-                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="section">
-            <div class="section-title">{tech['title']}</div>
-            {items_html}
-        </div>
-        """
+        return SECTION.render({'title': tech['title'], 'body': ITEM.render_all(self._shown('tech_news', 'items'))})
     
     def _generate_ai_ml_section(self) -> str:
         ai_ml = self.summary['sections']['ai_ml']
-        
-        discussions_html = ""
-        for item in ai_ml['discussions'][:6]:
-            discussions_html += f"""
-            <div class="item">
-                <div class="item-title">
-                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
-                </div>
-                <div class="item-meta">
-                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments • r/{item.get('subreddit', 'N/A')}
-                </div>
-            </div>
-            """
-        
-        repos_html = ""
-        for repo in ai_ml.get('trending_repos', [])[:3]:
-            repos_html += f"""
-            <div class="repo">
-                <div class="repo-name">
-                    <a href="{repo.get('url', '#')}" target="_blank">⭐ {repo.get('name', 'Unknown')}</a>
-                </div>
-                <div class="repo-desc">{repo.get('description', 'No description')}</div>
-                <div class="repo-meta">
-                    ⭐ {repo.get('stars', 0)} stars • {repo.get('language', 'Unknown')}
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="section">
-            <div class="section-title">{ai_ml['title']}</div>
-            {discussions_html}
-            {f'<h4 style="margin-top: 20px; color: #475569;">🔥 Trending Repositories</h4>{repos_html}' if repos_html else ''}
-        </div>
-        """
+        body = ITEM_WITH_SUBREDDIT.render_all(self._shown('ai_ml', 'discussions'))
+        repos_html = REPO.render_all(self._shown('ai_ml', 'trending_repos'))
+        if repos_html:
+            body += REPOS_HEADING + repos_html
+        return SECTION.render({'title': ai_ml['title'], 'body': body})
     
     def _generate_startups_section(self) -> str:
         startups = self.summary['sections']['startups']
-        items_html = ""
-        
-        for item in startups['items'][:5]:
-            items_html += f"""
-            <div class="item">
-                <div class="item-title">
-                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
-                </div>
-                <div class="item-meta">
-                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="section">
-            <div class="section-title">{startups['title']}</div>
-            {items_html}
-        </div>
-        """
+        return SECTION.render({'title': startups['title'], 'body': ITEM.render_all(self._shown('startups', 'items'))})
     
     def _generate_remote_jobs_section(self) -> str:
         jobs = self.summary['sections']['remote_jobs']
-        items_html = ""
-        
-        for item in jobs['items'][:6]:
-            items_html += f"""
-            <div class="item">
-                <div class="item-title">
-                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
-                </div>
-                <div class="item-meta">
-                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="section">
-            <div class="section-title">{jobs['title']}</div>
-            {items_html}
-        </div>
-        """
+        return SECTION.render({'title': jobs['title'], 'body': ITEM.render_all(self._shown('remote_jobs', 'items'))})
     
     def _generate_world_news_section(self) -> str:
         news = self.summary['sections']['world_news']
-        items_html = ""
-        
-        for item in news['items'][:5]:
-            items_html += f"""
-            <div class="item">
-                <div class="item-title">
-                    <a href="{item.get('url', '#')}" target="_blank">{item.get('title', 'No title')}</a>
-                </div>
-                <div class="item-meta">
-                    👍 {item.get('score', 0)} points • 💬 {item.get('comments', 0)} comments
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="section">
-            <div class="section-title">{news['title']}</div>
-            {items_html}
-        </div>
-        """
+        return SECTION.render({'title': news['title'], 'body': ITEM.render_all(self._shown('world_news', 'items'))})
     
     def _generate_insights_list(self) -> str:
-        insights = self.summary.get('insights', [])
-        return "\n".join([f"<li>{insight}</li>" for insight in insights])
+        return INSIGHT.render_all({'text': insight} for insight in self.summary.get('insights', []))
     
     def send_email(self, 
                    to_email: str,
                    from_email: str = None,
                    smtp_password: str = None,
-                   smtp_server: str = 'smtp.gmail.com',
-                   smtp_port: int = 587):
-        """Send the intelligence brief via email"""
+                   smtp_server: str = None,
+                   smtp_port: int = None,
+                   starttls: bool = None):
+        """Send the intelligence brief via email (server settings default to $SMTP_SERVER/PORT/STARTTLS)"""
         
         from_email = from_email or os.getenv('SMTP_EMAIL')
         smtp_password = smtp_password or os.getenv('SMTP_PASSWORD')
+        smtp_server = smtp_server or os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+        smtp_port = smtp_port or int(os.getenv('SMTP_PORT', '587'))
+        if starttls is None:
+            starttls = os.getenv('SMTP_STARTTLS', '1') == '1'
         
         if not from_email or not smtp_password:
             raise ValueError("Email credentials not provided")
         
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"☀️ Morning Intelligence Brief - {self.summary['date']}"
-        msg['From'] = from_email
+        msg = self._build_message(from_email)
         msg['To'] = to_email
         
-        # Attach HTML
-        html_part = MIMEText(self.generate_html_email(), 'html')
-        msg.attach(html_part)
-        
         # Send email
         try:
             print(f"📧 Sending email to {to_email}...")
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(from_email, smtp_password)
-            server.send_message(msg)
+            with span('smtp.connect', 'smtp', host=smtp_server):
+                server = smtplib.SMTP(smtp_server, smtp_port)
+                if starttls:
+                    server.starttls()
+                server.login(from_email, smtp_password)
+            with span('smtp.send', 'smtp', host=smtp_server) as attrs:
+                server.send_message(msg)
+                attrs['ok'] = True
             server.quit()
             print("✅ Email sent successfully!")
         except Exception as e:
             print(f"❌ Error sending email: {e}")
             raise
 
+    def _build_message(self, from_email: str) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"☀️ Morning Intelligence Brief - {self.summary['date']}"
+        msg['From'] = from_email
+        msg.attach(MIMEText(self.generate_html_email(), 'html'))
+        return msg
+    
+    def render_message(self, from_email: str) -> bytes:
+        """The encoded brief without a To: header, ready to be addressed per recipient"""
+        return self._build_message(from_email).as_bytes()
+    
+    def send_bulk(self,
+                  recipients: Iterable[str],
+                  from_email: str = None,
+                  smtp_password: str = None,
+                  smtp_server: str = None,
+                  smtp_port: int = None,
+                  pool_size: int = None,
+                  starttls: bool = None) -> List[DeliveryResult]:
+        """Send the brief to every recipient over a small pool of reused SMTP connections
+        
+        The message is rendered and encoded once; each recipient only adds its
+        own To: header. Returns one DeliveryResult per recipient, in order —
+        failures are reported, not raised.
+        """
+        return send_briefs([(self, recipients)], from_email, smtp_password, smtp_server, smtp_port,
+                           pool_size, starttls)
+
+def send_briefs(groups: Iterable[Tuple[EmailGenerator, Iterable[str]]],
+                from_email: str = None,
+                smtp_password: str = None,
+                smtp_server: str = None,
+                smtp_port: int = None,
+                pool_size: int = None,
+                starttls: bool = None) -> List[DeliveryResult]:
+    """Send each group's brief to its recipients, all over one pool of reused SMTP connections
+    
+    Each distinct brief is rendered and encoded once. Returns one
+    DeliveryResult per recipient, in order; failures are reported, not raised.
+    """
+    from_email = from_email or os.getenv('SMTP_EMAIL')
+    if not from_email:
+        raise ValueError("Sender address not provided")
+    
+    bodies: Dict[str, bytes] = {}
+    for generator, recipients in groups:
+        body = generator.render_message(from_email)
+        for rcpt in recipients:
+            if rcpt.strip():
+                bodies.setdefault(rcpt.strip(), body)
+    
+    with pool_from_env(from_email, smtp_password, smtp_server, smtp_port, pool_size, starttls) as pool:
+        print(f"📧 Sending email to {len(bodies)} recipients over up to {pool.size} connections...")
+        results = pool.send_many(from_email, bodies, lambda rcpt: addressed(bodies[rcpt], rcpt))
+        stats = pool.stats()
+    
+    failed = [r for r in results if not r.ok]
+    print(f"✅ Sent {len(results) - len(failed)}/{len(results)} "
+          f"({stats['opened']} connections opened, {stats['reconnects']} reconnects)")
+    for result in failed:
+        print(f"   ❌ {result.recipient}: {result.code} {result.error}")
+    return results
+
 def main():
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python email_sender.py <recipient_email>")
+        print("Usage: python email_sender.py <recipient_email> [<recipient_email> ...]")
         sys.exit(1)
     
-    recipient = sys.argv[1]
-    
     generator = EmailGenerator()
-    generator.send_email(to_email=recipient)
+    if len(sys.argv) == 2:
+        generator.send_email(to_email=sys.argv[1])
+    else:
+        generator.send_bulk(sys.argv[1:])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Email Templates
+Page skeleton and item/repo partials, compiled once per process
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from html import escape
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+_FIELD = re.compile(r'\{\{(!?)(\w+)(?:\|(\w+))?\}\}')
+_URL_SCHEMES = ('http://', 'https://')
+
+
+def safe_url(url: str) -> str:
+    """Only http(s) links make it into the email; anything else becomes '#'"""
+    url = (url or '').strip()
+    return url if url.lower().startswith(_URL_SCHEMES) else '#'
+
+
+# Filters other than `url` format optional fields: a missing or empty value renders as ''
+FILTERS: Dict[str, Callable[[Any], Any]] = {
+    'url': safe_url,
+    'subreddit': lambda sub: f" • r/{sub}" if sub else '',
+    'blurb': lambda text: f'<div class="item-desc">{escape(str(text))}</div>' if text else '',
+}
+
+
+def _text(value: Any) -> Any:
+    """A field as escaped text; ints (scores, counts) cannot need escaping and are formatted as they are"""
+    if value.__class__ is str:
+        # most headlines hold nothing to escape, and five substring tests are cheaper than a copy
+        if '&' in value or '<' in value or '>' in value or '"' in value or "'" in value:
+            return escape(value)
+        return value
+    if value.__class__ is int:
+        return value
+    return escape(str(value))
+
+
+def _url(value: Any) -> str:
+    if value.__class__ is not str:
+        return '#'
+    if value.startswith(_URL_SCHEMES) and not value[-1:].isspace():
+        return _text(value)
+    return _text(safe_url(value))
+
+
+def _converter(raw: str, filter_name: str) -> Callable[[Any], Any]:
+    """How one field's value becomes its text: filter (if any), then escaping unless raw"""
+    if not filter_name:
+        return (lambda value: value) if raw else _text
+    apply = FILTERS[filter_name]
+    if filter_name == 'url':
+        return apply if raw else _url
+    # Filters other than `url` skip empty values
+    if raw:
+        return lambda value: apply(value) if value else ''
+    return lambda value: _text(apply(value)) if value else ''
+
+
+class Template:
+    """A template precompiled into a `str.format_map` pattern and per-field converters
+
+    `{{name}}` is HTML-escaped on render, `{{!name}}` is inserted as-is (for
+    already-rendered fragments) and `{{name|filter}}` runs one of FILTERS
+    first. Missing values fall back to `defaults`.
+    """
+
+    def __init__(self, source: str, defaults: Optional[Dict[str, Any]] = None):
+        self.source = source
+        self.defaults = defaults = defaults or {}
+        # split() yields [literal, raw, name, filter, literal, raw, name, filter, ..., literal]
+        pieces = _FIELD.split(source)
+        pattern = _format_literal(pieces[0])
+        slots = {}
+        for i in range(1, len(pieces), 4):
+            raw, name, filter_name, literal = pieces[i:i + 4]
+            # the same field may appear escaped and raw, or through different filters
+            slot = '_'.join(filter(None, (name, filter_name, 'raw' if raw else '')))
+            slots[slot] = (name, defaults.get(name, ''), _converter(raw, filter_name))
+            pattern += '{' + slot + '}' + _format_literal(literal)
+        self.fields = tuple(dict.fromkeys(name for name, _, _ in slots.values()))
+        self._slots = tuple((slot, *spec) for slot, spec in slots.items())
+        self._format = pattern.format_map
+
+    def render(self, values: Dict[str, Any]) -> str:
+        get = values.get
+        return self._format({slot: convert(get(name, default)) for slot, name, default, convert in self._slots})
+
+    def render_all(self, rows: Iterable[Dict[str, Any]]) -> str:
+        """Renders once per row and joins, e.g. every item card of a section"""
+        return ''.join(map(self.render, rows))
+
+
+def _format_literal(text: str) -> str:
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+PAGE_CSS = """\
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            background-color: white;
+            border-radius: 12px;
+            padding: 30px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
+        .header {
+            border-bottom: 3px solid #2563eb;
+            padding-bottom: 20px;
+            margin-bottom: 30px;
+        }
+        .header h1 {
+            margin: 0;
+            color: #1e293b;
+            font-size: 28px;
+        }
+        .date {
+            color: #64748b;
+            font-size: 14px;
+            margin-top: 5px;
+        }
+        .section {
+            margin-bottom: 35px;
+        }
+        .section-title {
+            font-size: 20px;
+            font-weight: 600;
+            color: #1e293b;
+            margin-bottom: 15px;
+            padding-bottom: 10px;
+            border-bottom: 2px solid #e2e8f0;
+        }
+        .item {
+            background-color: #f8fafc;
+            border-left: 4px solid #3b82f6;
+            padding: 12px 15px;
+            margin-bottom: 12px;
+            border-radius: 4px;
+        }
+        .item-title {
+            font-weight: 600;
+            color: #1e293b;
+            margin-bottom: 5px;
+        }
+        .item-title a {
+            color: #2563eb;
+            text-decoration: none;
+        }
+        .item-title a:hover {
+            text-decoration: underline;
+        }
+        .item-desc {
+            font-size: 14px;
+            color: #475569;
+            margin-bottom: 5px;
+        }
+        .item-meta {
+            font-size: 13px;
+            color: #64748b;
+        }
+        .insights {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 20px;
+            border-radius: 8px;
+            margin-top: 30px;
+        }
+        .insights h3 {
+            margin-top: 0;
+            font-size: 18px;
+        }
+        .insights ul {
+            margin: 10px 0;
+            padding-left: 20px;
+        }
+        .insights li {
+            margin-bottom: 8px;
+        }
+        .footer {
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #e2e8f0;
+            text-align: center;
+            color: #64748b;
+            font-size: 13px;
+        }
+        .repo {
+            background-color: #fff;
+            border: 1px solid #e2e8f0;
+            padding: 12px;
+            margin-bottom: 10px;
+            border-radius: 6px;
+        }
+        .repo-name {
+            font-weight: 600;
+            color: #2563eb;
+            margin-bottom: 5px;
+        }
+        .repo-desc {
+            font-size: 14px;
+            color: #475569;
+            margin-bottom: 5px;
+        }
+        .repo-meta {
+            font-size: 12px;
+            color: #64748b;
+        }
+"""
+
+PAGE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+{{!css}}    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>☀️ Morning Intelligence Brief</h1>
+            <div class="date">{{date}} • Generated at {{time_generated}}</div>
+        </div>
+        {{!sections}}
+        <div class="insights">
+            <h3>💡 Key Insights for Today</h3>
+            <ul>
+                {{!insights}}
+            </ul>
+        </div>
+        
+        <div class="footer">
+            <p>Morning Intelligence Brief • Automated Daily Digest</p>
+            <p>Stay informed, stay ahead 🚀</p>
+        </div>
+    </div>
+</body>
+</html>
+""", {'css': PAGE_CSS})  # a default, so the stylesheet is not rescanned by every render
+
+SECTION = Template("""
+        <div class="section">
+            <div class="section-title">{{title}}</div>
+            {{!body}}
+        </div>
+""")
+
+_ITEM_SOURCE = """
+            <div class="item">
+                <div class="item-title">
+                    <a href="{{url|url}}" target="_blank">{{title}}</a>
+                </div>
+                {{!description|blurb}}
+                <div class="item-meta">
+                    👍 {{score}} points • 💬 {{comments}} comments%s
+                </div>
+            </div>
+"""
+ITEM_DEFAULTS = {'url': '#', 'title': 'No title', 'score': 0, 'comments': 0}
+ITEM = Template(_ITEM_SOURCE % '', ITEM_DEFAULTS)
+ITEM_WITH_SUBREDDIT = Template(_ITEM_SOURCE % '{{subreddit|subreddit}}', ITEM_DEFAULTS)
+
+REPO = Template("""
+            <div class="repo">
+                <div class="repo-name">
+                    <a href="{{url|url}}" target="_blank">⭐ {{name}}</a>
+                </div>
+                <div class="repo-desc">{{description}}</div>
+                <div class="repo-meta">
+                    ⭐ {{stars}} stars • {{language}}
+                </div>
+            </div>
+""", {'url': '#', 'name': 'Unknown', 'description': 'No description', 'stars': 0, 'language': 'Unknown'})
+
+REPOS_HEADING = '<h4 style="margin-top: 20px; color: #475569;">🔥 Trending Repositories</h4>'
+
+INSIGHT = Template("<li>{{text}}</li>\n")
+
+# Changes whenever a section partial does, so cached fragments never outlive their templates
+TEMPLATE_VERSION = hashlib.sha256(repr([
+    (t.source, sorted(t.defaults.items())) for t in (SECTION, ITEM, ITEM_WITH_SUBREDDIT, REPO)
+] + [REPOS_HEADING]).encode('utf-8')).hexdigest()[:16]
+
+
+# Bytes of object header a str or int value in a fragment key costs beyond its text
+KEY_VALUE_OVERHEAD = 64
+
+
+class FragmentCache:
+    """Rendered section HTML by content key, least recently used evicted beyond `max_bytes`
+
+    Shared by every EmailGenerator in the process, so editions, layouts and
+    subscriber variants that show the same section reuse one rendering.
+    Keys hold the rendered field values themselves, so their size counts
+    against `max_bytes` along with the HTML.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._fragments: 'OrderedDict[Hashable, Tuple[str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._fragments.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, html: str):
+        # Keys are flat tuples of the rendered field values (see EmailGenerator.fragment_key), and
+        # every value's text also appears in the HTML: the HTML's size again plus an object header
+        # per value bounds the key without a getsizeof call per value
+        size = 2 * sys.getsizeof(html) + sys.getsizeof(key) + KEY_VALUE_OVERHEAD * len(key)
+        with self._lock:
+            if key in self._fragments or size > self.max_bytes:
+                return
+            self._fragments[key] = (html, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, old) = self._fragments.popitem(last=False)
+                self.bytes -= old
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'fragments': len(self._fragments), 'bytes': self.bytes}
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+            self.bytes = 0
+
+
+FRAGMENTS = FragmentCache(int(os.getenv('FRAGMENT_CACHE_BYTES', str(4 * 1024 * 1024))))
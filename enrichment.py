@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Article Enrichment
+Descriptions and canonical URLs from the linked pages, fetched concurrently under a time budget
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, wait
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+from http_client import HttpClient
+
+# Discussion pages, not articles: their text is the thread, not a summary of the story
+SKIP_HOSTS = {'news.ycombinator.com', 'reddit.com', 'www.reddit.com', 'old.reddit.com', 'github.com'}
+MAX_PAGE_BYTES = 512 * 1024
+READ_CHUNK = 64 * 1024
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+MAX_DESCRIPTION = 300
+USER_AGENT = 'Mozilla/5.0 (compatible; MorningBrief/1.0)'
+
+
+class _PageParser(HTMLParser):
+    """og:/meta description, canonical link and the first substantial paragraph of a page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.canonical = ''
+        self.lead = ''
+        self._in_p = False
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or '' for k, v in attrs}
+        if tag == 'meta':
+            name = (attrs.get('property') or attrs.get('name') or '').lower()
+            if name in ('og:description', 'description', 'twitter:description', 'og:url'):
+                self.meta.setdefault(name, attrs.get('content', '').strip())
+        elif tag == 'link' and 'canonical' in attrs.get('rel', '').lower().split():
+            self.canonical = self.canonical or attrs.get('href', '').strip()
+        elif tag == 'p' and not self.lead:
+            self._in_p, self._text = True, []
+
+    def handle_endtag(self, tag):
+        if tag == 'p' and self._in_p:
+            self._in_p = False
+            text = ' '.join(''.join(self._text).split())
+            if len(text) >= 80:
+                self.lead = text
+
+    def handle_data(self, data):
+        if self._in_p:
+            self._text.append(data)
+
+
+def _shorten(text: str, limit: int = MAX_DESCRIPTION) -> str:
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0].rstrip(',;:.') + '…'
+
+
+def parse_page(html: str, url: str) -> Dict[str, str]:
+    """{'description', 'canonical_url'} of a page; either may be empty"""
+    parser = _PageParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:  # malformed markup: keep whatever was found before it
+        pass
+    meta = parser.meta
+    description = meta.get('og:description') or meta.get('description') or meta.get('twitter:description') \
+        or parser.lead
+    canonical = parser.canonical or meta.get('og:url', '')
+    canonical = urljoin(url, canonical) if canonical else ''
+    if not canonical.lower().startswith(('http://', 'https://')):
+        canonical = ''
+    return {'description': _shorten(description), 'canonical_url': canonical}
+
+
+def _read_page(response, deadline: float) -> Optional[bytes]:
+    """The first MAX_PAGE_BYTES of a streamed body, or None once `deadline` passes"""
+    chunks, size = [], 0
+    for chunk in response.iter_content(READ_CHUNK):
+        if time.monotonic() > deadline:
+            return None
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= MAX_PAGE_BYTES:
+            break
+    return b''.join(chunks)[:MAX_PAGE_BYTES]
+
+
+def page_charset(content_type: str, body: bytes) -> str:
+    """Charset of an HTML page: the Content-Type's, else its <meta charset>, else UTF-8
+
+    requests assumes ISO-8859-1 for text/* without a charset, which turns
+    the UTF-8 most pages are written in into mojibake.
+    """
+    match = _HEADER_CHARSET.search(content_type) or _META_CHARSET.search(body[:4096])
+    if match:
+        charset = match.group(1)
+        charset = charset.decode('ascii') if isinstance(charset, bytes) else charset
+        try:
+            return codecs.lookup(charset).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+class EnrichmentCache:
+    """Parsed page results keyed by content hash, and per URL the hash and validators last seen
+
+    A page whose bytes hash to a known digest is never parsed again, even
+    under another URL; a URL checked within `fresh_for` seconds is not even
+    refetched.
+    """
+
+    def __init__(self, path: str = 'data/enrich.sqlite'):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS parsed (
+                content_hash TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                canonical_url TEXT NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def page(self, url: str) -> Optional[tuple]:
+        """(content_hash, etag, last_modified, checked_at) last seen for `url`"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT content_hash, etag, last_modified, checked_at FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def parsed(self, content_hash: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT description, canonical_url FROM parsed WHERE content_hash = ?", (content_hash,)).fetchone()
+        return {'description': row[0], 'canonical_url': row[1]} if row else None
+
+    def put(self, url: str, content_hash: str, etag: Optional[str], last_modified: Optional[str],
+            result: Optional[Dict[str, str]] = None):
+        """Record a check of `url` (and, for a newly parsed page, its result)"""
+        with self._lock:
+            if result is not None:
+                self._db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?)",
+                                 (content_hash, result['description'], result['canonical_url']))
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (url, content_hash, etag, last_modified, time.time()))
+            self._db.commit()
+
+    def touch(self, url: str):
+        with self._lock:
+            self._db.execute("UPDATE pages SET checked_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ArticleEnricher:
+    """Adds `description` and `canonical_url` to stories from the pages they link to
+
+    Pages are fetched concurrently through a dedicated HttpClient (article
+    hosts get their own pools and rate-limit buckets; bodies stay out of the
+    API response cache). `enrich` returns once every page is done or the
+    `budget` (seconds) is spent, whichever comes first: late fetches are
+    abandoned, their stories simply stay as they were. Workers are daemon
+    threads that stop reading a page at the deadline, so a slow site can
+    neither hold up the process's exit nor stream past the budget.
+    """
+
+    def __init__(self, cache: Optional[EnrichmentCache] = None, http: Optional[HttpClient] = None,
+                 budget: Optional[float] = None, concurrency: Optional[int] = None,
+                 fresh_for: Optional[float] = None):
+        self.cache = cache or EnrichmentCache(os.getenv('ENRICH_CACHE_PATH', 'data/enrich.sqlite'))
+        # One attempt per page, and no Retry-After pauses: a retry's backoff or a throttled host would
+        # keep a worker on the network past the budget
+        self.http = http or HttpClient(max_retries=0, max_backoff=0)
+        self.budget = budget if budget is not None else float(os.getenv('ENRICH_BUDGET', '3'))
+        self.concurrency = concurrency or int(os.getenv('ENRICH_CONCURRENCY', '8'))
+        self.fresh_for = fresh_for if fresh_for is not None else float(os.getenv('ENRICH_FRESH_FOR', '21600'))
+        self.counts = {'cached': 0, 'revalidated': 0, 'unchanged': 0, 'parsed': 0, 'failed': 0, 'late': 0}
+        self._active = 0  # workers still running, possibly past the budget
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.counts[kind] += 1
+
+    @staticmethod
+    def enrichable(url: str) -> bool:
+        parsed = urlparse(url or '')
+        return parsed.scheme in ('http', 'https') and (parsed.hostname or '') not in SKIP_HOSTS
+
+    def fetch(self, url: str, deadline: float) -> Optional[Dict[str, str]]:
+        """Parsed result for `url`: from the cache when fresh, unchanged or not modified, else parsed anew"""
+        page = self.cache.page(url)
+        if page is not None and time.time() - page[3] < self.fresh_for:
+            self._count('cached')
+            return self.cache.parsed(page[0])
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'}
+        if page is not None:
+            headers.update({k: v for k, v in (('If-None-Match', page[1]), ('If-Modified-Since', page[2])) if v})
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            return None
+        try:
+            response = self.http.get(url, headers=headers, timeout=timeout, stream=True)
+        except Exception:
+            self._count('failed')
+            return None
+        with response:
+            if response.status_code == 304 and page is not None:
+                self.cache.touch(url)
+                self._count('revalidated')
+                return self.cache.parsed(page[0])
+            if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                self._count('failed')
+                return None
+            try:
+                body = _read_page(response, deadline)
+            except Exception:
+                self._count('failed')
+                return None
+        if body is None:  # out of time: enrich already counts it as late
+            return None
+        digest = hashlib.sha256(body).hexdigest()
+        result = self.cache.parsed(digest)
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if result is not None:
+            self._count('unchanged')
+            self.cache.put(url, digest, etag, last_modified)
+            return result
+        charset = page_charset(response.headers.get('Content-Type', ''), body)
+        result = parse_page(body.decode(charset, errors='replace'), response.url or url)
+        self._count('parsed')
+        self.cache.put(url, digest, etag, last_modified, result)
+        return result
+
+    def enrich(self, items: List[Dict]) -> int:
+        """Enrich `items` in place within the time budget; returns how many stories gained something
+
+        A story keeps a description it already has; `canonical_url` is only
+        set when the page names a canonical address.
+        """
+        by_url: Dict[str, List[Dict]] = {}
+        for item in items:
+            if self.enrichable(item.get('url', '')):
+                by_url.setdefault(item['url'], []).append(item)
+        if not by_url or self.budget <= 0:
+            return 0
+        deadline = time.monotonic() + self.budget
+        work: 'queue.SimpleQueue' = queue.SimpleQueue()
+        futures: Dict[Future, str] = {}
+        for url in by_url:
+            future = Future()
+            futures[future] = url
+            work.put((future, url))
+        workers = min(self.concurrency, len(by_url))
+        with self._lock:
+            self._active += workers
+        for _ in range(workers):
+            threading.Thread(target=self._work, args=(work, deadline), name='enrich', daemon=True).start()
+        done, late = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in late:
+            future.cancel()  # not started yet; running fetches give up at the deadline themselves
+        with self._lock:
+            self.counts['late'] += len(late)
+
+        enriched = 0
+        for future in done:
+            result = future.exception() is None and future.result()
+            if not result:
+                continue
+            for item in by_url[futures[future]]:
+                changed = False
+                if result['description'] and not item.get('description'):
+                    item['description'] = result['description']
+                    changed = True
+                if result['canonical_url'] and result['canonical_url'] != item.get('url'):
+                    item['canonical_url'] = result['canonical_url']
+                    changed = True
+                enriched += changed
+        return enriched
+
+    def _work(self, work: 'queue.SimpleQueue', deadline: float):
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    future, url = work.get_nowait()
+                except queue.Empty:
+                    return
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self.fetch(url, deadline))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._active -= 1
+                last = self._closing and not self._active
+            if last:
+                self._close_now()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+    def close(self):
+        """Close the HTTP client and cache, or leave that to the last worker still past the budget"""
+        with self._lock:
+            self._closing = True
+            if self._active:
+                return
+        self._close_now()
+
+    def _close_now(self):
+        self.http.close()
+        self.cache.close()
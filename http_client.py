@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - HTTP Client
+Shared, host-aware connection pools with retries and exponential backoff
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import RECORDER, host_of
+from rate_limiter import RateLimiter, limit_key
+from response_cache import ResponseCache
+
+# Keep-alive pool size per upstream host; anything else gets DEFAULT_POOL_SIZE
+DEFAULT_POOL_SIZES = {
+    'hacker-news.firebaseio.com': 16,
+    'www.reddit.com': 8,
+    'api.github.com': 4,
+    'newsapi.org': 4,
+}
+DEFAULT_POOL_SIZE = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """Drop-in replacement for `requests.get` backed by one keep-alive pool per host"""
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None, max_retries: int = 3,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0,
+                 cache: Optional[ResponseCache] = None, limiter: Optional[RateLimiter] = None):
+        self.pool_sizes = {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.limiter = limiter if limiter is not None else RateLimiter(max_pause=max_backoff)
+        self.session = requests.Session()
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._retries: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _adapter_for(self, url: str) -> str:
+        """Mount a dedicated, correctly sized adapter the first time a host is seen"""
+        parsed = urlparse(url)
+        host = parsed.netloc
+        with self._lock:
+            if host not in self._adapters:
+                size = self.pool_sizes.get(parsed.hostname or host, DEFAULT_POOL_SIZE)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+                self.session.mount(f"{parsed.scheme}://{host}/", adapter)
+                self._adapters[host] = adapter
+                self._retries[host] = 0
+        return host
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Delay before the next attempt: Retry-After when given, else jittered 2^n backoff"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    try:
+                        when = parsedate_to_datetime(retry_after)
+                        delay = (when - datetime.now(timezone.utc)).total_seconds()
+                    except (TypeError, ValueError):
+                        delay = None
+                if delay is not None:
+                    return min(max(delay, 0.0), self.max_backoff)
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay + random.uniform(0, delay / 2), self.max_backoff)
+
+    def get(self, url: str, max_age: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET through the response cache (if any), revalidating stale entries upstream
+
+        `max_age` (seconds) tightens the URL's TTL for this call: an older
+        cached copy is revalidated or refetched, and the result is cached.
+
+        The last response is returned even if it is still an error status, so
+        callers keep checking `status_code` as they did with `requests.get`.
+        Every call is recorded as an `http` span (status, bytes, retries,
+        backoff, rate-limit wait and cache outcome). With `stream=True` the
+        body is left unread (the span records its Content-Length) and the
+        caller must close the response.
+        """
+        with RECORDER.span(url.split('?', 1)[0], 'http', host=host_of(url)) as attrs:
+            response = self._get(url, attrs, max_age, **kwargs)
+            attrs['status'] = response.status_code
+            if kwargs.get('stream'):
+                length = response.headers.get('Content-Length', '')
+                attrs['bytes'] = int(length) if length.isdigit() else 0
+            else:
+                attrs['bytes'] = len(response.content)
+            return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST (never cached) with the same pools, retries, rate limiting and `http` span as `get`
+
+        Only for idempotent requests such as GraphQL queries: a failed
+        attempt is retried like a GET.
+        """
+        with RECORDER.span(url.split('?', 1)[0], 'http', host=host_of(url), method='POST') as attrs:
+            response = self._fetch(url, attrs, method='POST', **kwargs)
+            attrs['status'] = response.status_code
+            attrs['bytes'] = len(response.content)
+            return response
+
+    def _get(self, url: str, attrs: Dict, max_age: Optional[float] = None, **kwargs) -> requests.Response:
+        if self.cache is None:
+            return self._fetch(url, attrs, **kwargs)
+        ttl = self.cache.ttl_for(url)
+        if ttl <= 0:
+            return self._fetch(url, attrs, **kwargs)
+
+        key = self.cache.key(url, kwargs.get('params'))
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh and (max_age is None or time.time() - entry.stored_at < max_age):
+            with self._lock:
+                self.cache.hits += 1
+            attrs['cache'] = 'hit'
+            return entry.to_response(url)
+
+        if entry is not None and entry.validators():
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.validators()}
+        response = self._fetch(url, attrs, **kwargs)
+        if entry is not None and response.status_code == 304:
+            self.cache.touch(key)
+            with self._lock:
+                self.cache.revalidated += 1
+            attrs['cache'] = 'revalidated'
+            return entry.to_response(url)
+        with self._lock:
+            self.cache.misses += 1
+        attrs['cache'] = 'miss'
+        if response.status_code == 200:
+            self.cache.put(key, response, ttl)
+        return response
+
+    def _fetch(self, url: str, attrs: Dict, method: str = 'GET', **kwargs) -> requests.Response:
+        """GET (or `method`) with retries on connection errors and 429/5xx responses
+
+        A 429 pauses the host's rate limiter rather than just this request,
+        so every fetcher of that host queues until the upstream allows more.
+        """
+        host = self._adapter_for(url)
+        for attempt in range(self.max_retries):
+            response = None
+            try:
+                response = self._send(host, url, attrs, method, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            with self._lock:
+                self._retries[host] += 1
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                response.close()  # hand a streamed connection back before retrying
+            attrs['retries'] = attempt + 1
+            if response is not None and response.status_code == 429:
+                self.limiter.pause(limit_key(url), delay)
+                continue
+            attrs['backoff_s'] = attrs.get('backoff_s', 0.0) + delay
+            time.sleep(delay)
+        return self._send(host, url, attrs, method, **kwargs)
+
+    def _send(self, host: str, url: str, attrs: Dict, method: str = 'GET', **kwargs) -> requests.Response:
+        """One attempt, once the host's rate limiter has a slot for it"""
+        limit = limit_key(url)
+        waited = self.limiter.acquire(limit)
+        if waited:
+            attrs['throttled_s'] = attrs.get('throttled_s', 0.0) + waited
+        response = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            return response
+        finally:
+            self.limiter.complete(limit, response)
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host counts of requests, connections opened and connections reused"""
+        stats = {}
+        with self._lock:
+            adapters = dict(self._adapters)
+        for host, adapter in adapters.items():
+            opened = requests_made = 0
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    requests_made += pool.num_requests
+            stats[host] = {
+                'requests': requests_made,
+                'opened': opened,
+                'reused': max(requests_made - opened, 0),
+                'retries': self._retries.get(host, 0),
+            }
+        return stats
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Instrumentation
+Spans for stages, sources, HTTP requests and SMTP sessions, written as a run report
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+
+class Span:
+    """One timed unit of work: `kind` is stage, source, http or smtp"""
+
+    __slots__ = ('name', 'kind', 'start', 'duration', 'attrs')
+
+    def __init__(self, name: str, kind: str, start: float, duration: float, attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.duration = duration
+        self.attrs = attrs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'kind': self.kind, 'start': round(self.start, 6),
+                'duration': round(self.duration, 6), **self.attrs}
+
+
+class Recorder:
+    """Thread-safe span collector for one pipeline run (reset between daemon editions)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans: List[Span] = []
+            self.counters: Dict[str, Any] = {}
+            self.started_at = datetime.now().isoformat()
+            self._t0 = time.monotonic()
+
+    def add(self, name: str, kind: str, start: float, duration: float, **attrs):
+        """Record a finished span; `start` is a time.monotonic() value"""
+        span = Span(name, kind, start - self._t0, duration, attrs)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'stage', **attrs) -> Iterator[Dict[str, Any]]:
+        """Time the block; attributes added to the yielded dict end up on the span"""
+        start = time.monotonic()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs.setdefault('error', type(e).__name__)
+            raise
+        finally:
+            self.add(name, kind, start, time.monotonic() - start, **attrs)
+
+    def count(self, name: str, value: Any):
+        """Attach a run-level counter or gauge (e.g. cache stats) to the report"""
+        with self._lock:
+            self.counters[name] = value
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        http: Dict[str, Dict[str, Any]] = {}
+        for span in spans:
+            if span.kind != 'http':
+                continue
+            host = http.setdefault(span.attrs.get('host', ''), {
+                'requests': 0, 'bytes': 0, 'retries': 0, 'backoff_s': 0.0, 'throttled_s': 0.0,
+                'cache': {}, 'status': {}, 'latencies': [],
+            })
+            host['requests'] += 1
+            host['bytes'] += span.attrs.get('bytes', 0)
+            host['retries'] += span.attrs.get('retries', 0)
+            host['backoff_s'] += span.attrs.get('backoff_s', 0.0)
+            host['throttled_s'] += span.attrs.get('throttled_s', 0.0)
+            cache = span.attrs.get('cache') or 'none'
+            host['cache'][cache] = host['cache'].get(cache, 0) + 1
+            status = str(span.attrs.get('status', 'error'))
+            host['status'][status] = host['status'].get(status, 0) + 1
+            host['latencies'].append(span.duration)
+        for host in http.values():
+            latencies = sorted(host.pop('latencies'))
+            host['backoff_s'] = round(host['backoff_s'], 3)
+            host['throttled_s'] = round(host['throttled_s'], 3)
+            host['latency_s'] = {
+                'p50': round(_percentile(latencies, 0.50), 4),
+                'p95': round(_percentile(latencies, 0.95), 4),
+                'max': round(latencies[-1], 4),
+                'total': round(sum(latencies), 4),
+            }
+        return {
+            'started_at': self.started_at,
+            'duration_s': round(time.monotonic() - self._t0, 4),
+            'stages': {s.name: round(s.duration, 4) for s in spans if s.kind == 'stage'},
+            'sources': {s.name: {'duration_s': round(s.duration, 4), **s.attrs} for s in spans if s.kind == 'source'},
+            'http': http,
+            'smtp': _smtp_summary([s for s in spans if s.kind == 'smtp']),
+            'counters': counters,
+            'spans': [s.to_dict() for s in sorted(spans, key=lambda s: s.start)],
+        }
+
+    def write(self, path: str = 'data/run_report.json', prometheus: bool = False) -> Dict[str, Any]:
+        """Write the JSON report (and `<path stem>.prom` in Prometheus text format if asked)"""
+        report = self.report()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        if prometheus:
+            with open(os.path.splitext(path)[0] + '.prom', 'w', encoding='utf-8') as f:
+                f.write(to_prometheus(report))
+        return report
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _smtp_summary(spans: List[Span]) -> Dict[str, Any]:
+    sends = [s for s in spans if s.name == 'smtp.send']
+    connects = [s for s in spans if s.name == 'smtp.connect']
+    return {
+        'connections': len(connects),
+        'connect_s': round(sum(s.duration for s in connects), 4),
+        'messages': len(sends),
+        'delivered': sum(1 for s in sends if s.attrs.get('ok')),
+        'send_s': round(sum(s.duration for s in sends), 4),
+        'bytes': sum(s.attrs.get('bytes', 0) for s in sends),
+    }
+
+
+def _label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def to_prometheus(report: Dict[str, Any]) -> str:
+    """Render the run report in the Prometheus text exposition format"""
+    lines = [
+        '# HELP brief_run_duration_seconds Wall time of the whole run',
+        '# TYPE brief_run_duration_seconds gauge',
+        f"brief_run_duration_seconds {report['duration_s']}",
+        '# HELP brief_stage_duration_seconds Wall time per pipeline stage',
+        '# TYPE brief_stage_duration_seconds gauge',
+    ]
+    lines += [f'brief_stage_duration_seconds{{stage="{_label(k)}"}} {v}' for k, v in report['stages'].items()]
+    lines += ['# HELP brief_source_duration_seconds Wall time per scraper source',
+              '# TYPE brief_source_duration_seconds gauge']
+    lines += [f'brief_source_duration_seconds{{source="{_label(k)}"}} {v["duration_s"]}'
+              for k, v in report['sources'].items()]
+    lines += ['# HELP brief_source_items Items returned per scraper source',
+              '# TYPE brief_source_items gauge']
+    lines += [f'brief_source_items{{source="{_label(k)}"}} {v.get("items", 0)}' for k, v in report['sources'].items()]
+    lines += ['# HELP brief_http_requests_total HTTP requests by host and status',
+              '# TYPE brief_http_requests_total counter']
+    for host, stats in report['http'].items():
+        for status, n in stats['status'].items():
+            lines.append(f'brief_http_requests_total{{host="{_label(host)}",status="{_label(status)}"}} {n}')
+    lines += ['# TYPE brief_http_cache_total counter']
+    for host, stats in report['http'].items():
+        for outcome, n in stats['cache'].items():
+            lines.append(f'brief_http_cache_total{{host="{_label(host)}",outcome="{_label(outcome)}"}} {n}')
+    for metric, key, kind in (('brief_http_response_bytes_total', 'bytes', 'counter'),
+                              ('brief_http_retries_total', 'retries', 'counter'),
+                              ('brief_http_backoff_seconds_total', 'backoff_s', 'counter'),
+                              ('brief_http_throttled_seconds_total', 'throttled_s', 'counter')):
+        lines.append(f'# TYPE {metric} {kind}')
+        lines += [f'{metric}{{host="{_label(host)}"}} {stats[key]}' for host, stats in report['http'].items()]
+    lines.append('# TYPE brief_http_latency_seconds gauge')
+    for host, stats in report['http'].items():
+        for q, value in stats['latency_s'].items():
+            lines.append(f'brief_http_latency_seconds{{host="{_label(host)}",quantile="{q}"}} {value}')
+    smtp = report['smtp']
+    lines += ['# TYPE brief_smtp_connections_total counter', f"brief_smtp_connections_total {smtp['connections']}",
+              '# TYPE brief_smtp_messages_total counter',
+              f'brief_smtp_messages_total{{outcome="delivered"}} {smtp["delivered"]}',
+              f'brief_smtp_messages_total{{outcome="failed"}} {smtp["messages"] - smtp["delivered"]}',
+              '# TYPE brief_smtp_seconds_total counter',
+              f'brief_smtp_seconds_total{{phase="connect"}} {smtp["connect_s"]}',
+              f'brief_smtp_seconds_total{{phase="send"}} {smtp["send_s"]}']
+    return '\n'.join(lines) + '\n'
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc
+
+
+class Profiler:
+    """Opt-in cProfile of a whole run, dumped to `path` with the top functions printed
+
+    cProfile only sees the thread that enables it, so every thread started
+    inside the block (fetchers, enrichment and SMTP workers) gets its own
+    profile through `threading.setprofile`, merged into the main one on exit.
+    Threads already running when profiling starts (a daemon's spool worker)
+    are not covered. On Python 3.12+, where one profile already covers every
+    thread, no per-thread profiles are made.
+    """
+
+    def __init__(self, path: str = 'data/run_profile.prof', top: int = 20):
+        self.path = path
+        self.top = top
+        self._profile: Optional[cProfile.Profile] = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, frame, event, arg):
+        # First event of a new thread: hand it over to a profile of its own
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # 3.12+: the main profile sees this thread already
+            return
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    def __enter__(self):
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._profile_thread)
+        return self
+
+    def __exit__(self, *exc):
+        threading.setprofile(None)
+        self._profile.disable()
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        with self._lock:
+            thread_profiles, self._thread_profiles = self._thread_profiles, []
+        for profile in thread_profiles:
+            stats.add(profile)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        stats.dump_stats(self.path)
+        stats.stream = out = io.StringIO()
+        stats.sort_stats('cumulative').print_stats(self.top)
+        print(out.getvalue())
+        print(f"🔬 Profile of {1 + len(thread_profiles)} threads saved to {self.path} "
+              f"(inspect with `python -m pstats {self.path}`)")
+
+
+# Shared by every module of a run
+RECORDER = Recorder()
+span = RECORDER.span
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Item Store
+Persistent record of scraped items and of which items went out in each brief
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+def item_key(item: Dict) -> Tuple[str, str]:
+    """Identity of an item across runs: its source plus upstream id (or URL when there is none)"""
+    if item.get('id') is not None:
+        return item.get('source', ''), str(item['id'])
+    return item.get('source', ''), item.get('url', '')
+
+
+class StoredItem:
+    def __init__(self, item: Optional[Dict], refreshed_at: float):
+        self.item = item  # None marks an upstream id that is not a usable story
+        self.refreshed_at = refreshed_at
+
+
+class ItemStore:
+    """SQLite store keyed by (source, item id)"""
+
+    def __init__(self, path: str = 'data/items.sqlite'):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                payload TEXT,
+                first_seen REAL NOT NULL,
+                refreshed_at REAL NOT NULL,
+                PRIMARY KEY (source, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS sent (
+                brief_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                PRIMARY KEY (brief_id, source, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS briefs (
+                brief_id TEXT PRIMARY KEY,
+                sent_at REAL NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def get(self, source: str, item_id) -> Optional[StoredItem]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, refreshed_at FROM items WHERE source = ? AND item_id = ?",
+                (source, str(item_id)),
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredItem(json.loads(row[0]) if row[0] else None, row[1])
+
+    def upsert(self, source: str, item_id, item: Optional[Dict]):
+        now = time.time()
+        payload = json.dumps(item, ensure_ascii=False) if item is not None else None
+        with self._lock:
+            self._db.execute("""
+                INSERT INTO items (source, item_id, payload, first_seen, refreshed_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, item_id) DO UPDATE SET payload = excluded.payload, refreshed_at = excluded.refreshed_at
+            """, (source, str(item_id), payload, now, now))
+            self._db.commit()
+
+    def upsert_many(self, items: Iterable[Dict]):
+        for item in items:
+            self.upsert(*item_key(item), item)
+
+    def record_brief(self, brief_id: str, items: Iterable[Dict]):
+        """Remember which items were delivered in brief `brief_id`"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO briefs VALUES (?, ?)", (brief_id, time.time()))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO sent VALUES (?, ?, ?)",
+                [(brief_id, *item_key(item)) for item in items],
+            )
+            self._db.commit()
+
+    def sent_keys(self, last_n: int) -> Set[Tuple[str, str]]:
+        """Keys of every item delivered in the most recent `last_n` briefs"""
+        if last_n <= 0:
+            return set()
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT source, item_id FROM sent WHERE brief_id IN (
+                    SELECT brief_id FROM briefs ORDER BY sent_at DESC LIMIT ?
+                )
+            """, (last_n,)).fetchall()
+        return {(source, item_id) for source, item_id in rows}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            items = self._db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            briefs = self._db.execute("SELECT COUNT(*) FROM briefs").fetchone()[0]
+        return {'items': items, 'briefs': briefs}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Item Model
+Compact story records and a columnar batch form, convertible to and from the JSON dicts
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Fields every story dict may carry; anything else (e.g. alternate_sources) rides along in `extra`
+FIELDS = ('id', 'title', 'url', 'score', 'comments', 'source', 'subreddit', 'created')
+
+
+class Item:
+    """One story with fixed slots instead of a per-item dict; `source` and `subreddit` are interned"""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, id: Any = None, title: str = '', url: str = '', score: float = 0, comments: int = 0,
+                 source: str = '', subreddit: Optional[str] = None, created: Optional[float] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.score = score
+        self.comments = comments
+        self.source = sys.intern(source or '')
+        # "N/A" and empty subreddits are what non-Reddit items used to carry
+        self.subreddit = sys.intern(subreddit) if subreddit not in (None, '', 'N/A') else None
+        self.created = created
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Item':
+        extra = {k: v for k, v in data.items() if k not in FIELDS}
+        return cls(data.get('id'), data.get('title', ''), data.get('url', ''), data.get('score', 0),
+                   data.get('comments', 0), data.get('source', ''), data.get('subreddit'),
+                   data.get('created'), extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON shape the scraper produces (unset optional fields are left out)"""
+        data = {'id': self.id, 'title': self.title, 'url': self.url, 'score': self.score,
+                'comments': self.comments, 'source': self.source}
+        if self.id is None:
+            del data['id']
+        if self.subreddit is not None:
+            data['subreddit'] = self.subreddit
+        if self.created is not None:
+            data['created'] = self.created
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"Item({self.source!r}, {self.title[:40]!r}, score={self.score})"
+
+
+class ItemBatch:
+    """Columnar form of many stories, for ranking and bulk storage
+
+    Scores, comment counts and creation times are packed machine arrays
+    (NaN for an unknown creation time); sources are small integer codes into
+    `sources`. Text columns stay Python lists. `numpy.frombuffer` can view
+    the numeric columns without copying.
+    """
+
+    def __init__(self):
+        self.ids: List[Any] = []
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.scores = array('d')
+        self.comments = array('d')
+        self.created = array('d')
+        self.source_codes = array('H')
+        self.sources: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.subreddits: List[Optional[str]] = []
+        self.extras: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _code(self, source: str) -> int:
+        code = self._codes.get(source)
+        if code is None:
+            code = self._codes[source] = len(self.sources)
+            self.sources.append(sys.intern(source))
+        return code
+
+    def append(self, item: Item):
+        if item.extra:
+            self.extras[len(self.titles)] = item.extra
+        self.ids.append(item.id)
+        self.titles.append(item.title)
+        self.urls.append(item.url)
+        self.scores.append(float(item.score or 0))
+        self.comments.append(float(item.comments or 0))
+        self.created.append(float('nan') if item.created is None else float(item.created))
+        self.source_codes.append(self._code(item.source))
+        self.subreddits.append(item.subreddit)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Item]) -> 'ItemBatch':
+        batch = cls()
+        for item in items:
+            batch.append(item)
+        return batch
+
+    @classmethod
+    def from_dicts(cls, dicts: Iterable[Dict[str, Any]]) -> 'ItemBatch':
+        return cls.from_items(Item.from_dict(d) for d in dicts)
+
+    def item(self, idx: int) -> Item:
+        created = self.created[idx]
+        return Item(self.ids[idx], self.titles[idx], self.urls[idx], _number(self.scores[idx]),
+                    _number(self.comments[idx]), self.sources[self.source_codes[idx]], self.subreddits[idx],
+                    None if created != created else _number(created), self.extras.get(idx))
+
+    def __iter__(self) -> Iterator[Item]:
+        return (self.item(idx) for idx in range(len(self)))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [item.to_dict() for item in self]
+
+
+def _number(value: float):
+    # Counts and epoch seconds come back as ints, as they were in the JSON
+    return int(value) if value.is_integer() else value
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Mail Spool
+Durable outbox for rendered briefs, drained by a retrying delivery worker
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from smtp_pool import DeliveryResult, SmtpPool, addressed, pool_from_env
+
+PENDING, SENDING, SENT, DEAD = 'pending', 'sending', 'sent', 'dead'
+# 5xx replies about our own session, not the recipient: retried rather than dead-lettered
+AUTH_CODES = {530, 534, 535}
+# Message bodies kept in memory, most recently used first: a drain pass works through a few
+# messages (one per distinct brief) with many recipients each
+BODY_CACHE_SIZE = 16
+
+
+class Delivery:
+    """One recipient's copy of a spooled message"""
+
+    def __init__(self, delivery_id: int, message_id: int, from_addr: str, recipient: str, attempts: int):
+        self.delivery_id = delivery_id
+        self.message_id = message_id
+        self.from_addr = from_addr
+        self.recipient = recipient
+        self.attempts = attempts
+
+
+class MailSpool:
+    """SQLite outbox: each message body is stored once, with one delivery row per recipient
+
+    Deliveries move pending -> sending -> sent, or back to pending with an
+    exponentially growing delay, and to dead once `max_attempts` is reached or
+    the server rejects them permanently (5xx). A claimed delivery holds a
+    lease; if the worker dies mid-send, the lease expires and it is retried.
+    """
+
+    def __init__(self, path: str = 'data/outbox.sqlite', max_attempts: int = 8,
+                 backoff_base: float = 60.0, max_backoff: float = 3600.0, lease: float = 300.0):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                message_id INTEGER PRIMARY KEY,
+                from_addr TEXT NOT NULL,
+                body BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS deliveries (
+                delivery_id INTEGER PRIMARY KEY,
+                message_id INTEGER NOT NULL REFERENCES messages (message_id),
+                recipient TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_code INTEGER,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (state, next_attempt_at);
+        """)
+        self._db.commit()
+        self._bodies: 'OrderedDict[int, bytes]' = OrderedDict()
+
+    def enqueue(self, from_addr: str, recipients: Iterable[str], body: bytes) -> int:
+        """Spool `body` (encoded without a To: header) for every recipient; returns the message id"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO messages (from_addr, body, created_at) VALUES (?, ?, ?)", (from_addr, body, now)
+            )
+            message_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT INTO deliveries (message_id, recipient, state, next_attempt_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(message_id, rcpt, PENDING, now, now) for rcpt in recipients],
+            )
+            self._db.commit()
+        return message_id
+
+    def claim(self, limit: int) -> List[Delivery]:
+        """Lease up to `limit` deliveries that are due (or whose previous lease ran out)
+
+        Select and lease run in one write transaction, so spools on other
+        connections (another worker, `mail_spool.py watch`) never claim the
+        same rows.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute("""
+                    SELECT d.delivery_id, d.message_id, m.from_addr, d.recipient, d.attempts
+                    FROM deliveries d JOIN messages m USING (message_id)
+                    WHERE d.state IN (?, ?) AND d.next_attempt_at <= ?
+                    ORDER BY d.next_attempt_at, d.delivery_id LIMIT ?
+                """, (PENDING, SENDING, now, limit)).fetchall()
+                self._db.executemany(
+                    "UPDATE deliveries SET state = ?, next_attempt_at = ?, updated_at = ? WHERE delivery_id = ?",
+                    [(SENDING, now + self.lease, now, row[0]) for row in rows],
+                )
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+        return [Delivery(*row) for row in rows]
+
+    def body(self, message_id: int) -> bytes:
+        with self._lock:
+            body = self._bodies.get(message_id)
+            if body is not None:
+                self._bodies.move_to_end(message_id)
+                return body
+            body = self._bodies[message_id] = self._db.execute(
+                "SELECT body FROM messages WHERE message_id = ?", (message_id,)
+            ).fetchone()[0]
+            if len(self._bodies) > BODY_CACHE_SIZE:
+                self._bodies.popitem(last=False)
+            return body
+
+    def _backoff(self, attempts: int) -> float:
+        delay = self.backoff_base * (2 ** (attempts - 1))
+        return min(delay + random.uniform(0, delay / 2), self.max_backoff)
+
+    def record(self, delivery: Delivery, result: DeliveryResult):
+        """Store the outcome of one attempt: sent, retry later, or dead-letter"""
+        now = time.time()
+        attempts = delivery.attempts + 1
+        if result.ok:
+            state, next_at = SENT, now
+        elif (result.code is not None and result.code >= 500 and result.code not in AUTH_CODES) \
+                or attempts >= self.max_attempts:
+            state, next_at = DEAD, now
+        else:
+            state, next_at = PENDING, now + self._backoff(attempts)
+        with self._lock:
+            self._db.execute("""
+                UPDATE deliveries SET state = ?, attempts = ?, next_attempt_at = ?,
+                    last_code = ?, last_error = ?, updated_at = ?
+                WHERE delivery_id = ?
+            """, (state, attempts, next_at, result.code, result.error, now, delivery.delivery_id))
+            self._db.commit()
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest unsent delivery becomes due, or None if nothing is left"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM deliveries WHERE state IN (?, ?)", (PENDING, SENDING)
+            ).fetchone()
+        return row[0]
+
+    def dead_letters(self) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT delivery_id, recipient, attempts, last_code, last_error FROM deliveries "
+                "WHERE state = ? ORDER BY delivery_id", (DEAD,)
+            ).fetchall()
+        keys = ('delivery_id', 'recipient', 'attempts', 'code', 'error')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def requeue_dead(self) -> int:
+        """Give every dead letter a fresh set of attempts"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE deliveries SET state = ?, attempts = 0, next_attempt_at = ?, updated_at = ? WHERE state = ?",
+                (PENDING, now, now, DEAD),
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM deliveries GROUP BY state").fetchall()
+        return {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0, **dict(rows)}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class SpoolWorker:
+    """Drains a MailSpool through an SmtpPool with bounded concurrency
+
+    `drain()` sends everything due right now and returns; `start()` runs the
+    same loop in a background thread, sleeping until the next retry is due
+    (or `wake()`), until `stop()` is called.
+    """
+
+    def __init__(self, spool: MailSpool, pool: SmtpPool, batch_size: int = 100, poll_interval: float = 5.0):
+        self.spool = spool
+        self.pool = pool
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _deliver(self, delivery: Delivery) -> DeliveryResult:
+        try:
+            message = addressed(self.spool.body(delivery.message_id), delivery.recipient)
+            result = self.pool.send(delivery.from_addr, delivery.recipient, message)
+        except Exception as e:
+            result = DeliveryResult(delivery.recipient, False, 1, None, str(e) or type(e).__name__)
+        self.spool.record(delivery, result)
+        return result
+
+    def drain(self) -> Dict[str, int]:
+        """Attempt every delivery that is due now; returns counts of this pass's outcomes"""
+        counts = {'sent': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            while not self._stop.is_set():
+                batch = self.spool.claim(self.batch_size)
+                if not batch:
+                    break
+                for result in executor.map(self._deliver, batch):
+                    counts['sent' if result.ok else 'failed'] += 1
+        return counts
+
+    def run(self):
+        while not self._stop.is_set():
+            self.drain()
+            due = self.spool.next_due()
+            wait = self.poll_interval if due is None else min(max(due - time.time(), 0.0), self.poll_interval)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def wake(self):
+        """Start the next pass now (e.g. right after new messages were enqueued)"""
+        self._wake.set()
+
+    def start(self) -> 'SpoolWorker':
+        self._thread = threading.Thread(target=self.run, name='spool-worker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver or inspect the outbound mail spool")
+    parser.add_argument('command', nargs='?', choices=['drain', 'watch', 'status', 'dead', 'requeue'],
+                        default='drain', help="drain once (default), keep draining, or inspect the spool")
+    parser.add_argument('--spool', default=os.getenv('MAIL_SPOOL_PATH', 'data/outbox.sqlite'))
+    args = parser.parse_args()
+
+    spool = MailSpool(args.spool)
+    try:
+        if args.command == 'status':
+            print(spool.stats())
+        elif args.command == 'dead':
+            for letter in spool.dead_letters():
+                print(f"{letter['recipient']}: {letter['code']} {letter['error']} ({letter['attempts']} attempts)")
+        elif args.command == 'requeue':
+            print(f"Requeued {spool.requeue_dead()} dead letters")
+        else:
+            with pool_from_env(os.getenv('SMTP_EMAIL')) as pool:
+                worker = SpoolWorker(spool, pool)
+                if args.command == 'watch':
+                    try:
+                        worker.run()
+                    except KeyboardInterrupt:
+                        pass
+                else:
+                    counts = worker.drain()
+                    print(f"📧 Spool: {counts['sent']} sent, {counts['failed']} failed this pass; {spool.stats()}")
+    finally:
+        spool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,58 +4,387 @@ Morning Intelligence Brief - Main Orchestrator
 Runs the complete pipeline: scrape -> summarize -> email
 """
 
+import argparse
+import signal
 import sys
 import os
+import traceback
 from datetime import datetime
 
-def main():
-    print("="*60)
-    print("☀️  MORNING INTELLIGENCE BRIEF")
-    print("="*60)
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB')}")
-    print("="*60)
-    print()
-    
-    # Step 1: Scrape data
-    print("Step 1/3: Scraping intelligence data...")
-    print("-" * 60)
-    from scraper import IntelligenceScraper
-    scraper = IntelligenceScraper()
-    data = scraper.collect_all_data()
-    
-    # Save raw data
-    import json
-    os.makedirs('data', exist_ok=True)
-    with open('data/raw_data.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print()
+
+class PipelineError(Exception):
+    """A run that cannot complete: no audience, no sender, or nothing delivered"""
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Morning Intelligence Brief pipeline")
+    parser.add_argument('recipients', nargs='*', metavar='recipient',
+                        help="recipient email(s) (overridden by $RECIPIENT_EMAIL, comma-separated)")
+    parser.add_argument('--recipients-file', default=os.getenv('RECIPIENTS_FILE'), metavar='PATH',
+                        help="file with one recipient per line, added to the others")
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=None,
+                        help="serve repeat requests from data/http_cache.sqlite (default: on, or $HTTP_CACHE)")
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse items already in data/items.sqlite (default: off, or $INCREMENTAL)")
+    parser.add_argument('--skip-sent', type=int, default=int(os.getenv('SKIP_SENT_BRIEFS', '0')), metavar='N',
+                        help="drop items already delivered in the previous N briefs (needs --incremental)")
+    parser.add_argument('--raw-format', choices=['ndjson', 'json'], default=os.getenv('RAW_FORMAT', 'ndjson'),
+                        help="stream data/raw_data.ndjson as sources finish, or write data/raw_data.json at the end")
+    parser.add_argument('--delivery', choices=['direct', 'spool', 'enqueue'], default=os.getenv('DELIVERY', 'direct'),
+                        help="send now; queue in data/outbox.sqlite and drain once (retries left for "
+                             "`python mail_spool.py`); or only queue and exit")
+    parser.add_argument('--profiles', default=os.getenv('SUBSCRIBER_PROFILES'), metavar='PATH',
+                        help="JSON list of subscriber profiles (email, keywords, subreddits, mute) "
+                             "who each get a personalized brief")
+    parser.add_argument('--pipeline', choices=['staged', 'streaming'], default=os.getenv('PIPELINE_MODE', 'staged'),
+                        help="hand data between steps through data/*.json files, or stream sections through "
+                             "summarize and render in memory as their sources finish")
+    parser.add_argument('--artifacts', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('PIPELINE_ARTIFACTS', '1') != '0',
+                        help="in streaming mode, still write data/raw_data.ndjson and data/summary.json (default: on)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="stay resident and run every edition in --schedule, keeping pools and caches warm")
+    parser.add_argument('--schedule', default=os.getenv('DAEMON_SCHEDULE', 'morning=07:00@Asia/Jakarta'),
+                        metavar='SPEC|PATH',
+                        help="editions as name=HH:MM@Timezone[,...] or a JSON schedule file (daemon mode)")
+    parser.add_argument('--archive', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('ARCHIVE', '1') != '0',
+                        help="add every run's stories to the full-text searchable archive (default: on)")
+    parser.add_argument('--archive-path', default=os.getenv('ARCHIVE_PATH', 'data/archive.sqlite'), metavar='PATH',
+                        help="archive database, searched with `python archive.py search`")
+    parser.add_argument('--enrich', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('ENRICH', '0') == '1',
+                        help="fetch descriptions and canonical URLs of likely stories from their pages, "
+                             "within $ENRICH_BUDGET seconds (staged pipeline; default: off)")
+    parser.add_argument('--checkpoint', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('CHECKPOINT', '1') != '0',
+                        help="save each fetched source and stage under data/runs/<run-id>/ (default: on)")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="retry run RUN_ID (or `last`), skipping sources, stages and recipients it "
+                             "completed within $CHECKPOINT_MAX_AGE seconds (default 3600)")
+    parser.add_argument('--report', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('RUN_REPORT', '1') != '0',
+                        help="write stage, source, HTTP and SMTP timings to data/run_report.json (default: on)")
+    parser.add_argument('--prometheus', action='store_true', default=os.getenv('RUN_REPORT_PROMETHEUS') == '1',
+                        help="also write the run report as data/run_report.prom (Prometheus text format)")
+    parser.add_argument('--profile', action='store_true', default=os.getenv('PROFILE') == '1',
+                        help="run under cProfile and save data/run_profile.prof")
+    args = parser.parse_args(argv)
+    if args.daemon and args.resume:
+        # Every edition would reopen the same checkpoint, whose delivered recipients never expire:
+        # from the second edition on, nobody would be sent anything
+        parser.error("--resume retries a single run and cannot be combined with --daemon")
+    return args
+
+def load_recipients(args, recipients=None, recipients_file=None):
+    """Recipients from $RECIPIENT_EMAIL, else the command line, plus --recipients-file; deduplicated
+
+    A daemon edition passes its own `recipients` / `recipients_file` instead.
+    """
+    if recipients is None:
+        env = os.getenv('RECIPIENT_EMAIL')
+        recipients = env.split(',') if env else list(args.recipients)
+    recipients = list(recipients)
+    recipients_file = recipients_file or args.recipients_file
+    if recipients_file:
+        with open(recipients_file, 'r', encoding='utf-8') as f:
+            recipients.extend(line for line in f if not line.lstrip().startswith('#'))
+    return list(dict.fromkeys(r.strip() for r in recipients if r.strip()))
+
+def spool_briefs(groups, drain):
+    """Queue each rendered brief for its recipients in the mail spool and optionally make one delivery pass
+
+    Callers with a running SpoolWorker pass drain=False and wake it instead:
+    one process never drains the same spool twice at once.
+    """
+    from mail_spool import MailSpool, SpoolWorker
+    from smtp_pool import pool_from_env
+
+    from_email = os.getenv('SMTP_EMAIL')
+    if not from_email:
+        raise PipelineError("SMTP_EMAIL is not set")
+    spool = MailSpool(os.getenv('MAIL_SPOOL_PATH', 'data/outbox.sqlite'))
+    try:
+        for generator, recipients in groups:
+            spool.enqueue(from_email, recipients, generator.render_message(from_email))
+        print(f"📮 Queued {len(groups)} brief(s) for {sum(len(r) for _, r in groups)} recipients")
+        if drain:
+            with pool_from_env(from_email) as pool:
+                counts = SpoolWorker(spool, pool).drain()
+            print(f"📧 Sent {counts['sent']}, {counts['failed']} left for retry; spool: {spool.stats()}")
+        from instrumentation import RECORDER
+        RECORDER.count('spool', spool.stats())
+    finally:
+        spool.close()
+
+def write_run_report(args, scraper):
+    """Attach the scraper's counters to the recorded spans and write data/run_report.json"""
+    from email_template import FRAGMENTS
+    from instrumentation import RECORDER
+    RECORDER.count('hn_items', dict(scraper.hn_counts))
+    RECORDER.count('connections', scraper.http.connection_stats())
+    RECORDER.count('rate_limits', scraper.http.limiter.stats())
+    RECORDER.count('fragments', FRAGMENTS.stats())
+    if scraper.http.cache is not None:
+        RECORDER.count('http_cache', scraper.http.cache.stats())
+    if scraper.store:
+        RECORDER.count('item_store', scraper.store.stats())
+    report = RECORDER.write(prometheus=args.prometheus)
+    slowest = max(report['sources'].items(), key=lambda kv: kv[1]['duration_s'], default=None)
+    print(f"📊 Run report saved to data/run_report.json ({len(report['spans'])} spans"
+          + (f", slowest source {slowest[0]} {slowest[1]['duration_s']:.2f}s)" if slowest else ")"))
+
+def open_checkpoint(args):
+    """The run's checkpoint: the one --resume names, else a new one (None with --no-checkpoint)"""
+    from checkpoint import RunCheckpoint
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.resume(args.resume)
+        except KeyError as e:
+            raise PipelineError(e.args[0])
+        print(f"🔖 Resuming run {checkpoint.run_id}")
+        return checkpoint
+    if not args.checkpoint:
+        return None
+    RunCheckpoint.prune()
+    checkpoint = RunCheckpoint()
+    print(f"🔖 Run {checkpoint.run_id} (after a failure, retry with --resume {checkpoint.run_id})")
+    return checkpoint
+
+def enrich_stories(summarizer):
+    """Give the stories likely to make the brief their pages' description and canonical URL"""
+    from enrichment import ArticleEnricher
+    from instrumentation import RECORDER
+    enricher = ArticleEnricher()
+    try:
+        candidates = summarizer.enrichment_candidates()
+        enriched = enricher.enrich(candidates)
+    finally:
+        enricher.close()
+    stats = enricher.stats()
+    RECORDER.count('enrichment', stats)
+    print(f"📰 Enriched {enriched}/{len(candidates)} stories within {enricher.budget:g}s "
+          f"({stats['parsed']} pages parsed, {stats['cached'] + stats['revalidated'] + stats['unchanged']} "
+          f"from cache, {stats['failed']} failed, {stats['late']} over budget)")
+
+def archive_run(args, run_id, raw_data, delivered):
+    """Add this run's stories to the searchable archive (`python archive.py search ...`)"""
+    from archive import BriefArchive
+    archive = BriefArchive(args.archive_path)
+    try:
+        new = archive.add_run(run_id, raw_data, delivered)
+    finally:
+        archive.close()
+    print(f"🗄️  Archived run: {new} new stories in {args.archive_path}")
+
+def run_pipeline(args, scraper, recipients, profiles_path=None, spool_worker=None):
+    """Scrape -> summarize -> deliver once, reusing `scraper` and its HTTP pools, cache and item store
+
+    Staged mode hands data between steps through data/raw_data.* and
+    data/summary.json; streaming mode keeps it in memory and summarizes and
+    renders each section while the remaining sources are still fetching.
+    Timings go to data/run_report.json unless --no-report, even for a failed run.
+    With a running `spool_worker` (daemon mode), spooled briefs are handed to
+    it rather than drained here.
+    """
+    from instrumentation import RECORDER
+    RECORDER.reset()
+    try:
+        _run_pipeline(args, scraper, recipients, profiles_path, spool_worker)
+    finally:
+        if args.report:
+            write_run_report(args, scraper)
+
+def _run_pipeline(args, scraper, recipients, profiles_path, spool_worker=None):
+    from pipeline import StageTimer
+    from summarizer import IntelligenceSummarizer, summary_items
+    from email_sender import EmailGenerator, send_briefs
+    timer = StageTimer()
+    checkpoint = open_checkpoint(args)
+    sent_keys = scraper.store.sent_keys(args.skip_sent) if scraper.store else set()
     
-    # Step 2: Generate summary
-    print("Step 2/3: Generating intelligence summary...")
-    print("-" * 60)
-    from summarizer import IntelligenceSummarizer
-    summarizer = IntelligenceSummarizer()
-    summary = summarizer.generate_summary()
-    summarizer.save_summary(summary)
-    print()
+    if args.pipeline == 'streaming':
+        print("Steps 1-2/3: Scraping, summarizing and rendering sections as sources finish...")
+        print("-" * 60)
+        from pipeline import stream_brief
+        if args.enrich:
+            print("ℹ️  --enrich only applies to the staged pipeline; streaming without it")
+        raw_artifact = 'data/raw_data.ndjson' if args.artifacts else None
+        summary, summarizer, generator = stream_brief(scraper, sent_keys, raw_artifact, checkpoint)
+        timer.mark('scrape+summarize+render')
+        generator.generate_html_email()
+        timer.mark('page')
+        print()
+    else:
+        # Step 1: Scrape data
+        print("Step 1/3: Scraping intelligence data...")
+        print("-" * 60)
+        from scraper import save_raw_data
+        raw_path = save_raw_data(scraper, args.raw_format, checkpoint)
+        timer.mark('scrape')
+        print()
+        
+        # Step 2: Generate summary
+        print("Step 2/3: Generating intelligence summary...")
+        print("-" * 60)
+        summarizer = IntelligenceSummarizer(raw_path, sent_keys=sent_keys)
+        # Recipients still owed a brief after a partial delivery get the same one as the rest
+        summary = checkpoint.load_stage('summary') if checkpoint else None
+        if summary:
+            summarizer.merge_near_duplicates()
+            print(f"♻️  Summary restored from run {checkpoint.run_id}")
+        else:
+            if args.enrich:
+                enrich_stories(summarizer)
+                timer.mark('enrich')
+            summary = summarizer.generate_summary()
+            if checkpoint:
+                checkpoint.save_stage('summary', summary)
+        summarizer.save_summary(summary)
+        timer.mark('summarize')
+        generator = EmailGenerator(summary=summary)
+        generator.generate_html_email()
+        timer.mark('render')
+        print()
     
     # Step 3: Send email
     print("Step 3/3: Sending email...")
     print("-" * 60)
-    from email_sender import EmailGenerator
+    briefs = [(summary, recipients)] if recipients else []
+    if profiles_path:
+        from personalization import Personalizer, load_profiles
+        direct = set(recipients)
+        profiles = [p for p in load_profiles(profiles_path) if p.email not in direct]
+        personalized = Personalizer(profiles).briefs(summary, summarizer.section_candidates())
+        print(f"🎯 {len(profiles)} subscriber profiles -> {len(personalized)} distinct briefs")
+        briefs += personalized
+    if not briefs:
+        raise PipelineError("No recipient email provided\n"
+                            "Set RECIPIENT_EMAIL environment variable or pass as argument")
     
-    recipient_email = os.getenv('RECIPIENT_EMAIL')
-    if not recipient_email:
-        if len(sys.argv) > 1:
-            recipient_email = sys.argv[1]
-        else:
-            print("❌ Error: No recipient email provided")
-            print("Set RECIPIENT_EMAIL environment variable or pass as argument")
-            sys.exit(1)
-    
-    generator = EmailGenerator()
-    generator.send_email(to_email=recipient_email)
+    # A resumed run only sends to recipients the earlier attempt did not reach
+    done = checkpoint.delivered() if checkpoint else set()
+    groups = []
+    for brief, emails in briefs:
+        emails = [email for email in emails if email not in done]
+        if emails:
+            # The global brief keeps its already rendered sections
+            groups.append((generator if brief is summary else EmailGenerator(summary=brief), emails))
+    if done:
+        print(f"♻️  {len(done)} recipients already served by run {checkpoint.run_id}; "
+              f"{sum(len(emails) for _, emails in groups)} left")
+    delivered_to = []
+    if groups and args.delivery != 'direct':
+        spool_briefs(groups, drain=args.delivery == 'spool' and spool_worker is None)
+        if spool_worker is not None:
+            spool_worker.wake()
+        delivered_to = [email for _, emails in groups for email in emails]  # the spool retries the rest
+    elif len(groups) == 1 and len(groups[0][1]) == 1:
+        groups[0][0].send_email(to_email=groups[0][1][0])
+        delivered_to = groups[0][1]
+    elif groups:
+        results = send_briefs(groups)
+        delivered_to = [result.recipient for result in results if result.ok]
+        if not delivered_to:
+            raise PipelineError("the brief was not delivered to any recipient")
+    if checkpoint and delivered_to:
+        checkpoint.add_delivered(delivered_to)
+    timer.mark('deliver')
+    delivered = {id(item): item for brief, _ in briefs for item in summary_items(brief)}
+    # Keyed by run, so a resumed run records its brief and archives its stories only once
+    run_id = checkpoint.run_id if checkpoint else datetime.now().isoformat()
+    if scraper.store:
+        scraper.store.record_brief(run_id, delivered.values())
+    if args.archive:
+        archive_run(args, run_id, summarizer.archive_data(), delivered.values())
+        timer.mark('archive')
+    if args.pipeline == 'streaming' and args.artifacts:
+        summarizer.save_summary(summary)  # debugging artifact, off the critical path
+    timer.report(args.pipeline)
+    print()
+
+def banner(title):
+    print("="*60)
+    print(title)
+    print("="*60)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB')}")
+    print("="*60)
     print()
+
+def run_daemon(args):
+    """Run every scheduled edition in one process until SIGTERM/SIGINT, then drain and exit
+
+    The scraper (HTTP pools, response cache, item store), the compiled email
+    templates and, with --delivery spool/enqueue, a background spool worker
+    stay alive between editions. The first signal lets a running edition
+    finish and the spool worker complete its pass; a second one exits at once.
+    """
+    from scheduler import Scheduler, load_schedule, parse_schedule
+    from scraper import IntelligenceScraper
+    import email_sender, personalization, summarizer  # noqa: F401 - import (and compile templates) once
+
+    editions = load_schedule(args.schedule) if os.path.isfile(args.schedule) else parse_schedule(args.schedule)
+    scraper = IntelligenceScraper(use_cache=args.cache, incremental=args.incremental)
+    worker = None
+    if args.delivery != 'direct' and os.getenv('SMTP_EMAIL'):
+        from mail_spool import MailSpool, SpoolWorker
+        from smtp_pool import pool_from_env
+        worker = SpoolWorker(MailSpool(os.getenv('MAIL_SPOOL_PATH', 'data/outbox.sqlite')),
+                             pool_from_env(os.getenv('SMTP_EMAIL')), poll_interval=60).start()
+
+    def run_edition(edition):
+        banner(f"☀️  MORNING INTELLIGENCE BRIEF — {edition.name} edition")
+        try:
+            recipients = load_recipients(args, edition.recipients, edition.recipients_file)
+            run_pipeline(args, scraper, recipients, edition.profiles or args.profiles, worker)
+            print(f"✅ Edition {edition.name} completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        except PipelineError as e:
+            print(f"❌ Error: {e}")
+        except Exception:
+            print(f"❌ Edition {edition.name} failed:")
+            traceback.print_exc()
+
+    scheduler = Scheduler(editions, run_edition)
+
+    def on_signal(signum, frame):
+        if scheduler.stopped:
+            raise SystemExit(1)
+        print(f"\n🛑 {signal.Signals(signum).name}: finishing current work, then exiting (repeat to force)")
+        scheduler.stop()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    print(f"🕰️  Daemon started with {len(editions)} edition(s): {', '.join(map(repr, editions))}")
+    try:
+        scheduler.run()
+    finally:
+        if worker is not None:
+            worker.stop()
+            worker.pool.close()
+            worker.spool.close()
+        scraper.close()
+        print("👋 Daemon stopped")
+
+def main():
+    args = parse_args()
+    if args.daemon:
+        run_daemon(args)
+        return
+
+    banner("☀️  MORNING INTELLIGENCE BRIEF")
+    from instrumentation import Profiler
+    from scraper import IntelligenceScraper
+    scraper = IntelligenceScraper(use_cache=args.cache, incremental=args.incremental)
+    try:
+        if args.profile:
+            with Profiler():
+                run_pipeline(args, scraper, load_recipients(args), args.profiles)
+        else:
+            run_pipeline(args, scraper, load_recipients(args), args.profiles)
+    except PipelineError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        scraper.close()
     
     print("="*60)
     print("✅ Morning Intelligence Brief completed successfully!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Personalization
+Per-subscriber briefs from one shared story pool via an inverted interest index
+"""
+
+import json
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from classifier import KeywordClassifier
+from summarizer import SECTION_LIMITS, DedupIndex
+
+ITEMS_FIELD = {'ai_ml': 'discussions'}  # every other section keeps its stories under 'items'
+
+
+class SubscriberProfile:
+    """What one subscriber wants: keywords to boost, subreddits to follow, sections to drop"""
+
+    def __init__(self, email: str, keywords: Iterable[str] = (), subreddits: Iterable[str] = (),
+                 mute: Iterable[str] = ()):
+        self.email = email
+        self.keywords = [kw.lower() for kw in keywords if kw.strip()]
+        self.subreddits = [sub.lower().removeprefix('r/') for sub in subreddits if sub.strip()]
+        self.mute = frozenset(mute)
+
+
+def load_profiles(path: str) -> List[SubscriberProfile]:
+    """Profiles from a JSON list of {"email", "keywords", "subreddits", "mute"} objects"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    return [
+        SubscriberProfile(row['email'], row.get('keywords', []), row.get('subreddits', []), row.get('mute', []))
+        for row in rows if row.get('email')
+    ]
+
+
+class Personalizer:
+    """Top-k stories per section for every subscriber in a single pass over the pool
+
+    Keywords and subreddits are indexed to the subscribers that follow them,
+    so each story is matched once (one KeywordClassifier scan of its title)
+    and handed to exactly the subscribers it interests, in score order, until
+    their section is full. Whatever a subscriber's interests leave empty is
+    backfilled from the global summary, so everyone still gets a full brief.
+    Subscribers whose picks come out identical share one summary object.
+    """
+
+    def __init__(self, profiles: List[SubscriberProfile], limits: Optional[Dict[str, int]] = None):
+        self.profiles = profiles
+        self.limits = limits or SECTION_LIMITS
+        # Posting lists: keyword (or 'r/<subreddit>') -> indexes of the subscribers following it
+        self._postings: Dict[str, List[int]] = {}
+        for idx, profile in enumerate(profiles):
+            for kw in dict.fromkeys(profile.keywords):
+                self._postings.setdefault(kw, []).append(idx)
+            for sub in dict.fromkeys(profile.subreddits):
+                self._postings.setdefault('r/' + sub, []).append(idx)
+        keywords = [kw for profile in profiles for kw in profile.keywords]
+        # One "category" per keyword, so classify() returns the keywords found in a title
+        self._classifier = KeywordClassifier({kw: [kw] for kw in keywords}) if keywords else None
+
+    def terms(self, item: Dict) -> List[str]:
+        """Posting-list keys that match `item`: keywords in its title, plus its subreddit"""
+        found = list(self._classifier.classify(item.get('title', ''))) if self._classifier is not None else []
+        sub = 'r/' + (item.get('subreddit') or '').lower()
+        if sub in self._postings:
+            found.append(sub)
+        return found
+
+    def interested(self, item: Dict) -> Set[int]:
+        """Indexes of the subscribers whose keywords or subreddits match `item`"""
+        return {idx for term in self.terms(item) for idx in self._postings[term]}
+
+    def pick(self, candidates: Dict[str, List[Dict]]) -> List[Dict[str, List[Dict]]]:
+        """Per subscriber, the matching stories of each section (score order, capped, no repeats)"""
+        picks: List[Dict[str, List[Dict]]] = [{} for _ in self.profiles]
+        seen: List[Set[Tuple[str, str]]] = [set() for _ in self.profiles]
+        matches: Dict[int, Tuple[List[str], Tuple[str, str]]] = {}  # merged stories recur across sections
+        for section, items in candidates.items():
+            limit = self.limits.get(section, 0)
+            if limit <= 0:
+                continue
+            # Subscribers this section can no longer take stories for: muted it, or already full
+            closed = {idx for idx, profile in enumerate(self.profiles) if section in profile.mute}
+            # Still-open followers per term, pruned lazily so full subscribers are skipped only once
+            open_followers: Dict[str, List[int]] = {}
+            for item in items:
+                cached = matches.get(id(item))
+                if cached is None:
+                    cached = matches[id(item)] = (self.terms(item), DedupIndex.keys(item))
+                terms, keys = cached
+                for term in terms:
+                    followers = open_followers.get(term)
+                    if followers is None:
+                        followers = self._postings[term]
+                    still_open = []
+                    for idx in followers:
+                        if idx in closed:
+                            continue
+                        still_open.append(idx)
+                        if keys in seen[idx]:
+                            continue
+                        seen[idx].add(keys)
+                        chosen = picks[idx].setdefault(section, [])
+                        chosen.append(item)
+                        if len(chosen) >= limit:
+                            closed.add(idx)
+                    open_followers[term] = still_open
+        return picks
+
+    def briefs(self, summary: Dict, candidates: Dict[str, List[Dict]]) -> List[Tuple[Dict, List[str]]]:
+        """(summary, recipient emails) groups; the first is the unchanged global summary"""
+        groups: Dict[Tuple, Tuple[Dict, List[str]]] = {(): (summary, [])}
+        for profile, chosen in zip(self.profiles, self.pick(candidates)):
+            signature = _signature(profile.mute & set(summary['sections']), chosen)
+            if signature not in groups:
+                groups[signature] = (self._personalized(summary, profile.mute, chosen), [])
+            groups[signature][1].append(profile.email)
+        return [group for group in groups.values() if group[1]]
+
+    def _personalized(self, summary: Dict, mute: FrozenSet[str], chosen: Dict[str, List[Dict]]) -> Dict:
+        seen = {DedupIndex.keys(item) for items in chosen.values() for item in items}
+        sections = {}
+        for section, data in summary['sections'].items():
+            if section in mute:
+                continue
+            field = ITEMS_FIELD.get(section, 'items')
+            if field not in data:
+                sections[section] = data
+                continue
+            items = list(chosen.get(section, ()))
+            for item in data[field]:
+                if len(items) >= self.limits.get(section, 0):
+                    break
+                keys = DedupIndex.keys(item)
+                if keys not in seen:
+                    seen.add(keys)
+                    items.append(item)
+            unchanged = len(items) == len(data[field]) and all(a is b for a, b in zip(items, data[field]))
+            sections[section] = data if unchanged else {**data, field: items}
+        return {**summary, 'sections': sections}
+
+
+def _signature(mute: Set[str], chosen: Dict[str, List[Dict]]) -> Tuple:
+    if not mute and not chosen:
+        return ()
+    return (tuple(sorted(mute)),) + tuple(
+        (section, tuple(id(item) for item in items)) for section, items in sorted(chosen.items())
+    )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Streaming Pipeline
+Summarizes and renders each section in memory as soon as its sources finish
+"""
+
+import time
+from typing import Dict, List, Optional, Set
+
+from checkpoint import RunCheckpoint
+from email_sender import EmailGenerator
+from instrumentation import RECORDER
+from scraper import SECTIONS, IntelligenceScraper, RawDataWriter
+from summarizer import IntelligenceSummarizer
+
+
+class StageTimer:
+    """Wall-clock durations of consecutive pipeline stages, for the critical-path report"""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.stages: List[tuple] = []
+        self._last = self.start
+
+    def mark(self, stage: str):
+        """End `stage` now (it began where the previous stage ended); also recorded as a span"""
+        now = time.monotonic()
+        self.stages.append((stage, now - self._last))
+        RECORDER.add(stage, 'stage', self._last, now - self._last)
+        self._last = now
+
+    def report(self, mode: str, notes: str = ''):
+        path = ' → '.join(f"{stage} {seconds:.2f}s" for stage, seconds in self.stages)
+        total = self._last - self.start
+        print(f"⏱️  Critical path ({mode}): {path} = {total:.2f}s{notes}")
+
+
+class SectionStream:
+    """Sink for `IntelligenceScraper.collect_all_data` that finishes sections while scraping runs
+
+    A section is complete once every source that can feed it has reported.
+    Sections are summarized in page order (the shared dedup index depends on
+    it): as soon as the next section is complete, it is near-duplicate
+    merged, summarized and rendered to HTML on the collecting thread while
+    the remaining fetchers keep running. Writes are also forwarded to
+    `artifact`, when given, so raw_data.ndjson is still produced.
+    """
+
+    def __init__(self, scraper: IntelligenceScraper, summarizer: IntelligenceSummarizer,
+                 generator: EmailGenerator, artifact: Optional[RawDataWriter] = None):
+        self.summarizer = summarizer
+        self.generator = generator
+        self.artifact = artifact
+        self.pending: Dict[str, Set[str]] = {section: set() for section in SECTIONS}
+        for name in scraper.sources():
+            for section in scraper.source_sections(name):
+                self.pending[section].add(name)
+        self.shown: List[Dict] = []
+        self.merged = 0
+        self.ready_at: Dict[str, float] = {}
+        self._next = 0
+        self._start = time.perf_counter()
+
+    def write(self, section: str, key: str, items: List[Dict]):
+        self.summarizer.raw_data.setdefault(section, {})[key] = items
+        if self.artifact:
+            self.artifact.write(section, key, items)
+
+    def source_finished(self, name: str):
+        for pending in self.pending.values():
+            pending.discard(name)
+        if self.artifact:
+            self.artifact.source_finished(name)
+        self._advance()
+
+    def finish(self, timed_out: List[str]):
+        """Collection is over: whatever has not reported (timed out) will not"""
+        self.summarizer.raw_data['timed_out_sources'] = timed_out
+        for pending in self.pending.values():
+            pending.clear()
+        if self.artifact:
+            self.artifact.finish(timed_out)
+        self._advance()
+
+    def _advance(self):
+        while self._next < len(SECTIONS) and not self.pending[SECTIONS[self._next]]:
+            section = SECTIONS[self._next]
+            self.merged += self.summarizer.merge_section_near_duplicates(section, self.shown)
+            data = self.summarizer.summarize_section(section)
+            self.generator.summary['sections'][section] = data
+            self.generator.render_section(section)
+            self.shown.extend(data.get('items', []) + data.get('discussions', []))
+            self.ready_at[section] = time.perf_counter() - self._start
+            self._next += 1
+
+
+def stream_brief(scraper: IntelligenceScraper, sent_keys=None, raw_artifact: Optional[str] = None,
+                 checkpoint: Optional[RunCheckpoint] = None):
+    """Scrape, summarize and render in one overlapped pass; returns (summary, summarizer, generator)
+
+    Nothing is read back from disk. With `raw_artifact`, raw records are
+    also streamed to that NDJSON path as a by-product.
+    """
+    summarizer = IntelligenceSummarizer(raw_data={section: {} for section in SECTIONS}, sent_keys=sent_keys)
+    summary = summarizer.new_summary({})
+    generator = EmailGenerator(summary=summary)
+    artifact = RawDataWriter(raw_artifact) if raw_artifact else None
+    try:
+        stream = SectionStream(scraper, summarizer, generator, artifact)
+        scraper.collect_all_data(sink=stream, checkpoint=checkpoint)
+    finally:
+        if artifact:
+            artifact.close()
+    if stream.merged:
+        print(f"🔗 Merged {stream.merged} near-duplicate story clusters")
+    print("✅ Sections ready at " + ', '.join(f"{s} +{t:.2f}s" for s, t in stream.ready_at.items()))
+    return summary, summarizer, generator
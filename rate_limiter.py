@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Rate Limiter
+Per-host token buckets that adapt to the rate-limit headers upstreams send back
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+# (requests per second, burst) for hosts (or host/API, see SEPARATE_APIS) with a known budget;
+# others are unthrottled until they send rate-limit headers
+DEFAULT_RATE_LIMITS = {
+    'www.reddit.com': (2.0, 8),
+    'api.github.com/search': (10 / 60, 10),  # unauthenticated search API: 10 requests a minute
+}
+# (host, path prefix) of APIs whose budget is separate from the rest of their host's
+SEPARATE_APIS: List[Tuple[str, str]] = [
+    ('api.github.com', '/search/'),
+    ('api.github.com', '/graphql'),
+]
+# Budget of a host first throttled by its own rate-limit headers
+ADAPTIVE_RATE_LIMIT = (10.0, 10)
+# Longest a Retry-After may hold a host back
+MAX_PAUSE = 30.0
+
+
+class TokenBucket:
+    """Token bucket whose callers reserve slots in arrival order
+
+    `reserve()` takes a token and returns how long the caller must wait for
+    it; concurrent callers queue behind each other instead of all waking at
+    once. `pause()` empties the bucket until a point in time (Retry-After,
+    exhausted quota) and `adapt()` resyncs it with the server's own count.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = self.base_rate = rate
+        self.capacity = self.base_capacity = capacity
+        self.tokens = float(capacity)
+        self.inflight = 0
+        self.waits = 0
+        self.waited = 0.0
+        self._updated = time.monotonic()  # refill resumes from here; later than now while paused
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            if self.tokens < self.capacity:
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._updated - now) + max(0.0, 1 - self.tokens) / self.rate
+            self.tokens -= 1
+            self.inflight += 1
+            if wait > 0:
+                self.waits += 1
+                self.waited += wait
+            return wait
+
+    def release(self):
+        with self._lock:
+            self.inflight = max(0, self.inflight - 1)
+
+    def pause(self, seconds: float):
+        """No requests for `seconds` (on top of any pause already in force)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+
+    def adapt(self, remaining: float, reset_in: float):
+        """Trust the server: `remaining` requests are left until the window resets in `reset_in` seconds"""
+        if remaining < 1:
+            self.pause(reset_in)
+            with self._lock:
+                # The next window's budget is unknown until its first response: start it at the configured one
+                self.rate, self.capacity = self.base_rate, self.base_capacity
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            # Requests still in flight were probably not counted by the server yet
+            self.tokens = remaining - self.inflight
+            # The burst follows the server's count, shrinking as the window drains and growing back
+            # once it resets
+            self.capacity = max(self.base_capacity, remaining)
+            # Spread what is left over the window, even if that is slower than the configured rate
+            self.rate = remaining / max(reset_in, 1.0)
+
+
+def limit_key(url: str) -> str:
+    """The rate-limit bucket of `url`: its host, plus the API path prefix where a host has several budgets"""
+    parsed = urlparse(url)
+    for host, prefix in SEPARATE_APIS:
+        if parsed.hostname == host and parsed.path.startswith(prefix):
+            return parsed.netloc + prefix.rstrip('/')
+    return parsed.netloc
+
+
+class RateLimiter:
+    """Token buckets keyed by `limit_key` (usually the host), shared by every fetcher of an HttpClient
+
+    A 429/503 on a host without a bucket only closes a gate until its
+    Retry-After: once that passes the host is unthrottled again, rather than
+    capped at ADAPTIVE_RATE_LIMIT for the rest of the process.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, max_pause: float = MAX_PAUSE):
+        self.limits = DEFAULT_RATE_LIMITS if limits is None else limits
+        self.max_pause = max_pause
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._gates: Dict[str, float] = {}  # host -> monotonic time its pause ends
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str, create: bool = False) -> Optional[TokenBucket]:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                netloc, _, api = host.partition('/')
+                name = netloc.split(':')[0] + ('/' + api if api else '')
+                limit = self.limits.get(name) or (ADAPTIVE_RATE_LIMIT if create else None)
+                if limit is not None:
+                    bucket = self._buckets[host] = TokenBucket(*limit)
+            return bucket
+
+    def acquire(self, host: str) -> float:
+        """Block until `host` may be sent a request; returns the seconds spent waiting"""
+        bucket = self.bucket(host)
+        if bucket is None:
+            wait = self._gate_wait(host)
+        else:
+            wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def _gate_wait(self, host: str) -> float:
+        with self._lock:
+            until = self._gates.get(host)
+            if until is None:
+                return 0.0
+            wait = until - time.monotonic()
+            if wait <= 0:
+                del self._gates[host]
+                return 0.0
+            return wait
+
+    def complete(self, host: str, response: Optional[requests.Response]):
+        """Account for a finished request and adapt to the rate-limit headers of its response"""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            bucket.release()
+        if response is None:
+            return
+        headers = response.headers
+        remaining = _number(headers.get('X-RateLimit-Remaining'))
+        reset = _number(headers.get('X-RateLimit-Reset'))
+        if remaining is not None and reset is not None:
+            # GitHub sends the reset as an epoch timestamp, Reddit as seconds from now
+            reset_in = reset - time.time() if reset > 1e9 else reset
+            self.bucket(host, create=True).adapt(remaining, max(reset_in, 0.0))
+        retry_after = _number(headers.get('Retry-After'))
+        if retry_after is not None and response.status_code in (429, 503):
+            self.pause(host, retry_after)
+
+    def pause(self, host: str, seconds: float):
+        """Hold `host` back for `seconds`, at most `max_pause`"""
+        seconds = min(max(seconds, 0.0), self.max_pause)
+        bucket = self.bucket(host)
+        if bucket is not None:
+            bucket.pause(seconds)
+            return
+        with self._lock:
+            self._gates[host] = max(self._gates.get(host, 0.0), time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per host with a bucket: current rate, requests that had to wait and total wait"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: {'rate': round(b.rate, 3), 'waits': b.waits, 'waited_s': round(b.waited, 3)}
+                for host, b in buckets.items()}
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
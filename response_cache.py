@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Response Cache
+Persistent, size-bounded HTTP response cache with per-source TTLs and revalidation
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# (host, path prefix, TTL seconds) — first match wins, TTL 0 means never cache
+DEFAULT_TTLS: List[Tuple[str, str, int]] = [
+    ('hacker-news.firebaseio.com', '/v0/item/', 6 * 3600),
+    ('hacker-news.firebaseio.com', '/v0/topstories', 5 * 60),
+    ('www.reddit.com', '/r/', 10 * 60),
+    ('api.github.com', '/search/', 60 * 60),
+    ('newsapi.org', '/v2/', 30 * 60),
+]
+DEFAULT_TTL = 10 * 60
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CachedResponse:
+    """One stored response and the bookkeeping needed to decide if it is usable"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, stored_at: float, ttl: int):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry upstream"""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.url = url
+        response.encoding = 'utf-8'
+        return response
+
+
+class ResponseCache:
+    """SQLite-backed response cache keyed by URL + params, evicting least recently used entries"""
+
+    def __init__(self, path: str = 'data/http_cache.sqlite', max_bytes: int = 50 * 1024 * 1024,
+                 ttls: Optional[List[Tuple[str, str, int]]] = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else DEFAULT_TTLS
+        self.hits = self.misses = self.revalidated = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                ttl INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """Stable key for a request; hashed so API keys in params are never stored"""
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url: str) -> int:
+        parsed = urlparse(url)
+        for host, prefix, ttl in self.ttls:
+            if parsed.hostname == host and parsed.path.startswith(prefix):
+                return ttl
+        return DEFAULT_TTL
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, stored_at, ttl FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        status, headers, body, stored_at, ttl = row
+        return CachedResponse(status, json.loads(headers), body, stored_at, ttl)
+
+    def put(self, key: str, response: requests.Response, ttl: int):
+        headers = {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers}
+        body = response.content
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, json.dumps(headers), body, len(body), now, ttl, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key: str):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
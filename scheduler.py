@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - Scheduler
+Edition schedule for daemon mode: local delivery times per timezone
+"""
+
+import json
+import threading
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+class Edition:
+    """One scheduled brief: a local time of day in a timezone, and who receives it
+
+    `recipients`, `recipients_file` and `profiles` override the command-line
+    audience for this edition; left unset, the edition goes to that audience.
+    An edition whose time passed less than `window_minutes` ago (daemon just
+    started, or the previous edition ran long) still runs; older ones are skipped.
+    """
+
+    def __init__(self, name: str, at: str, timezone: str = 'Asia/Jakarta', days: Optional[List[str]] = None,
+                 window_minutes: float = 30, recipients: Optional[List[str]] = None,
+                 recipients_file: Optional[str] = None, profiles: Optional[str] = None):
+        self.name = name
+        hour, minute = at.split(':')
+        self.at = dtime(int(hour), int(minute))
+        self.tz = ZoneInfo(timezone)
+        self.days = {DAYS.index(day.lower()[:3]) for day in days} if days else set(range(7))
+        self.window = timedelta(minutes=window_minutes)
+        self.recipients = recipients
+        self.recipients_file = recipients_file
+        self.profiles = profiles
+
+    def next_run(self, after: datetime) -> datetime:
+        """First scheduled time strictly after `after` (both timezone-aware)"""
+        day = after.astimezone(self.tz).date()
+        for offset in range(8):
+            candidate = datetime.combine(day + timedelta(days=offset), self.at, tzinfo=self.tz)
+            if candidate.weekday() in self.days and candidate > after:
+                return candidate
+        raise ValueError(f"edition {self.name!r} has no scheduled days")
+
+    def __repr__(self):
+        return f"Edition({self.name!r}, {self.at:%H:%M} {self.tz.key})"
+
+
+def load_schedule(path: str) -> List[Edition]:
+    """Editions from a JSON list of {"name", "at", "timezone", "days", "window_minutes", "recipients", ...}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    return [Edition(**row) for row in rows]
+
+
+def parse_schedule(spec: str) -> List[Edition]:
+    """Editions from a compact spec like "morning=07:00@Asia/Jakarta,evening=18:00@Asia/Jakarta" """
+    editions = []
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, when = part.rpartition('=')
+        at, _, tz = when.partition('@')
+        editions.append(Edition(name or at, at, tz or 'Asia/Jakarta'))
+    return editions
+
+
+class Scheduler:
+    """Runs each edition at its next scheduled time until stopped
+
+    Editions run one at a time on the calling thread. `stop()` (e.g. from a
+    SIGTERM handler) wakes an idle scheduler immediately; an edition already
+    running is allowed to finish first.
+    """
+
+    def __init__(self, editions: List[Edition], run_edition: Callable[[Edition], None]):
+        self.editions = editions
+        self.run_edition = run_edition
+        self._stop = threading.Event()
+        now = datetime.now(timezone.utc)
+        # Last time considered per edition; starting a window back catches an edition just missed
+        self._cursor: Dict[str, datetime] = {e.name: now - e.window for e in editions}
+
+    def upcoming(self) -> List[tuple]:
+        """(next run time, edition) pairs, soonest first"""
+        return sorted(((e.next_run(self._cursor[e.name]), e) for e in self.editions), key=lambda pair: pair[0])
+
+    def run(self):
+        while not self._stop.is_set():
+            when, edition = self.upcoming()[0]
+            delay = (when - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                print(f"⏰ Next edition: {edition.name} at {when:%Y-%m-%d %H:%M %Z} (in {delay / 60:.0f} min)")
+                # Wake at least hourly so clock changes (suspend, NTP steps) are noticed
+                if self._stop.wait(min(delay, 3600)):
+                    break
+                continue
+            self._cursor[edition.name] = when
+            if datetime.now(timezone.utc) - when > edition.window:
+                print(f"⏭️  Skipping edition {edition.name} scheduled at {when:%Y-%m-%d %H:%M %Z}: window passed")
+                continue
+            self.run_edition(edition)
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
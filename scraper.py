@@ -4,17 +4,183 @@ Morning Intelligence Brief - Data Scraper
 Fetches news, tech updates, AI/ML developments, startup news, and market data
 """
 
-import requests
+import argparse
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Callable, Tuple
 import os
+import threading
 import time
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from checkpoint import RunCheckpoint
+from classifier import KeywordClassifier
+from instrumentation import RECORDER
+from http_client import HttpClient
+from item_store import ItemStore
+from response_cache import ResponseCache
+
+
+# ── Keyword lists ────────────────────────────────────────────────────────────
+AI_KW = [
+    'ai', 'llm', 'gpt', 'openai', 'claude', 'anthropic', 'gemini', 'mistral',
+    'ollama', 'diffusion', 'transformer', 'neural network', 'machine learning',
+    'deep learning', 'artificial intelligence', 'chatgpt', 'copilot', 'rag ',
+    'vector db', 'fine-tun', 'inference', 'embedding', 'multimodal', 'llama',
+    'hugging face', 'langchain', 'agent', 'openrouter', 'deepseek', 'qwen',
+]
+STARTUP_KW = [
+    'startup', 'we launched', 'show hn:', 'just launched', 'new tool',
+    'funding', 'raises $', 'series a', 'series b', 'seed round',
+    'y combinator', 'yc ', 'acquired', 'ipo', 'saas', 'mrr', 'arr',
+    'bootstrapped', 'founder', 'side project', 'open source alternative',
+]
+JOB_KW = [
+    "who is hiring", "ask hn: who", "we're hiring", "we are hiring",
+    'job opening', 'remote position', 'founding engineer', 'join our team',
+    'looking for engineer', 'looking for developer', 'hiring engineer',
+    'hiring developer', 'senior engineer', 'full-stack', 'backend engineer',
+    'frontend engineer', 'contract work', 'freelance',
+]
+WORLD_KW = [
+    'china', 'russia', 'ukraine', 'europe', 'nato', 'war ', 'conflict',
+    'election', 'president', 'government', 'policy', 'regulation', 'law ',
+    'economy', 'recession', 'inflation', 'tariff', 'trade war', 'sanction',
+    'climate', 'nuclear', 'pentagon', 'congress', 'senate', 'supreme court',
+    'geopolit', 'international', 'global ', 'world ', 'country', 'nation',
+]
+
+# Compiled once per process; replaces one filter_by_keywords scan per category
+HN_CLASSIFIER = KeywordClassifier({
+    'ai_ml': AI_KW,
+    'startups': STARTUP_KW,
+    'remote_jobs': JOB_KW,
+    'world_news': WORLD_KW,
+})
+
+HN_SECTIONS = {
+    'ai_ml':       ('hackernews_ai',      8),
+    'startups':    ('hackernews_startup', 6),
+    'remote_jobs': ('hackernews_jobs',    6),
+    'world_news':  ('hackernews_world',   8),
+}
+
+# ── Source layout: (section, raw-data key, ...) ──────────────────────────────
+REDDIT_SOURCES = [
+    ('ai_ml',       'r_machinelearning', 'MachineLearning',  6),
+    ('ai_ml',       'r_localllama',      'LocalLLaMA',       5),
+    ('startups',    'r_startups',        'startups',         5),
+    ('remote_jobs', 'r_remotework',      'remotework',       5),
+    ('remote_jobs', 'r_forhire',         'forhire',          5),
+    ('world_news',  'r_worldnews',       'worldnews',        6),
+    ('world_news',  'r_geopolitics',     'geopolitics',      4),
+]
+GITHUB_SOURCES = [
+    ('ai_ml', 'github_python',   {'language': 'python'}),
+    ('ai_ml', 'github_ai_topic', {'topic': 'machine-learning'}),
+]
+NEWSAPI_SOURCES = [
+    ('world_news', 'newsapi_general',  {'category': 'general'}),
+    ('world_news', 'newsapi_business', {'category': 'business'}),
+    ('ai_ml',      'newsapi_tech',     {'query': 'artificial intelligence OR machine learning'}),
+]
+SECTIONS = ['tech_news', 'ai_ml', 'startups', 'remote_jobs', 'world_news']
+SOURCE_SECTIONS = {key: section for section, key, *_ in REDDIT_SOURCES + GITHUB_SOURCES + NEWSAPI_SOURCES}
+# Combined multireddit listing: posts per page (Reddit's maximum) and pages before falling back
+REDDIT_PAGE_SIZE = 100
+REDDIT_MAX_PAGES = 3
+# Repos per GitHub search (REST page size / GraphQL `first`)
+GITHUB_PER_QUERY = 5
+GITHUB_REPO_FIELDS = 'fragment repo on Repository { nameWithOwner description url stargazerCount primaryLanguage { name } }'
+
+
+def _epoch(timestamp: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO-8601 timestamp like NewsAPI's "2026-01-02T07:00:00Z", or None"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class RawDataWriter:
+    """Streams raw data as NDJSON, one record per item, as each source finishes
+
+    Record types: a `meta` header with the run timestamp, a `key` record
+    opening each section list, an `item` record per item, and a final `end`
+    record listing timed-out sources (readers treat its absence as a run
+    still in progress).
+    """
+
+    def __init__(self, path: str = 'data/raw_data.ndjson'):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._emit({'type': 'meta', 'timestamp': datetime.now().isoformat()})
+        self._file.flush()
+
+    def _emit(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def write(self, section: str, key: str, items: List[Dict]):
+        self._emit({'type': 'key', 'section': section, 'key': key})
+        for item in items:
+            self._emit({'type': 'item', 'section': section, 'key': key, 'item': item})
+        self._file.flush()
+
+    def source_finished(self, name: str):
+        """Called after all of a source's lists were written (nothing to record in NDJSON)"""
+
+    def finish(self, timed_out: List[str]):
+        self._emit({'type': 'end', 'timed_out_sources': timed_out})
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 class IntelligenceScraper:
-    def __init__(self):
+    def __init__(self, hn_concurrency: Optional[int] = None,
+                 source_timeout: Optional[float] = None, collect_timeout: Optional[float] = None,
+                 use_cache: Optional[bool] = None, incremental: Optional[bool] = None):
         self.news_api_key = os.getenv('NEWS_API_KEY', '')
+        self.hn_api = os.getenv('HN_API_BASE', 'https://hacker-news.firebaseio.com/v0').rstrip('/')
+        # Upstream bases are overridable so benchmarks can point the scraper at a local stand-in
+        self.reddit_base = os.getenv('REDDIT_BASE', 'https://www.reddit.com').rstrip('/')
+        self.github_api = os.getenv('GITHUB_API_BASE', 'https://api.github.com').rstrip('/')
+        self.news_api = os.getenv('NEWS_API_BASE', 'https://newsapi.org/v2').rstrip('/')
+        # Max in-flight HN item requests (1 = sequential)
+        self.hn_concurrency = hn_concurrency or int(os.getenv('HN_CONCURRENCY', '16'))
+        # Deadlines (seconds) for one source and for the whole collection
+        self.source_timeout = source_timeout or float(os.getenv('SOURCE_TIMEOUT', '30'))
+        self.collect_timeout = collect_timeout or float(os.getenv('COLLECT_TIMEOUT', '60'))
+        if use_cache is None:
+            use_cache = os.getenv('HTTP_CACHE', '1') != '0'
+        # Shared keep-alive pools; the HN pool is sized to the item fetch concurrency
+        self.http = HttpClient(
+            pool_sizes={urlparse(self.hn_api).hostname: self.hn_concurrency},
+            max_retries=int(os.getenv('HTTP_MAX_RETRIES', '3')),
+            cache=ResponseCache(os.getenv('HTTP_CACHE_PATH', 'data/http_cache.sqlite')) if use_cache else None,
+        )
+        if incremental is None:
+            incremental = os.getenv('INCREMENTAL', '0') == '1'
+        # Seen-item store: known HN ids are served or only re-scored instead of refetched
+        self.store = ItemStore(os.getenv('ITEM_STORE_PATH', 'data/items.sqlite')) if incremental else None
+        self.hn_refresh_after = float(os.getenv('HN_REFRESH_AFTER', '900'))
+        # One combined r/a+b+c listing instead of a request per subreddit
+        self.reddit_batch = os.getenv('REDDIT_BATCH', '1') != '0'
+        # All GitHub searches as one source: one GraphQL request when a token is set, deduplicated repos
+        self.github_batch = os.getenv('GITHUB_BATCH', '1') != '0'
+        self.github_token = os.getenv('GITHUB_TOKEN', '')
+        self.hn_counts = {'new': 0, 'refreshed': 0, 'stored': 0}
+        self._counts_lock = threading.Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
@@ -23,31 +189,79 @@ class IntelligenceScraper:
             'Accept': 'application/json',
         }
 
-    def fetch_hackernews_top(self, limit=60) -> List[Dict]:
-        """Fetch top stories from HackerNews"""
+    def _count(self, kind: str):
+        with self._counts_lock:
+            self.hn_counts[kind] += 1
+
+    def _fetch_hn_item(self, story_id: int) -> Optional[Dict]:
+        """Fetch one HN item, returning None if it is not a titled story
+
+        In incremental mode ids already in the store are not parsed again:
+        known non-stories are skipped outright, recently refreshed stories are
+        served from the store, and older ones only get score/comments updated.
+        """
+        known = self.store.get('HackerNews', story_id) if self.store else None
+        if known is not None and (known.item is None or time.time() - known.refreshed_at < self.hn_refresh_after):
+            self._count('stored')
+            return known.item
+
+        # A refresh must not be answered by a cached copy older than the one in the store
+        max_age = self.hn_refresh_after if known is not None else None
+        story_response = self.http.get(f"{self.hn_api}/item/{story_id}.json", max_age=max_age, timeout=10)
+        story_data = story_response.json()
+        if known is not None:
+            if not story_data:
+                return None
+            story = {**known.item, 'score': story_data.get('score', 0), 'comments': story_data.get('descendants', 0)}
+            self.store.upsert('HackerNews', story_id, story)
+            self._count('refreshed')
+            return story
+
+        story = None
+        if story_data and story_data.get('type') == 'story' and story_data.get('title'):
+            story = {
+                'id': story_id,
+                'title': story_data.get('title', ''),
+                'url': story_data.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+                'score': story_data.get('score', 0),
+                'comments': story_data.get('descendants', 0),
+                'created': story_data.get('time'),
+                'source': 'HackerNews'
+            }
+        if self.store and story_data:
+            self.store.upsert('HackerNews', story_id, story)
+            self._count('new')
+        return story
+
+    def fetch_hackernews_top(self, limit=60, concurrency: Optional[int] = None) -> List[Dict]:
+        """Fetch top stories from HackerNews
+
+        Item documents are fetched by a bounded thread pool. IDs are scheduled
+        in top-story order and scheduling stops once `limit` valid stories are
+        in hand; in-flight requests are drained so the result is exactly the
+        first `limit` stories a sequential walk would return.
+        """
         try:
-            response = requests.get(
-                "https://hacker-news.firebaseio.com/v0/topstories.json", timeout=10
-            )
+            response = self.http.get(f"{self.hn_api}/topstories.json", timeout=10)
             story_ids = response.json()[:limit * 2]
+            workers = max(1, concurrency or self.hn_concurrency)
 
-            stories = []
-            for story_id in story_ids:
-                if len(stories) >= limit:
-                    break
-                story_response = requests.get(
-                    f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json", timeout=10
-                )
-                story_data = story_response.json()
-                if story_data and story_data.get('type') == 'story' and story_data.get('title'):
-                    stories.append({
-                        'title': story_data.get('title', ''),
-                        'url': story_data.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                        'score': story_data.get('score', 0),
-                        'comments': story_data.get('descendants', 0),
-                        'source': 'HackerNews'
-                    })
-            return stories
+            found: Dict[int, Dict] = {}
+            pending = {}
+            next_idx = 0
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                while pending or (len(found) < limit and next_idx < len(story_ids)):
+                    while len(found) < limit and next_idx < len(story_ids) and len(pending) < workers:
+                        pending[pool.submit(self._fetch_hn_item, story_ids[next_idx])] = next_idx
+                        next_idx += 1
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idx = pending.pop(future)
+                        story = future.result()
+                        if story:
+                            found[idx] = story
+
+            return [found[idx] for idx in sorted(found)][:limit]
         except Exception as e:
             print(f"Error fetching HackerNews: {e}")
             return []
@@ -63,15 +277,24 @@ class IntelligenceScraper:
                 break
         return result
 
+    @staticmethod
+    def _reddit_post(pd: Dict, subreddit: str) -> Dict:
+        return {
+            'id': pd.get('id'),
+            'title': pd.get('title', ''),
+            'url': f"https://reddit.com{pd.get('permalink', '')}",
+            'score': pd.get('score', 0),
+            'comments': pd.get('num_comments', 0),
+            'created': pd.get('created_utc'),
+            'subreddit': subreddit,
+            'source': f'r/{subreddit}'
+        }
+
     def fetch_reddit_hot(self, subreddit: str, limit=8) -> List[Dict]:
         """Fetch hot posts from a subreddit"""
         try:
-            url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit={limit + 3}&raw_json=1"
-            response = requests.get(url, headers=self.reddit_headers, timeout=15)
-
-            if response.status_code == 429:
-                time.sleep(3)
-                response = requests.get(url, headers=self.reddit_headers, timeout=15)
+            url = f"{self.reddit_base}/r/{subreddit}/hot.json?limit={limit + 3}&raw_json=1"
+            response = self.http.get(url, headers=self.reddit_headers, timeout=15)
 
             if response.status_code != 200:
                 print(f"Reddit r/{subreddit} → HTTP {response.status_code}")
@@ -82,37 +305,81 @@ class IntelligenceScraper:
                 pd = post.get('data', {})
                 if pd.get('stickied'):
                     continue
-                posts.append({
-                    'title': pd.get('title', ''),
-                    'url': f"https://reddit.com{pd.get('permalink', '')}",
-                    'score': pd.get('score', 0),
-                    'comments': pd.get('num_comments', 0),
-                    'subreddit': subreddit,
-                    'source': f'r/{subreddit}'
-                })
+                posts.append(self._reddit_post(pd, subreddit))
                 if len(posts) >= limit:
                     break
 
-            time.sleep(0.5)
             return posts
         except Exception as e:
             print(f"Error fetching r/{subreddit}: {e}")
             return []
 
+    def fetch_reddit_multi(self, limits: Dict[str, int]) -> List[Dict]:
+        """Hot posts of several subreddits from one combined r/a+b+c listing
+
+        Pages through the combined listing until every subreddit has `limit`
+        non-stickied posts (hot rank does not depend on the subreddit, so each
+        one's posts come out in its own hot order). Subreddits still short
+        after REDDIT_MAX_PAGES pages, or absent altogether (small ones drown
+        in a big one's listing), are fetched on their own. Returns one flat
+        list; every post carries its configured `subreddit` name.
+        """
+        by_name = {sub.lower(): sub for sub in limits}
+        posts: Dict[str, List[Dict]] = {sub: [] for sub in limits}
+        url = f"{self.reddit_base}/r/{'+'.join(limits)}/hot.json"
+        after = None
+        try:
+            for _ in range(REDDIT_MAX_PAGES):
+                params = {'limit': REDDIT_PAGE_SIZE, 'raw_json': 1, **({'after': after} if after else {})}
+                response = self.http.get(url, headers=self.reddit_headers, params=params, timeout=15)
+                if response.status_code != 200:
+                    print(f"Reddit multireddit → HTTP {response.status_code}")
+                    break
+                listing = response.json().get('data', {})
+                for post in listing.get('children', []):
+                    pd = post.get('data', {})
+                    sub = by_name.get((pd.get('subreddit') or '').lower())
+                    if sub is None or pd.get('stickied') or len(posts[sub]) >= limits[sub]:
+                        continue
+                    posts[sub].append(self._reddit_post(pd, sub))
+                after = listing.get('after')
+                if not after or all(len(posts[sub]) >= limits[sub] for sub in limits):
+                    break
+        except Exception as e:
+            print(f"Error fetching multireddit: {e}")
+
+        short = [sub for sub in limits if len(posts[sub]) < limits[sub]]
+        if short:
+            with ThreadPoolExecutor(max_workers=len(short)) as pool:
+                for sub, fetched in zip(short, pool.map(lambda s: self.fetch_reddit_hot(s, limits[s]), short)):
+                    if len(fetched) > len(posts[sub]):
+                        posts[sub] = fetched
+        return [post for sub in limits for post in posts[sub]]
+
+    @staticmethod
+    def _github_search(language: str = '', topic: str = '') -> str:
+        """Search qualifiers for repos created in the last week with some traction"""
+        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        query = f"created:>{week_ago} stars:>20"
+        if language:
+            query += f" language:{language}"
+        if topic:
+            query += f" topic:{topic}"
+        return query
+
+    def _github_headers(self) -> Dict[str, str]:
+        if self.github_token:
+            return {**self.headers, 'Authorization': f"bearer {self.github_token}"}
+        return self.headers
+
     def fetch_github_trending(self, language: str = '', topic: str = '') -> List[Dict]:
         """Fetch trending GitHub repos"""
         try:
-            week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-            query = f"created:>{week_ago} stars:>20"
-            if language:
-                query += f" language:{language}"
-            if topic:
-                query += f" topic:{topic}"
-
-            params = {'q': query, 'sort': 'stars', 'order': 'desc', 'per_page': 5}
-            response = requests.get(
-                "https://api.github.com/search/repositories",
-                headers=self.headers, params=params, timeout=10
+            params = {'q': self._github_search(language, topic), 'sort': 'stars', 'order': 'desc',
+                      'per_page': GITHUB_PER_QUERY}
+            response = self.http.get(
+                f"{self.github_api}/search/repositories",
+                headers=self._github_headers(), params=params, timeout=10
             )
             if response.status_code != 200:
                 return []
@@ -132,21 +399,85 @@ class IntelligenceScraper:
             print(f"Error fetching GitHub trending: {e}")
             return []
 
+    def fetch_github_graphql(self, queries: Dict[str, Dict[str, str]]) -> Dict[str, List[Dict]]:
+        """Several repo searches as aliased sub-queries of one GraphQL request (needs GITHUB_TOKEN)
+
+        Returns {key: repos} for every search the response answered; a
+        search whose sub-query errored is left out, and a failed request
+        returns {}, so callers can fall back to REST for whatever is missing.
+        """
+        aliases = {f"q{i}": key for i, key in enumerate(queries)}
+        searches = ' '.join(f"{alias}: search(query: ${alias}, type: REPOSITORY, first: {GITHUB_PER_QUERY}) "
+                            "{ nodes { ...repo } }" for alias in aliases)
+        document = f"query({', '.join(f'${alias}: String!' for alias in aliases)}) {{ {searches} }} {GITHUB_REPO_FIELDS}"
+        variables = {alias: self._github_search(**queries[key]) + ' sort:stars-desc' for alias, key in aliases.items()}
+        try:
+            response = self.http.post(f"{self.github_api}/graphql", json={'query': document, 'variables': variables},
+                                      headers=self._github_headers(), timeout=10)
+            if response.status_code != 200:
+                print(f"GitHub GraphQL → HTTP {response.status_code}")
+                return {}
+            data = response.json().get('data') or {}
+        except Exception as e:
+            print(f"Error querying GitHub GraphQL: {e}")
+            return {}
+
+        found = {}
+        for alias, key in aliases.items():
+            if not data.get(alias):
+                continue
+            found[key] = [{
+                'name': node.get('nameWithOwner', ''),
+                'description': node.get('description') or 'No description',
+                'url': node.get('url', ''),
+                'stars': node.get('stargazerCount', 0),
+                'language': (node.get('primaryLanguage') or {}).get('name') or 'Unknown',
+                'source': 'GitHub'
+            } for node in data[alias].get('nodes') or [] if node]
+        return found
+
+    def fetch_github_batch(self, queries: Dict[str, Dict[str, str]]) -> List[Dict]:
+        """Trending repos of several language/topic searches, each repo once
+
+        With GITHUB_TOKEN set every search rides in one GraphQL request (one
+        call against GitHub's search rate limit however many searches there
+        are); without a token, or for searches GraphQL did not answer, each
+        falls back to its own REST search. A repo matching several searches
+        is kept under the first. Returns one flat list; every repo carries
+        the `query` key it was found under.
+        """
+        found = self.fetch_github_graphql(queries) if self.github_token else {}
+        missing = [key for key in queries if key not in found]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                for key, repos in zip(missing, pool.map(lambda k: self.fetch_github_trending(**queries[k]), missing)):
+                    found[key] = repos
+
+        seen = set()
+        repos = []
+        for key in queries:
+            for repo in found[key]:
+                name = repo['name'].lower()
+                if name not in seen:
+                    seen.add(name)
+                    repos.append({**repo, 'query': key})
+        return repos
+
     def fetch_news_api(self, query: str = '', category: str = '') -> List[Dict]:
         """Fetch from NewsAPI (optional)"""
         if not self.news_api_key:
             return []
         try:
             if category:
-                url = "https://newsapi.org/v2/top-headlines"
+                url = f"{self.news_api}/top-headlines"
                 params = {'apiKey': self.news_api_key, 'category': category, 'language': 'en', 'pageSize': 6}
             else:
                 yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                url = "https://newsapi.org/v2/everything"
+                url = f"{self.news_api}/everything"
                 params = {'apiKey': self.news_api_key, 'q': query, 'from': yesterday,
                           'sortBy': 'popularity', 'language': 'en', 'pageSize': 6}
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             articles = []
             for a in response.json().get('articles', []):
                 if a.get('title') and '[Removed]' not in a.get('title', ''):
@@ -155,6 +486,7 @@ class IntelligenceScraper:
                         'url': a.get('url', ''),
                         'score': 500,  # High but consistent score for NewsAPI
                         'comments': 0,
+                        'created': _epoch(a.get('publishedAt')),
                         'source': a.get('source', {}).get('name', 'News')
                     })
             return articles
@@ -162,102 +494,211 @@ class IntelligenceScraper:
             print(f"NewsAPI error: {e}")
             return []
 
-    def collect_all_data(self) -> Dict[str, Any]:
-        """Collect data from all sources"""
+    def run_sources(self, sources: Dict[str, Callable[[], List[Dict]]],
+                    on_result: Optional[Callable[[str, List[Dict]], None]] = None) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """Run independent source fetchers concurrently under per-source and global deadlines
+
+        Returns the results of every source that finished in time, keyed like
+        `sources`, plus the names of the sources that missed their deadline.
+        `on_result` is called on the calling thread as each source finishes.
+        Late fetchers are abandoned, not interrupted; their own HTTP timeouts
+        bound how long they linger in the background.
+        """
+        start = time.monotonic()
+        global_deadline = start + self.collect_timeout
+        results: Dict[str, List[Dict]] = {}
+        timed_out: List[str] = []
+
+        pool = ThreadPoolExecutor(max_workers=max(1, len(sources)))
+        pending = {pool.submit(fn): name for name, fn in sources.items()}
+        deadlines = {future: min(start + self.source_timeout, global_deadline) for future in pending}
+        try:
+            while pending:
+                now = time.monotonic()
+                for future in [f for f in pending if deadlines[f] <= now]:
+                    timed_out.append(pending.pop(future))
+                    RECORDER.add(timed_out[-1], 'source', start, now - start, items=0, timed_out=True)
+                if not pending:
+                    break
+                next_deadline = min(deadlines[f] for f in pending)
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    error = None
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        print(f"Error fetching {name}: {e}")
+                        results[name] = []
+                        error = type(e).__name__
+                    RECORDER.add(name, 'source', start, time.monotonic() - start,
+                                 items=len(results[name]), **({'error': error} if error else {}))
+                    if on_result:
+                        on_result(name, results[name])
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results, timed_out
+
+    def place(self, name: str, items: List[Dict]) -> List[Tuple[str, str, List[Dict]]]:
+        """Where a finished source's items go in the raw data, as (section, key, items)"""
+        if name == 'hackernews':
+            by_category = HN_CLASSIFIER.select(items, {cat: lim for cat, (_, lim) in HN_SECTIONS.items()})
+            return [('tech_news', 'hackernews_top', items[:10])] + [
+                (cat, key, by_category[cat]) for cat, (key, _) in HN_SECTIONS.items()
+            ]
+        if name == 'reddit':
+            by_sub: Dict[str, List[Dict]] = {}
+            for post in items:
+                by_sub.setdefault(post['subreddit'], []).append(post)
+            return [(section, key, by_sub[sub]) for section, key, sub, _ in REDDIT_SOURCES if by_sub.get(sub)]
+        if name == 'github':
+            by_query: Dict[str, List[Dict]] = {}
+            for repo in items:
+                by_query.setdefault(repo['query'], []).append(repo)
+            return [(section, key, by_query[key]) for section, key, _ in GITHUB_SOURCES if by_query.get(key)]
+        if name not in SOURCE_SECTIONS:
+            return []
+        if name.startswith('r_') and not items:
+            return []  # Reddit is a bonus source: blocked subreddits are left out
+        return [(SOURCE_SECTIONS[name], name, items)]
+
+    def sources(self) -> Dict[str, Callable[[], List[Dict]]]:
+        """Every independent source fetcher of a collection run, by name"""
+        sources: Dict[str, Callable[[], List[Dict]]] = {'hackernews': partial(self.fetch_hackernews_top, 60)}
+        if self.github_batch:
+            sources['github'] = partial(self.fetch_github_batch, {key: params for _, key, params in GITHUB_SOURCES})
+        else:
+            for _, key, params in GITHUB_SOURCES:
+                sources[key] = partial(self.fetch_github_trending, **params)
+        if self.reddit_batch:
+            sources['reddit'] = partial(self.fetch_reddit_multi, {sub: lim for _, _, sub, lim in REDDIT_SOURCES})
+        else:
+            for _, key, sub, lim in REDDIT_SOURCES:
+                sources[key] = partial(self.fetch_reddit_hot, sub, lim)
+        if self.news_api_key:
+            for _, key, params in NEWSAPI_SOURCES:
+                sources[key] = partial(self.fetch_news_api, **params)
+        return sources
+
+    @staticmethod
+    def source_sections(name: str) -> List[str]:
+        """Sections a source can contribute to (HN stories are classified into all of them)"""
+        if name == 'hackernews':
+            return list(SECTIONS)
+        if name == 'reddit':
+            return list(dict.fromkeys(section for section, *_ in REDDIT_SOURCES))
+        if name == 'github':
+            return list(dict.fromkeys(section for section, *_ in GITHUB_SOURCES))
+        return [SOURCE_SECTIONS[name]] if name in SOURCE_SECTIONS else []
+
+    def collect_all_data(self, sink: Optional[RawDataWriter] = None,
+                         checkpoint: Optional[RunCheckpoint] = None) -> Dict[str, Any]:
+        """Collect data from all sources, streaming each source to `sink` as it finishes
+
+        With a `checkpoint`, sources it still holds fresh results for are not
+        fetched again, and every newly fetched source is saved to it.
+        """
         print("🔍 Collecting intelligence data...")
+        with self._counts_lock:
+            self.hn_counts = dict.fromkeys(self.hn_counts, 0)
 
-        # ── Step 1: Fetch HackerNews pool once ──────────────────────────────
-        print("  📰 HackerNews (60 stories)...")
-        hn = self.fetch_hackernews_top(60)
-
-        # ── Keyword lists ────────────────────────────────────────────────────
-        AI_KW = [
-            'ai', 'llm', 'gpt', 'openai', 'claude', 'anthropic', 'gemini', 'mistral',
-            'ollama', 'diffusion', 'transformer', 'neural network', 'machine learning',
-            'deep learning', 'artificial intelligence', 'chatgpt', 'copilot', 'rag ',
-            'vector db', 'fine-tun', 'inference', 'embedding', 'multimodal', 'llama',
-            'hugging face', 'langchain', 'agent', 'openrouter', 'deepseek', 'qwen',
-        ]
-        STARTUP_KW = [
-            'startup', 'we launched', 'show hn:', 'just launched', 'new tool',
-            'funding', 'raises $', 'series a', 'series b', 'seed round',
-            'y combinator', 'yc ', 'acquired', 'ipo', 'saas', 'mrr', 'arr',
-            'bootstrapped', 'founder', 'side project', 'open source alternative',
-        ]
-        JOB_KW = [
-            "who is hiring", "ask hn: who", "we're hiring", "we are hiring",
-            'job opening', 'remote position', 'founding engineer', 'join our team',
-            'looking for engineer', 'looking for developer', 'hiring engineer',
-            'hiring developer', 'senior engineer', 'full-stack', 'backend engineer',
-            'frontend engineer', 'contract work', 'freelance',
-        ]
-        WORLD_KW = [
-            'china', 'russia', 'ukraine', 'europe', 'nato', 'war ', 'conflict',
-            'election', 'president', 'government', 'policy', 'regulation', 'law ',
-            'economy', 'recession', 'inflation', 'tariff', 'trade war', 'sanction',
-            'climate', 'nuclear', 'pentagon', 'congress', 'senate', 'supreme court',
-            'geopolit', 'international', 'global ', 'world ', 'country', 'nation',
-        ]
-
-        # ── Step 2: Build sections ───────────────────────────────────────────
-        data = {
-            'timestamp': datetime.now().isoformat(),
-            'tech_news': {
-                'hackernews_top': hn[:10],
-            },
-            'ai_ml': {
-                'hackernews_ai': self.filter_by_keywords(hn, AI_KW, 8),
-                'github_python': self.fetch_github_trending('python'),
-                'github_ai_topic': self.fetch_github_trending(topic='machine-learning'),
-            },
-            'startups': {
-                'hackernews_startup': self.filter_by_keywords(hn, STARTUP_KW, 6),
-            },
-            'remote_jobs': {
-                'hackernews_jobs': self.filter_by_keywords(hn, JOB_KW, 6),
-            },
-            'world_news': {
-                'hackernews_world': self.filter_by_keywords(hn, WORLD_KW, 8),
-            }
-        }
+        # ── Step 1: Fetch every independent source concurrently ─────────────
+        sources = self.sources()
+        restored = checkpoint.load_sources(sources) if checkpoint else {}
+
+        placed: Dict[str, List[Tuple[str, str, List[Dict]]]] = {}
+
+        def on_result(name: str, items: List[Dict]):
+            if checkpoint and name not in restored:
+                checkpoint.save_source(name, items)
+            placed[name] = self.place(name, items)
+            if sink:
+                for section, key, section_items in placed[name]:
+                    sink.write(section, key, section_items)
+                sink.source_finished(name)
+
+        if restored:
+            print(f"  ♻️  {len(restored)} sources restored from run {checkpoint.run_id}: {', '.join(restored)}")
+            for name, items in restored.items():
+                RECORDER.add(name, 'source', time.monotonic(), 0.0, items=len(items), restored=True)
+                on_result(name, items)
+        print(f"  📡 {len(sources) - len(restored)} sources (HackerNews, GitHub, Reddit"
+              f"{', NewsAPI' if self.news_api_key else ''})...")
+        results, timed_out = self.run_sources(
+            {name: fn for name, fn in sources.items() if name not in restored}, on_result)
+        for name in timed_out:
+            print(f"    ⏱️  {name}: timed out")
+        if sink:
+            sink.finish(timed_out)
+
+        # ── Step 2: Build sections (in source order, whatever order they finished in)
+        data: Dict[str, Any] = {'timestamp': datetime.now().isoformat()}
+        data.update({section: {} for section in SECTIONS})
+        for name in sources:
+            for section, key, items in placed.get(name) or self.place(name, []):
+                data[section][key] = items
+        data['timed_out_sources'] = timed_out
 
         # ── Step 3: Reddit (bonus, skip if blocked) ──────────────────────────
         print("  🔴 Reddit...")
-        reddit_map = [
-            ('ai_ml',       'r_machinelearning', 'MachineLearning',  6),
-            ('ai_ml',       'r_localllama',      'LocalLLaMA',       5),
-            ('startups',    'r_startups',        'startups',         5),
-            ('remote_jobs', 'r_remotework',      'remotework',       5),
-            ('remote_jobs', 'r_forhire',         'forhire',          5),
-            ('world_news',  'r_worldnews',       'worldnews',        6),
-            ('world_news',  'r_geopolitics',     'geopolitics',      4),
-        ]
-        for cat, key, sub, lim in reddit_map:
-            posts = self.fetch_reddit_hot(sub, lim)
+        for section, key, sub, _ in REDDIT_SOURCES:
+            posts = data[section].get(key)
             if posts:
-                data[cat][key] = posts
                 print(f"    ✅ r/{sub}: {len(posts)}")
             else:
                 print(f"    ⚠️  r/{sub}: skipped")
 
-        # ── Step 4: NewsAPI (optional) ───────────────────────────────────────
-        if self.news_api_key:
-            print("  📡 NewsAPI...")
-            data['world_news']['newsapi_general'] = self.fetch_news_api(category='general')
-            data['world_news']['newsapi_business'] = self.fetch_news_api(category='business')
-            data['ai_ml']['newsapi_tech'] = self.fetch_news_api('artificial intelligence OR machine learning')
-
+        stats = self.http.connection_stats().values()
+        print(f"🔌 HTTP: {sum(s['requests'] for s in stats)} requests, "
+              f"{sum(s['reused'] for s in stats)} on reused connections, "
+              f"{sum(s['retries'] for s in stats)} retries")
+        if self.http.cache is not None:
+            cache = self.http.cache.stats()
+            print(f"💾 Cache: {cache['hits']} hits, {cache['revalidated']} revalidated, {cache['misses']} misses")
+        if self.store:
+            # restored sources were stored by the attempt that fetched them
+            for name, items in results.items():
+                if name != 'hackernews':
+                    self.store.upsert_many(items)
+            print(f"🗃️  Incremental: {self.hn_counts['new']} new HN items, "
+                  f"{self.hn_counts['refreshed']} re-scored, {self.hn_counts['stored']} served from store")
         print("✅ Collection complete!")
         return data
 
 
+    def close(self):
+        self.http.close()
+        if self.store:
+            self.store.close()
+
+
 def main():
-    scraper = IntelligenceScraper()
-    data = scraper.collect_all_data()
+    parser = argparse.ArgumentParser(description="Collect raw intelligence data into data/")
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=None,
+                        help="serve repeat requests from data/http_cache.sqlite (default: on, or $HTTP_CACHE)")
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse items already in data/items.sqlite (default: off, or $INCREMENTAL)")
+    parser.add_argument('--raw-format', choices=['ndjson', 'json'], default=os.getenv('RAW_FORMAT', 'ndjson'),
+                        help="stream data/raw_data.ndjson as sources finish, or write data/raw_data.json at the end")
+    args = parser.parse_args()
+
+    scraper = IntelligenceScraper(use_cache=args.cache, incremental=args.incremental)
+    path = save_raw_data(scraper, args.raw_format)
+    print(f"📁 Saved to {path}")
+
+
+def save_raw_data(scraper: IntelligenceScraper, raw_format: str = 'ndjson',
+                  checkpoint: Optional[RunCheckpoint] = None) -> str:
+    """Collect into data/raw_data.<format> and return the path written"""
+    if raw_format == 'ndjson':
+        with RawDataWriter('data/raw_data.ndjson') as sink:
+            scraper.collect_all_data(sink=sink, checkpoint=checkpoint)
+        return sink.path
+    data = scraper.collect_all_data(checkpoint=checkpoint)
     os.makedirs('data', exist_ok=True)
     with open('data/raw_data.json', 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
-    print("📁 Saved to data/raw_data.json")
+    return 'data/raw_data.json'
 
 
 if __name__ == "__main__":
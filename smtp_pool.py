@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Morning Intelligence Brief - SMTP Pool
+Authenticated, reusable SMTP connections for delivering one message to many recipients
+"""
+
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from instrumentation import span
+
+# Connection-level failures after which the connection is dropped and the send retried
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+class DeliveryResult:
+    """Outcome of delivering the message to one recipient"""
+
+    def __init__(self, recipient: str, ok: bool, attempts: int, code: Optional[int] = None,
+                 error: Optional[str] = None):
+        self.recipient = recipient
+        self.ok = ok
+        self.attempts = attempts
+        self.code = code
+        self.error = error
+
+    def to_dict(self) -> Dict:
+        return {'recipient': self.recipient, 'ok': self.ok, 'attempts': self.attempts,
+                'code': self.code, 'error': self.error}
+
+
+class SmtpPool:
+    """Small pool of logged-in SMTP connections, each reused for many messages
+
+    A connection pays the TCP + STARTTLS + AUTH round trips once and then
+    sends messages back to back on the same session. smtplib does not
+    pipeline the commands of one envelope, so throughput comes from keeping
+    sessions warm and running `size` of them in parallel.
+    A 421 or a dropped connection discards that connection and retries the
+    recipient on a fresh one; other 4xx replies are retried with backoff,
+    5xx replies fail the recipient immediately. A permanent failure to
+    connect or log in (535 bad credentials) trips the pool: every send fails
+    fast with that error for `breaker_cooldown` seconds instead of retrying
+    AUTH once per recipient.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 size: int = 4, starttls: bool = True, timeout: float = 30.0, max_attempts: int = 3,
+                 backoff_base: float = 1.0, max_backoff: float = 30.0, max_messages_per_connection: int = 500,
+                 breaker_cooldown: float = 60.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = max(1, size)
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_messages_per_connection = max_messages_per_connection
+        self.breaker_cooldown = breaker_cooldown
+        self._tripped: Optional[Tuple[float, Optional[int], str]] = None  # (until, code, error)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._sent_on: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.opened = self.messages = self.reconnects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        with span('smtp.connect', 'smtp', host=self.host, tls=self.starttls):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                server.ehlo()
+                if self.starttls:
+                    server.starttls()
+                    server.ehlo()
+                if self.username and self.password:
+                    server.login(self.username, self.password)
+            except Exception:
+                self._discard(server)
+                raise
+        with self._lock:
+            self.opened += 1
+            self._sent_on[id(server)] = 0
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        """An idle authenticated connection, or a new one"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, server: smtplib.SMTP):
+        """Return a healthy connection to the pool, retiring it once it has sent its share"""
+        with self._lock:
+            retire = self._sent_on.get(id(server), 0) >= self.max_messages_per_connection
+        if retire or self._idle.qsize() >= self.size:
+            self._discard(server, polite=True)
+        else:
+            self._idle.put(server)
+
+    def _discard(self, server: smtplib.SMTP, polite: bool = False):
+        with self._lock:
+            self._sent_on.pop(id(server), None)
+        try:
+            if polite:
+                server.quit()
+            else:
+                server.close()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay + random.uniform(0, delay / 2), self.max_backoff)
+
+    def send(self, from_addr: str, recipient: str, message: bytes) -> DeliveryResult:
+        """Deliver `message` to one recipient, reconnecting and retrying on transient failures"""
+        with span('smtp.send', 'smtp', host=self.host, bytes=len(message)) as attrs:
+            result = self._send(from_addr, recipient, message)
+            attrs.update(ok=result.ok, code=result.code, attempts=result.attempts)
+        return result
+
+    def _send(self, from_addr: str, recipient: str, message: bytes) -> DeliveryResult:
+        code = error = None
+        wait = False  # a dropped session is retried at once, a 4xx reply after a backoff
+        for attempt in range(self.max_attempts):
+            tripped = self._tripped
+            if tripped is not None and tripped[0] > time.monotonic():
+                return DeliveryResult(recipient, False, attempt, tripped[1], tripped[2])
+            if wait:
+                time.sleep(self._backoff(attempt - 1))
+            wait = True
+            try:
+                server = self.acquire()
+            except (smtplib.SMTPException, *RECONNECT_ERRORS) as e:
+                code, error = getattr(e, 'smtp_code', None), str(e) or type(e).__name__
+                if not _transient(code):
+                    # e.g. 535 authentication failed: no point retrying this or any other recipient
+                    with self._lock:
+                        self._tripped = (time.monotonic() + self.breaker_cooldown, code, error)
+                    return DeliveryResult(recipient, False, attempt + 1, code, error)
+                continue
+            try:
+                server.sendmail(from_addr, [recipient], message)
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reply = e.recipients.get(recipient, (None, b''))
+                error = _text(reply)
+                wait = not self._reset_or_discard(server, code)
+                if not _transient(code):
+                    return DeliveryResult(recipient, False, attempt + 1, code, error)
+                continue
+            except smtplib.SMTPResponseException as e:
+                code, error = e.smtp_code, _text(e.smtp_error)
+                wait = not self._reset_or_discard(server, code)
+                if not _transient(code):
+                    return DeliveryResult(recipient, False, attempt + 1, code, error)
+                continue
+            except RECONNECT_ERRORS as e:
+                code, error = None, str(e) or type(e).__name__
+                self._discard(server)
+                with self._lock:
+                    self.reconnects += 1
+                wait = False
+                continue
+            except smtplib.SMTPException as e:
+                # e.g. SMTPNotSupportedError for an SMTPUTF8 address: the session's state is unknown
+                code, error = None, str(e) or type(e).__name__
+                self._discard(server)
+                return DeliveryResult(recipient, False, attempt + 1, code, error)
+            with self._lock:
+                self._tripped = None
+                self.messages += 1
+                self._sent_on[id(server)] = self._sent_on.get(id(server), 0) + 1
+            self.release(server)
+            return DeliveryResult(recipient, True, attempt + 1, 250)
+        return DeliveryResult(recipient, False, self.max_attempts, code, error)
+
+    def _reset_or_discard(self, server: smtplib.SMTP, code: Optional[int]) -> bool:
+        """Keep a connection after a per-message rejection; True if the server closed it instead (421)"""
+        if code == 421:
+            self._discard(server)
+            with self._lock:
+                self.reconnects += 1
+            return True
+        try:
+            server.rset()
+        except (smtplib.SMTPException, OSError):
+            self._discard(server)
+            return False
+        self.release(server)
+        return False
+
+    def send_many(self, from_addr: str, recipients: Iterable[str], message_for) -> List[DeliveryResult]:
+        """Deliver `message_for(recipient)` to every recipient across `size` parallel connections
+
+        Results come back in recipient order; a recipient that fails in any
+        way gets a failed result rather than aborting the rest of the batch.
+        """
+        def deliver(rcpt: str) -> DeliveryResult:
+            try:
+                return self.send(from_addr, rcpt, message_for(rcpt))
+            except (smtplib.SMTPException, OSError) as e:
+                return DeliveryResult(rcpt, False, 1, getattr(e, 'smtp_code', None), str(e) or type(e).__name__)
+
+        recipients = list(recipients)
+        with ThreadPoolExecutor(max_workers=min(self.size, len(recipients)) or 1) as executor:
+            return list(executor.map(deliver, recipients))
+
+    def stats(self) -> Dict[str, int]:
+        return {'opened': self.opened, 'messages': self.messages, 'reconnects': self.reconnects}
+
+    def close(self):
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server, polite=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pool_from_env(username: str, password: Optional[str] = None, host: Optional[str] = None,
+                  port: Optional[int] = None, size: Optional[int] = None,
+                  starttls: Optional[bool] = None, **kwargs) -> SmtpPool:
+    """SmtpPool configured from arguments, falling back to $SMTP_* settings"""
+    if starttls is None:
+        starttls = os.getenv('SMTP_STARTTLS', '1') == '1'
+    return SmtpPool(
+        host or os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+        port or int(os.getenv('SMTP_PORT', '587')),
+        username,
+        password or os.getenv('SMTP_PASSWORD'),
+        size=size or int(os.getenv('SMTP_POOL_SIZE', '4')),
+        starttls=starttls,
+        **kwargs,
+    )
+
+
+def addressed(message: bytes, recipient: str) -> bytes:
+    """`message` (encoded without a To: header) addressed to one recipient"""
+    return b'To: ' + recipient.encode('utf-8') + b'\r\n' + message
+
+
+def _transient(code: Optional[int]) -> bool:
+    return code is None or 400 <= code < 500
+
+
+def _text(reply) -> str:
+    return reply.decode('utf-8', 'replace') if isinstance(reply, bytes) else str(reply)
@@ -4,37 +4,416 @@ Morning Intelligence Brief - AI Summarizer
 Processes raw data and creates structured summaries
 """
 
+import argparse
+import hashlib
+import heapq
 import json
 import os
+import re
+import struct
+import time
+import unicodedata
 from datetime import datetime
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Tuple, Optional, Iterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from instrumentation import span
+from item_store import item_key
+from items import ItemBatch
+from ranking import Ranker, RankingWeights, top_k
+
+# Stories per section in the brief (AI & ML: discussions; trending repos are capped separately at 3)
+SECTION_LIMITS = {'tech_news': 8, 'ai_ml': 6, 'startups': 5, 'remote_jobs': 6, 'world_news': 6}
+TRACKING_PARAMS = {'ref', 'ref_src', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'smid'}
+_HN_PREFIX = re.compile(r'^(show|ask|tell|launch) hn:\s*')
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def summary_items(summary: Dict[str, Any]) -> List[Dict]:
+    """Every item and repo that appears in a generated summary"""
+    items = []
+    for section in summary.get('sections', {}).values():
+        for key in ('items', 'discussions', 'trending_repos'):
+            items.extend(section.get(key, []))
+    return items
+
+
+def canonical_url(url: str) -> str:
+    """Scheme-, www-, fragment- and tracking-parameter-insensitive form of a URL"""
+    if not url or url == '#':
+        return ''
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host in ('old.reddit.com', 'new.reddit.com'):
+        host = 'reddit.com'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.startswith('utm_') and k not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def normalize_title(title: str, source: str = '') -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a title
+
+    Also drops the "Show HN:"-style prefixes and the " - Source Name" suffix
+    NewsAPI appends to headlines, so the same story matches across sources.
+    """
+    title = unicodedata.normalize('NFKC', title or '').strip().lower()
+    if source and title.endswith(source.lower()):
+        stripped = title[:-len(source)].rstrip()
+        if stripped[-1:] in ('-', '|', '–', '—'):
+            title = stripped[:-1]
+    title = _HN_PREFIX.sub('', title)
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', title)).strip()
+
+
+class DedupIndex:
+    """Normalized titles and canonical URLs already used by any section"""
+
+    def __init__(self):
+        self.titles: Set[str] = set()
+        self.urls: Set[str] = set()
+
+    @staticmethod
+    def keys(item: Dict) -> Tuple[str, str]:
+        # An enriched story's page-declared canonical address beats its (often tracking-laden) link
+        return (normalize_title(item.get('title', ''), item.get('source', '')),
+                canonical_url(item.get('canonical_url') or item.get('url', '')))
+
+    def seen(self, keys: Tuple[str, str]) -> bool:
+        title, url = keys
+        return bool(title and title in self.titles) or bool(url and url in self.urls)
+
+    def add(self, keys: Tuple[str, str]):
+        title, url = keys
+        if title:
+            self.titles.add(title)
+        if url:
+            self.urls.add(url)
+
+
+STOPWORDS = frozenset(
+    'a an the and or of to in on for with from by at as is are was were be it its this that '
+    'how why what when who your our my we you i new'.split()
+)
+
+
+class NearDuplicateClusterer:
+    """Groups near-identical titles with MinHash signatures and LSH banding
+
+    Each title becomes a set of word shingles (normalized, stop words and
+    plural "s" dropped). Every distinct shingle is hashed once into a vector of
+    `num_perm` 32-bit values; a title's signature is the element-wise minimum
+    of its shingles' vectors (`num_perm` MinHash values), split into
+    bands; titles sharing any band become candidate pairs, which are then
+    confirmed with their exact Jaccard similarity against `threshold`. Work
+    grows with the number of candidates, not with the square of the pool.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 32, max_bucket: int = 200, seed: int = 1):
+        self.threshold = threshold
+        self.max_bucket = max_bucket  # oversized buckets are degenerate shingles, not stories
+        self.num_perm = num_perm
+        self._seed = struct.pack('<I', seed)
+        self._unpack = struct.Struct(f'<{num_perm}I').unpack
+        # Most selective banding whose LSH threshold (1/b)^(1/r) still sits at or below `threshold`
+        options = [(num_perm // r, r) for r in (8, 4, 2, 1) if num_perm % r == 0]
+        self.bands, self.rows = next(
+            ((b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold), options[-1]
+        )
+        self._hashes: Dict[str, Tuple[int, ...]] = {}
+
+    def shingles(self, item: Dict) -> frozenset:
+        words = normalize_title(item.get('title', ''), item.get('source', '')).split()
+        return frozenset(w[:-1] if len(w) > 3 and w.endswith('s') else w for w in words if w not in STOPWORDS)
+
+    def _hash(self, shingle: str) -> Tuple[int, ...]:
+        h = self._hashes.get(shingle)
+        if h is None:
+            h = self._unpack(hashlib.shake_128(self._seed + shingle.encode('utf-8')).digest(4 * self.num_perm))
+            self._hashes[shingle] = h
+        return h
+
+    def signature(self, shingles: frozenset) -> Tuple[int, ...]:
+        return tuple(map(min, zip(*[self._hash(sh) for sh in shingles])))
+
+    def clusters(self, items: List[Dict]) -> List[List[int]]:
+        """Index groups (size > 1) of items whose titles are near-duplicates"""
+        shingle_sets = [self.shingles(item) for item in items]
+        buckets: Dict[Tuple, List[int]] = {}
+        for idx, sh in enumerate(shingle_sets):
+            if not sh:
+                continue
+            sig = self.signature(sh)
+            for band in range(self.bands):
+                key = (band,) + sig[band * self.rows:(band + 1) * self.rows]
+                buckets.setdefault(key, []).append(idx)
+
+        parent = list(range(len(items)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        checked: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > self.max_bucket:
+                continue
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if (i, j) in checked or find(i) == find(j):
+                        continue
+                    checked.add((i, j))
+                    a, b = shingle_sets[i], shingle_sets[j]
+                    if len(a & b) / len(a | b) >= self.threshold:
+                        parent[find(j)] = find(i)
+
+        groups: Dict[int, List[int]] = {}
+        for idx in range(len(items)):
+            groups.setdefault(find(idx), []).append(idx)
+        return [g for g in groups.values() if len(g) > 1]
+
+
+def merge_cluster(items: List[Dict]) -> Dict:
+    """One item for a cluster of distinct stories, best first: the first, listing where else it appeared"""
+    best = items[0]
+    merged = dict(best)
+    merged['alternate_sources'] = [
+        {'source': item.get('source', ''), 'title': item.get('title', ''), 'url': item.get('url', '')}
+        for item in items if item is not best
+    ]
+    return merged
+
+
+def default_raw_path() -> str:
+    """The most recently written raw data file, NDJSON or legacy JSON"""
+    candidates = [p for p in ('data/raw_data.ndjson', 'data/raw_data.json') if os.path.exists(p)]
+    if not candidates:
+        return 'data/raw_data.json'
+    return max(candidates, key=os.path.getmtime)
+
+
+def read_raw_records(path: str, follow: bool = False, poll_interval: float = 0.2) -> Iterator[Dict]:
+    """Yield NDJSON raw data records as they appear
+
+    With `follow`, keeps reading a file that is still being written until its
+    `end` record arrives, so summarizing can start while scraping runs.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line.endswith('\n'):
+                if not follow:
+                    return
+                f.seek(pos)  # incomplete line: wait for the writer to finish it
+                time.sleep(poll_interval)
+                continue
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record
+            if record.get('type') == 'end':
+                return
+
+
+def load_raw_data(path: str, follow: bool = False) -> Dict[str, Any]:
+    """Load raw data from NDJSON (building sections record by record) or legacy JSON"""
+    if not path.endswith('.ndjson'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    raw_data: Dict[str, Any] = {}
+    for record in read_raw_records(path, follow=follow):
+        kind = record.get('type')
+        if kind == 'meta':
+            raw_data['timestamp'] = record.get('timestamp')
+        elif kind == 'key':
+            raw_data.setdefault(record['section'], {}).setdefault(record['key'], [])
+        elif kind == 'item':
+            raw_data.setdefault(record['section'], {}).setdefault(record['key'], []).append(record['item'])
+        elif kind == 'end':
+            raw_data['timed_out_sources'] = record.get('timed_out_sources', [])
+    return raw_data
 
 
 class IntelligenceSummarizer:
-    def __init__(self, data_path='data/raw_data.json'):
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.raw_data = json.load(f)
-        self._used_titles: Set[str] = set()  # Global dedup tracker
+    def __init__(self, data_path: Optional[str] = None, sent_keys: Optional[Set[Tuple[str, str]]] = None,
+                 follow: bool = False, near_dup_threshold: Optional[float] = None,
+                 raw_data: Optional[Dict[str, Any]] = None):
+        # `raw_data` hands over in-memory (possibly still filling) raw data instead of reading a file
+        if raw_data is None:
+            raw_data = load_raw_data(data_path or default_raw_path(), follow=follow)
+        self.raw_data = raw_data
+        # Jaccard similarity at which titles count as the same story; <= 0 disables clustering
+        if near_dup_threshold is None:
+            near_dup_threshold = float(os.getenv('NEAR_DUP_THRESHOLD', '0.7'))
+        self.near_dup_threshold = near_dup_threshold
+        # section -> key -> the stories near-duplicate merging replaced or dropped from raw_data
+        self.merged_away: Dict[str, Dict[str, List[Dict]]] = {}
+        self._dedup = DedupIndex()  # Global dedup tracker shared by all sections
+        # (source, id) of items delivered in recent briefs, see ItemStore.sent_keys
+        self._sent_keys: Set[Tuple[str, str]] = sent_keys or set()
+        # RANKING=raw orders sections by raw score, as before cross-source ranking existed
+        self.ranker = Ranker(RankingWeights.from_env()) if os.getenv('RANKING', 'normalized') != 'raw' else None
+        self._now = time.time()  # one reference time, so every section ages items alike
+
+    def rank(self, items: List[Dict]) -> List[Dict]:
+        """`items` best first: by composite cross-source rank, or by raw score with RANKING=raw (stable)"""
+        if self.ranker is None or len(items) < 2:
+            return sorted(items, key=lambda x: x.get('score', 0), reverse=True)
+        return [items[idx] for idx in self.ranker.order(ItemBatch.from_dicts(items), self._now)]
 
-    def extract_top_items(self, items: List[Dict], key='score', limit=5) -> List[Dict]:
-        """Extract top items sorted by score, with global deduplication across sections"""
+    def extract_top_items(self, items: List[Dict], key: Optional[str] = 'score', limit=5) -> List[Dict]:
+        """Extract top items by `key` (None: in `rank` order), with global deduplication
+
+        Candidates come from a bounded top-k window (same order as a stable
+        descending sort, or as `rank`) that only widens when duplicates use it
+        up; the rest of the pool is never sorted.
+        """
         if not items:
             return []
-        sorted_items = sorted(items, key=lambda x: x.get(key, 0), reverse=True)
+        ranks = self.ranker.scores(ItemBatch.from_dicts(items), self._now) \
+            if key is None and self.ranker is not None else None
+        field = key or 'score'
+
+        def select(window: int) -> List[Dict]:
+            if ranks is not None:
+                return [items[idx] for idx in top_k(ranks, window)]
+            return heapq.nlargest(window, items, key=lambda x: x.get(field, 0))
 
         result = []
-        for item in sorted_items:
-            title = item.get('title', '').strip().lower()
-            if not title or title in self._used_titles:
+        window, start = max(limit * 2, 8), 0
+        while True:
+            candidates = select(window)
+            for item in candidates[start:]:
+                if not item.get('title', '').strip():
+                    continue
+                keys = self._dedup.keys(item)
+                if self._dedup.seen(keys):
+                    continue
+                if self._sent_keys and item_key(item) in self._sent_keys:
+                    continue
+                self._dedup.add(keys)
+                # Fix ugly "r/N/A" label for non-Reddit sources
+                if item.get('subreddit') in ('N/A', '', None):
+                    item.pop('subreddit', None)
+                result.append(item)
+                if len(result) >= limit:
+                    return result
+            if window >= len(items):
+                return result
+            start, window = window, window * 4
+
+    def story_clusters(self, items: List[Dict]) -> List[List[List[int]]]:
+        """Near-duplicate clusters among `items`: per cluster, each story's indexes into `items`, best story first
+
+        Copies of one story (the same HN item under hackernews_top and
+        hackernews_ai) count as one story, so they never form a cluster on
+        their own. Stories are ordered by `rank`'s composite score (raw score
+        with RANKING=raw), not by raw scores that differ in scale per source.
+        """
+        copies: Dict[Any, List[int]] = {}
+        for idx, item in enumerate(items):
+            key = item_key(item)
+            copies.setdefault(key if key[1] else idx, []).append(idx)
+        stories = list(copies.values())
+        distinct = [items[idxs[0]] for idxs in stories]
+        clusters = NearDuplicateClusterer(self.near_dup_threshold).clusters(distinct)
+        if not clusters:
+            return []
+        if self.ranker is None:
+            weight = [item.get('score', 0) for item in distinct]
+        else:
+            weight = self.ranker.scores(ItemBatch.from_dicts(distinct), self._now)
+        return [[stories[s] for s in sorted(cluster, key=lambda s: -weight[s])] for cluster in clusters]
+
+    def merge_near_duplicates(self) -> int:
+        """Collapse near-duplicate stories across all sections into one merged item
+
+        Every copy of every story in a cluster is replaced, wherever it sits,
+        by the same merged item, so the shared dedup index lets it through
+        only once. Returns the number of clusters merged.
+        """
+        if self.near_dup_threshold <= 0:
+            return 0
+        slots = [
+            (section, key, idx)
+            for section, section_data in self.raw_data.items() if isinstance(section_data, dict)
+            for key, items in section_data.items() if isinstance(items, list) and 'github' not in key
+            for idx in range(len(items))
+        ]
+        items = [self.raw_data[section][key][idx] for section, key, idx in slots]
+        clusters = self.story_clusters(items)
+        for stories in clusters:
+            merged = merge_cluster([items[idxs[0]] for idxs in stories])
+            for idxs in stories:
+                for i in idxs:
+                    section, key, idx = slots[i]
+                    self._merge_away(section, key, items[i])
+                    self.raw_data[section][key][idx] = merged
+        return len(clusters)
+
+    def merge_section_near_duplicates(self, section: str, shown: List[Dict]) -> int:
+        """Streaming variant of `merge_near_duplicates` for one section at a time
+
+        Near-duplicates within the section are merged as usual; stories that
+        duplicate one already `shown` in an earlier section are dropped, since
+        that section is summarized (and rendered) already. Returns the number
+        of clusters touching the section.
+        """
+        if self.near_dup_threshold <= 0:
+            return 0
+        section_data = self.raw_data.get(section, {})
+        slots = [
+            (key, idx)
+            for key, items in section_data.items() if isinstance(items, list) and 'github' not in key
+            for idx in range(len(items))
+        ]
+        items = [section_data[key][idx] for key, idx in slots]
+        dropped: Dict[str, Set[int]] = {}
+        touched = 0
+        for stories in self.story_clusters(items + shown):
+            own = [[i for i in idxs if i < len(items)] for idxs in stories]
+            if not any(own):
                 continue
-            self._used_titles.add(title)
-            # Fix ugly "r/N/A" label for non-Reddit sources
-            if item.get('subreddit') in ('N/A', '', None):
-                item.pop('subreddit', None)
-            result.append(item)
-            if len(result) >= limit:
-                break
-        return result
+            touched += 1
+            if any(len(o) < len(idxs) for o, idxs in zip(own, stories)):
+                for i in (i for o in own for i in o):
+                    key, idx = slots[i]
+                    dropped.setdefault(key, set()).add(idx)
+                    self._merge_away(section, key, items[i])
+                continue
+            merged = merge_cluster([items[idxs[0]] for idxs in stories])
+            for i in (i for o in own for i in o):
+                key, idx = slots[i]
+                self._merge_away(section, key, items[i])
+                section_data[key][idx] = merged
+        for key, idxs in dropped.items():
+            section_data[key] = [item for idx, item in enumerate(section_data[key]) if idx not in idxs]
+        return touched
+
+    def _merge_away(self, section: str, key: str, item: Dict):
+        self.merged_away.setdefault(section, {}).setdefault(key, []).append(item)
+
+    def archive_data(self) -> Dict[str, Any]:
+        """`raw_data` plus every story near-duplicate merging took out of it, for the archive"""
+        if not self.merged_away:
+            return self.raw_data
+        data = dict(self.raw_data)
+        for section, lists in self.merged_away.items():
+            section_data = dict(data.get(section) or {})
+            for key, items in lists.items():
+                section_data[key] = list(section_data.get(key, [])) + items
+            data[section] = section_data
+        return data
 
     def flatten_section(self, section_data: dict, exclude_keys: List[str] = None) -> List[Dict]:
         """Flatten all lists from a section dict into one combined list"""
@@ -46,10 +425,29 @@ class IntelligenceSummarizer:
                 combined.extend(value)
         return combined
 
+    def section_candidates(self) -> Dict[str, List[Dict]]:
+        """Every story each section's summary could pick, best first in `rank` order
+
+        Same pools as the summarize_* methods, minus untitled and already-sent
+        items; call after `merge_near_duplicates` so merged stories are shared.
+        """
+        candidates = {}
+        for section in SECTION_LIMITS:
+            pool = self.flatten_section(self.raw_data.get(section, {}), exclude_keys=['github'])
+            pool = [item for item in pool if item.get('title', '').strip()
+                    and not (self._sent_keys and item_key(item) in self._sent_keys)]
+            candidates[section] = self.rank(pool)
+        return candidates
+
+    def enrichment_candidates(self, slack: int = 2) -> List[Dict]:
+        """Stories likely to make the brief: each section's top `slack` x limit candidates"""
+        return [item for section, pool in self.section_candidates().items()
+                for item in pool[:SECTION_LIMITS[section] * slack]]
+
     def summarize_tech_news(self) -> Dict[str, Any]:
         tech_data = self.raw_data.get('tech_news', {})
         all_tech = self.flatten_section(tech_data)
-        top_tech = self.extract_top_items(all_tech, 'score', 8)
+        top_tech = self.extract_top_items(all_tech, None, SECTION_LIMITS['tech_news'])
         return {
             'title': '💻 Tech & Development',
             'items': top_tech,
@@ -62,8 +460,10 @@ class IntelligenceSummarizer:
         for key, value in ai_data.items():
             if isinstance(value, list):
                 (github_repos if 'github' in key else discussions).extend(value)
-        top_ai = self.extract_top_items(discussions, 'score', 6)
-        top_repos = sorted(github_repos, key=lambda x: x.get('stars', 0), reverse=True)[:3]
+        top_ai = self.extract_top_items(discussions, None, SECTION_LIMITS['ai_ml'])
+        if self._sent_keys:
+            github_repos = [r for r in github_repos if item_key(r) not in self._sent_keys]
+        top_repos = heapq.nlargest(3, github_repos, key=lambda x: x.get('stars', 0))
         return {
             'title': '🤖 AI & Machine Learning',
             'discussions': top_ai,
@@ -73,39 +473,52 @@ class IntelligenceSummarizer:
 
     def summarize_startups(self) -> Dict[str, Any]:
         all_startups = self.flatten_section(self.raw_data.get('startups', {}))
-        top = self.extract_top_items(all_startups, 'score', 5)
+        top = self.extract_top_items(all_startups, None, SECTION_LIMITS['startups'])
         return {'title': '🚀 Startups & Business', 'items': top, 'summary': f"{len(top)} insights from startup community"}
 
     def summarize_remote_jobs(self) -> Dict[str, Any]:
         all_jobs = self.flatten_section(self.raw_data.get('remote_jobs', {}))
-        top = self.extract_top_items(all_jobs, 'score', 6)
+        top = self.extract_top_items(all_jobs, None, SECTION_LIMITS['remote_jobs'])
         return {'title': '💼 Remote Opportunities', 'items': top, 'summary': f"{len(top)} remote job posts and discussions"}
 
     def summarize_world_news(self) -> Dict[str, Any]:
         all_news = self.flatten_section(self.raw_data.get('world_news', {}))
-        top = self.extract_top_items(all_news, 'score', 6)
+        top = self.extract_top_items(all_news, None, SECTION_LIMITS['world_news'])
         return {'title': '🌍 World News', 'items': top, 'summary': f"{len(top)} important global updates"}
 
+    def summarize_section(self, section: str) -> Dict[str, Any]:
+        """Summary of one section; sections must be summarized in SECTION_LIMITS order for dedup"""
+        with span(f'summarize.{section}'):
+            return {
+                'tech_news': self.summarize_tech_news,
+                'ai_ml': self.summarize_ai_ml,
+                'startups': self.summarize_startups,
+                'remote_jobs': self.summarize_remote_jobs,
+                'world_news': self.summarize_world_news,
+            }[section]()
+
     def generate_summary(self) -> Dict[str, Any]:
         print("📝 Generating intelligence summary...")
-        summary = {
+        with span('summarize.near_duplicates') as attrs:
+            merged = attrs['clusters'] = self.merge_near_duplicates()
+        if merged:
+            print(f"🔗 Merged {merged} near-duplicate story clusters")
+        summary = self.new_summary({section: self.summarize_section(section) for section in SECTION_LIMITS})
+        print("✅ Summary generated!")
+        return summary
+
+    def new_summary(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """A summary document around `sections` (which may still be filled in afterwards)"""
+        return {
             'date': datetime.now().strftime('%A, %B %d, %Y'),
             'time_generated': datetime.now().strftime('%H:%M WIB'),
-            'sections': {
-                'tech_news': self.summarize_tech_news(),
-                'ai_ml': self.summarize_ai_ml(),
-                'startups': self.summarize_startups(),
-                'remote_jobs': self.summarize_remote_jobs(),
-                'world_news': self.summarize_world_news(),
-            },
+            'sections': sections,
             'insights': [
                 "📈 Focus areas today: Stay updated on AI developments and remote opportunities",
                 "🎯 Action items: Check trending GitHub repos for learning opportunities",
                 "💡 Remember: Knowledge compounds - what you learn today builds tomorrow's advantage"
             ]
         }
-        print("✅ Summary generated!")
-        return summary
 
     def save_summary(self, summary: Dict[str, Any], output_path='data/summary.json'):
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -115,7 +528,13 @@ class IntelligenceSummarizer:
 
 
 def main():
-    summarizer = IntelligenceSummarizer()
+    parser = argparse.ArgumentParser(description="Summarize raw intelligence data into data/summary.json")
+    parser.add_argument('--input', help="raw_data.ndjson or raw_data.json (default: the newest in data/)")
+    parser.add_argument('--follow', action='store_true',
+                        help="start while the scraper is still writing NDJSON and wait for its end record")
+    args = parser.parse_args()
+
+    summarizer = IntelligenceSummarizer(args.input, follow=args.follow)
     summary = summarizer.generate_summary()
     summarizer.save_summary(summary)
     print("\n" + "="*50)